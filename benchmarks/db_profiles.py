@@ -0,0 +1,138 @@
+"""
+Concurrent read/write throughput for each database engine profile.
+
+Writers bulk-insert statistics snapshots (like an ingest job) while readers
+run the dashboard's "latest stats for a channel" query (like Streamlit
+sessions). Reports operations per second and lock errors per profile.
+
+    python benchmarks/db_profiles.py
+    python benchmarks/db_profiles.py --seconds 10 --writers 2 --readers 8
+    python benchmarks/db_profiles.py --url postgresql://user:pw@host/db
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import OperationalError
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import build_engine
+from database.models import Base, Video, VideoStatistics, VideoLatestStats
+
+CHANNEL_ID = "UC_BENCHMARK_CHANNEL_001"
+VIDEOS = 2000
+WRITE_BATCH = 200
+
+
+def _seed(engine):
+    Base.metadata.create_all(bind=engine)
+    now = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(delete(VideoLatestStats).where(VideoLatestStats.channel_id == CHANNEL_ID))
+        conn.execute(delete(VideoStatistics).where(VideoStatistics.video_id.like("BENCH%")))
+        conn.execute(delete(Video).where(Video.channel_id == CHANNEL_ID))
+        conn.execute(insert(Video), [
+            {"video_id": f"BENCH{i:06d}", "channel_id": CHANNEL_ID, "title": f"Video {i}", "published_at": now}
+            for i in range(VIDEOS)
+        ])
+        conn.execute(insert(VideoLatestStats), [
+            {"video_id": f"BENCH{i:06d}", "channel_id": CHANNEL_ID, "view_count": i,
+             "like_count": 0, "comment_count": 0, "record_date": now, "checked_at": now}
+            for i in range(VIDEOS)
+        ])
+
+
+def _writer(engine, stop, counters, offset):
+    i = offset
+    while not stop.is_set():
+        rows = [
+            {"video_id": f"BENCH{(i + j) % VIDEOS:06d}", "view_count": i + j,
+             "like_count": 1, "comment_count": 1, "record_date": datetime.now(timezone.utc).replace(tzinfo=None)}
+            for j in range(WRITE_BATCH)
+        ]
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(VideoStatistics), rows)
+            counters["writes"] += 1
+            counters["rows"] += WRITE_BATCH
+        except OperationalError:
+            counters["write_errors"] += 1
+        i += WRITE_BATCH
+
+
+def _reader(engine, stop, counters):
+    stmt = (
+        select(VideoLatestStats.video_id, VideoLatestStats.view_count)
+        .where(VideoLatestStats.channel_id == CHANNEL_ID)
+        .order_by(VideoLatestStats.view_count.desc())
+        .limit(50)
+    )
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(stmt).all()
+            counters["reads"] += 1
+        except OperationalError:
+            counters["read_errors"] += 1
+
+
+def run_profile(url, profile, seconds, writers, readers):
+    engine = build_engine(url, profile=profile)
+    _seed(engine)
+
+    counters = {"writes": 0, "rows": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+    stop = threading.Event()
+    threads = [threading.Thread(target=_writer, args=(engine, stop, counters, n * 10_000)) for n in range(writers)]
+    threads += [threading.Thread(target=_reader, args=(engine, stop, counters)) for _ in range(readers)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "backend": engine.url.get_backend_name(),
+        "write_tx_per_s": counters["writes"] / elapsed,
+        "rows_per_s": counters["rows"] / elapsed,
+        "reads_per_s": counters["reads"] / elapsed,
+        "write_errors": counters["write_errors"],
+        "read_errors": counters["read_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file per profile)")
+    parser.add_argument("--profiles", default="default,tuned")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'backend':<12}{'write tx/s':>12}{'rows/s':>12}{'reads/s':>12}{'w-errors':>10}{'r-errors':>10}")
+    for profile in args.profiles.split(","):
+        url = args.url
+        if url is None:
+            url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='yt_bench_'), 'bench.db')}"
+        r = run_profile(url, profile, args.seconds, args.writers, args.readers)
+        print(f"{r['profile']:<10}{r['backend']:<12}{r['write_tx_per_s']:>12.1f}{r['rows_per_s']:>12.0f}"
+              f"{r['reads_per_s']:>12.1f}{r['write_errors']:>10}{r['read_errors']:>10}")
+
+
+if __name__ == "__main__":
+    main()
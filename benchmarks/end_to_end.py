@@ -0,0 +1,206 @@
+"""
+End-to-end pipeline benchmark against the offline fake API server.
+
+For each synthetic catalog size, times three phases separately:
+- extract: iter_video_batches() through the real client stack over HTTP
+- persist: save_video_stream_to_db() of the extracted batches
+- aggregate: the dashboard's reads (summary, top videos, monthly posts,
+  downsampled engagement points) plus a full rebuild_aggregates()
+and records seconds, videos per second and peak traced memory (MB).
+Results go to a JSON file; --baseline compares against an earlier one and
+exits non-zero when a phase got slower or hungrier than --tolerance.
+Peak memory comes from tracemalloc, which also slows every phase, so only
+compare against baselines recorded by this script.
+
+    python benchmarks/end_to_end.py --sizes 1000,10000 --output bench.json
+    python benchmarks/end_to_end.py --sizes 1000,10000 --baseline bench.json
+    python benchmarks/end_to_end.py --latency-ms 30 --error-rate 0.02
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import datetime, timezone
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from benchmarks.fake_api_server import catalog_channel_id, start_server
+
+# Metrics where a higher value is a regression
+COMPARED_METRICS = ("seconds", "peak_mb")
+
+
+def _measure(fn):
+    """(result, seconds, peak MB) of fn() under tracemalloc."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def _phase(seconds, peak_mb, videos, **extra):
+    return {"seconds": round(seconds, 4), "videos_per_second": round(videos / seconds, 1) if seconds else None,
+            "peak_mb": round(peak_mb, 2), **extra}
+
+
+def run_size(size, server, workers):
+    from data_processing.api_scheduler import get_scheduler
+    from data_processing.channel_extractor import extract_channel_data
+    from data_processing.video_extractor import iter_video_batches
+    from database.aggregates import rebuild_aggregates
+    from database.db_config import engine
+    from database.persistence import save_channel_to_db, save_video_stream_to_db
+    from database.queries import channel_video_summary, load_monthly_posts, load_top_videos, load_video_frame
+    from data_processing.video_frame import compact_video_frame
+    from streamlit_app.charts import downsample_points
+
+    channel_id = catalog_channel_id(size)
+    save_channel_to_db(extract_channel_data([channel_id]).iloc[0])
+    requests_before = sum(server.stats()["requests"].values())
+    retries_before = get_scheduler().usage()["retries"]
+
+    batches, seconds, peak = _measure(lambda: list(iter_video_batches(channel_id, max_workers=workers)))
+    videos = sum(len(batch) for batch in batches)
+    extract = _phase(seconds, peak, videos,
+                     api_requests=sum(server.stats()["requests"].values()) - requests_before,
+                     retries=get_scheduler().usage()["retries"] - retries_before)
+
+    summary, seconds, peak = _measure(lambda: save_video_stream_to_db(iter(batches), channel_id))
+    persist = _phase(seconds, peak, videos, batches=summary["batches"], statistics=summary["statistics"])
+    del batches
+
+    def dashboard():
+        channel_video_summary(channel_id)
+        load_top_videos(channel_id, 10)
+        load_monthly_posts(channel_id)
+        # The DB path of data_cache.load_stored_videos (no snapshot here)
+        return downsample_points(compact_video_frame(load_video_frame(channel_id)))
+
+    _, seconds, peak = _measure(dashboard)
+    _, rebuild_seconds, _ = _measure(lambda: _rebuild(engine, rebuild_aggregates, channel_id))
+    aggregate = _phase(seconds, peak, videos, rebuild_seconds=round(rebuild_seconds, 4))
+
+    return {"videos": videos, "extract": extract, "persist": persist, "aggregate": aggregate}
+
+
+def _rebuild(engine, rebuild_aggregates, channel_id):
+    with engine.begin() as conn:
+        rebuild_aggregates(conn, channel_id)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, tolerance):
+    """Lines describing each phase metric against the baseline, plus the list of regressions."""
+    lines, regressions = [], []
+    for size, phases in current["results"].items():
+        base_phases = baseline.get("results", {}).get(size)
+        if base_phases is None:
+            continue
+        for phase in ("extract", "persist", "aggregate"):
+            for metric in COMPARED_METRICS:
+                now, before = phases[phase][metric], base_phases.get(phase, {}).get(metric)
+                if not before:
+                    continue
+                ratio = now / before
+                flag = ""
+                if ratio > 1 + tolerance:
+                    flag = "  REGRESSION"
+                    regressions.append(f"{size} {phase} {metric}")
+                lines.append(f"{size:>8} {phase:<10}{metric:<9}{before:>10.3f} -> {now:>10.3f}  x{ratio:.2f}{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--workers", type=int, default=4, help="videos().list worker threads")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    # Configure the app for the offline server before anything reads the environment
+    workdir = tempfile.mkdtemp(prefix="yt_e2e_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["YOUTUBE_API_KEY"] = "offline-benchmark"
+    os.environ["YOUTUBE_HTTP_CACHE"] = "off"
+    os.environ["YOUTUBE_REQUESTS_PER_SECOND"] = "0"
+
+    server = start_server(sizes, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    os.environ["YOUTUBE_API_ENDPOINT"] = server.url
+
+    from data_processing.api_scheduler import QuotaScheduler, set_scheduler
+    from database.init_db import migrate
+    from database.db_config import engine
+
+    set_scheduler(QuotaScheduler(daily_budget=10**9, requests_per_second=0, wait_max=0.5))
+    migrate(engine)
+
+    results = {
+        "meta": {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workers": args.workers,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+        },
+        "results": {},
+    }
+
+    print(f"{'videos':>8} {'phase':<10}{'seconds':>9}{'videos/s':>11}{'peak MB':>9}")
+    try:
+        for size in sizes:
+            result = run_size(size, server, args.workers)
+            results["results"][str(size)] = result
+            for phase in ("extract", "persist", "aggregate"):
+                stats = result[phase]
+                print(f"{size:>8} {phase:<10}{stats['seconds']:>9.3f}{stats['videos_per_second']:>11.0f}"
+                      f"{stats['peak_mb']:>9.1f}")
+    finally:
+        server.shutdown()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nAgainst {args.baseline} (commit {baseline.get('meta', {}).get('commit')}):")
+        print("\n".join(lines) or "  no matching sizes")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
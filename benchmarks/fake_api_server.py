@@ -0,0 +1,269 @@
+"""
+Offline stand-in for the YouTube Data API v3 over real HTTP.
+
+Serves channels.list, playlistItems.list and videos.list from synthetic
+catalogs (one channel per catalog size), so the real googleapiclient stack
+(discovery client, httplib2, response cache, QuotaScheduler retries) can be
+exercised and timed without network access or quota. Point the app at it
+with YOUTUBE_API_ENDPOINT.
+
+- Catalog videos are generated deterministically from their index, so a
+  100k-video catalog costs no memory until its pages are requested
+- latency_ms / jitter_ms delay every response
+- error_rate answers that share of requests with a retryable 503
+  (backendError); quota_limit answers 403 quotaExceeded once that many
+  requests have been served
+
+    python benchmarks/fake_api_server.py --sizes 1000,10000,100000 --port 8765 --latency-ms 20
+    YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765/ YOUTUBE_API_KEY=fake streamlit run streamlit_app/app.py
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+MAX_RESULTS = 50
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+WORDS = (
+    "python tutorial review unboxing vlog travel cooking recipe guitar lesson gaming "
+    "highlights music live stream interview podcast science history football training "
+    "workout budget camera drone coffee"
+).split()
+
+
+def catalog_channel_id(size):
+    """24-character channel ID of the synthetic catalog with `size` videos."""
+    return f"UCfake{size:018d}"
+
+
+class Catalog:
+    """A channel whose uploads are generated from their playlist position (0 = newest)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.channel_id = catalog_channel_id(size)
+        self.playlist_id = "UU" + self.channel_id[2:]
+        self._prefix = f"F{size}x"
+
+    def video_id(self, index):
+        return f"{self._prefix}{index:07d}"
+
+    def index_of(self, video_id):
+        if not video_id.startswith(self._prefix):
+            return None
+        try:
+            index = int(video_id[len(self._prefix):])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.size else None
+
+    def channel_item(self):
+        return {
+            "id": self.channel_id,
+            "snippet": {
+                "title": f"Synthetic catalog ({self.size} videos)",
+                "customUrl": f"@synthetic{self.size}",
+                "description": "Offline benchmark channel",
+                "publishedAt": "2010-01-01T00:00:00Z",
+                "thumbnails": {size: {"url": f"https://yt3.example/{self.channel_id}/{size}.jpg"}
+                               for size in ("default", "medium", "high")},
+            },
+            "statistics": {
+                "subscriberCount": str(self.size * 37),
+                "videoCount": str(self.size),
+                "viewCount": str(self.size * 25_000),
+            },
+            "contentDetails": {"relatedPlaylists": {"uploads": self.playlist_id}},
+        }
+
+    def _views(self, index):
+        # Older videos have more views, with a long tail of hits
+        return (self.size - index) * 13 + (index * 7919) % 100_003 * (50 if index % 97 == 0 else 1)
+
+    def video_item(self, index, parts):
+        video_id = self.video_id(index)
+        item = {"id": video_id}
+        if "snippet" in parts:
+            rng = random.Random(index)
+            title = " ".join(rng.choice(WORDS) for _ in range(6))
+            item["snippet"] = {
+                "title": title.capitalize(),
+                "description": " ".join(rng.choice(WORDS) for _ in range(45)),
+                "publishedAt": (EPOCH - timedelta(hours=7 * index)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "thumbnails": {
+                    "default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"},
+                    "medium": {"url": f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"},
+                    "high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"},
+                },
+            }
+        if "contentDetails" in parts:
+            minutes, seconds = divmod(60 + (index * 131) % 3600, 60)
+            item["contentDetails"] = {"duration": f"PT{minutes}M{seconds}S"}
+        if "statistics" in parts:
+            views = self._views(index)
+            item["statistics"] = {
+                "viewCount": str(views),
+                "likeCount": str(views // 40),
+                "commentCount": str(views // 900),
+            }
+        return item
+
+
+class FakeYouTubeServer(ThreadingHTTPServer):
+    """HTTP server holding the catalogs, fault settings and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, sizes, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 quota_limit=None, seed=0):
+        super().__init__(address, _Handler)
+        self.catalogs = [Catalog(size) for size in sizes]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota_limit = quota_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.errors = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def catalog(self, channel_id=None, playlist_id=None):
+        for catalog in self.catalogs:
+            if channel_id == catalog.channel_id or playlist_id == catalog.playlist_id:
+                return catalog
+        return None
+
+    def fault(self, endpoint):
+        """(status, reason) to fail this request with, or None; counts the request."""
+        with self._lock:
+            served = sum(self.requests.values())
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            if self.quota_limit is not None and served >= self.quota_limit:
+                self.errors += 1
+                return 403, "quotaExceeded"
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                return 503, "backendError"
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {"requests": dict(self.requests), "errors": self.errors}
+
+    # --- endpoints ---
+    def channels_list(self, query):
+        items = []
+        for cid in query.get("id", "").split(","):
+            catalog = self.catalog(channel_id=cid)
+            if catalog is not None:
+                items.append(catalog.channel_item())
+        return {"kind": "youtube#channelListResponse", "items": items}
+
+    def playlistItems_list(self, query):
+        catalog = self.catalog(playlist_id=query.get("playlistId"))
+        if catalog is None:
+            return None
+        start = int(query.get("pageToken") or 0)
+        count = min(int(query.get("maxResults", 5)), MAX_RESULTS)
+        response = {
+            "kind": "youtube#playlistItemListResponse",
+            "items": [{"contentDetails": {"videoId": catalog.video_id(i)}}
+                      for i in range(start, min(start + count, catalog.size))],
+            "pageInfo": {"totalResults": catalog.size, "resultsPerPage": count},
+        }
+        if start + count < catalog.size:
+            response["nextPageToken"] = str(start + count)
+        return response
+
+    def videos_list(self, query):
+        parts = set(query.get("part", "").split(","))
+        items = []
+        for video_id in query.get("id", "").split(",")[:MAX_RESULTS]:
+            for catalog in self.catalogs:
+                index = catalog.index_of(video_id)
+                if index is not None:
+                    items.append(catalog.video_item(index, parts))
+                    break
+        return {"kind": "youtube#videoListResponse", "items": items}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        handler = getattr(self.server, f"{endpoint}_list", None)
+        if handler is None:
+            return self._error(404, "notFound")
+
+        fault = self.server.fault(endpoint)
+        if fault is not None:
+            return self._error(*fault)
+
+        body = handler(dict(parse_qsl(url.query)))
+        if body is None:
+            return self._error(404, "playlistNotFound")
+        self._send(200, body)
+
+    def _error(self, status, reason):
+        self._send(status, {"error": {"code": status, "message": reason,
+                                      "errors": [{"reason": reason, "domain": "youtube"}]}})
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(sizes, host="127.0.0.1", port=0, **faults):
+    """Starts a FakeYouTubeServer on a background thread; call .shutdown() to stop it."""
+    server = FakeYouTubeServer((host, port), sizes, **faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-limit", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeYouTubeServer(
+        (args.host, args.port), [int(s) for s in args.sizes.split(",")], latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate, quota_limit=args.quota_limit,
+    )
+    print(f"Serving on {server.url} (set YOUTUBE_API_ENDPOINT={server.url})")
+    for catalog in server.catalogs:
+        print(f"  {catalog.channel_id}  {catalog.size} videos")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Videos-page search latency on a large single-channel archive.
+
+Seeds a synthetic archive, builds the search index and times the two
+queries the Videos page runs per search: the match count and the first
+page of results (by relevance and by views). Reports median and p95
+milliseconds per backend.
+
+    python benchmarks/search_index.py
+    python benchmarks/search_index.py --videos 20000 --backends fts5
+"""
+import os
+import sys
+import time
+import random
+import itertools
+import argparse
+import tempfile
+import statistics
+
+from sqlalchemy import insert
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+CHANNEL_ID = "UC_BENCHMARK_SEARCH_0001"
+COMMON_WORDS = (
+    "python tutorial review unboxing vlog travel cooking recipe guitar lesson "
+    "gaming highlights music live stream interview podcast science history "
+    "football training workout budget camera drone coffee"
+).split()
+QUERIES = ["python", "tut", "cooking recipe", "drone cam", "gaming live highlights", "zzz"]
+
+
+def _vocabulary(rng, size=20_000):
+    """Common words up front plus pseudo-words; word frequency follows Zipf's law."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = COMMON_WORDS + ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    return words, cum_weights
+
+
+def _seed(engine, videos):
+    from database.models import Base, Video, VideoLatestStats
+    from datetime import datetime
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    words, cum_weights = _vocabulary(rng)
+    now = datetime(2025, 1, 1)
+    rows = [
+        {"video_id": f"SRCH{i:07d}", "channel_id": CHANNEL_ID,
+         "title": " ".join(rng.choices(words, cum_weights=cum_weights, k=6)),
+         "description": " ".join(rng.choices(words, cum_weights=cum_weights, k=40)),
+         "published_at": now}
+        for i in range(videos)
+    ]
+    with engine.begin() as conn:
+        for i in range(0, len(rows), 5000):
+            conn.execute(insert(Video), rows[i:i + 5000])
+            conn.execute(insert(VideoLatestStats), [
+                {"video_id": r["video_id"], "channel_id": CHANNEL_ID, "view_count": rng.randint(0, 10**6),
+                 "like_count": 0, "comment_count": 0, "record_date": now, "checked_at": now}
+                for r in rows[i:i + 5000]
+            ])
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=100_000)
+    parser.add_argument("--backends", default="fts5,memory")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # The database layer reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='yt_bench_'), 'search.db')}"
+    from database import search
+    from database.db_config import engine
+    from database.queries import count_videos, fetch_video_page
+
+    _seed(engine, args.videos)
+    print(f"{args.videos} videos\n{'backend':<10}{'query':<26}{'matches':>9}{'count p50':>11}"
+          f"{'page p50':>10}{'page p95':>10}{'views p50':>11}")
+
+    for backend in args.backends.split(","):
+        search.SEARCH_BACKEND = backend
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            search.ensure_search_index(conn)
+        count_videos(CHANNEL_ID, "warmup")
+        print(f"{backend:<10}{'(build index)':<26}{'':>9}{(time.perf_counter() - start) * 1000:>10.0f}ms")
+
+        for query in QUERIES:
+            matches = count_videos(CHANNEL_ID, query)
+            count_p50, _ = _time(lambda: count_videos(CHANNEL_ID, query), args.repeat)
+            page_p50, page_p95 = _time(lambda: fetch_video_page(CHANNEL_ID, sort="relevance", search=query), args.repeat)
+            views_p50, _ = _time(lambda: fetch_video_page(CHANNEL_ID, sort="view_count", search=query), args.repeat)
+            print(f"{backend:<10}{query:<26}{matches:>9}{count_p50:>11.1f}{page_p50:>10.1f}"
+                  f"{page_p95:>10.1f}{views_p50:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
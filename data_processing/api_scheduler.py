@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from googleapiclient.errors import HttpError
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from database.instrumentation import increment, set_gauge, span
+from database.quota import DatabaseQuotaLedger
+
+# Quota units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+    "search.list": 100,
+}
+DEFAULT_COST = 1
+
+DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", "10"))
+BURST = int(os.getenv("YOUTUBE_REQUEST_BURST", "20"))
+MAX_ATTEMPTS = int(os.getenv("YOUTUBE_MAX_ATTEMPTS", "5"))
+# Where the process-wide scheduler keeps the daily spend: memory (this
+# process) or db (the quota_spend table, shared with other processes)
+QUOTA_LEDGER = os.getenv("YOUTUBE_QUOTA_LEDGER", "memory").lower()
+
+# The daily quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+TRANSIENT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+class QuotaExhaustedError(Exception):
+    """Raised instead of calling the API once the daily quota budget is spent."""
+
+    def __init__(self, message, spent=None, budget=None):
+        super().__init__(message)
+        self.spent = spent
+        self.budget = budget
+
+
+def _error_reasons(error):
+    """Extracts the `reason` values from a YouTube HttpError payload."""
+    details = getattr(error, "error_details", None)
+    if isinstance(details, list) and details:
+        return {d.get("reason") for d in details if isinstance(d, dict)}
+    try:
+        payload = json.loads(error.content.decode("utf-8"))
+        return {e.get("reason") for e in payload["error"].get("errors", [])}
+    except Exception:
+        return set()
+
+
+def is_transient(error):
+    """True for errors worth retrying: 429/5xx, rate limits and connection failures."""
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        if status in TRANSIENT_STATUSES:
+            return True
+        return status == 403 and bool(_error_reasons(error) & TRANSIENT_REASONS)
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def _is_quota_error(error):
+    return (
+        isinstance(error, HttpError)
+        and error.resp.status == 403
+        and bool(_error_reasons(error) & QUOTA_REASONS)
+    )
+
+
+def endpoint_of(request):
+    """`youtube.videos.list` -> `videos.list`"""
+    method_id = getattr(request, "methodId", None) or "unknown"
+    return method_id.split(".", 1)[1] if method_id.startswith("youtube.") else method_id
+
+
+class TokenBucket:
+    """Classic token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuotaLedger:
+    """
+    Quota units spent per quota day, kept in this process (the default).
+    DatabaseQuotaLedger (database/quota.py) has the same interface and
+    shares the spend with other processes.
+    """
+
+    def __init__(self):
+        self._spent = {}
+        self._lock = threading.Lock()
+
+    def spent(self, day):
+        with self._lock:
+            return self._spent.get(day, 0)
+
+    def charge(self, day, cost, budget=None):
+        """
+        Adds `cost` units to the day's spend unless that would exceed
+        `budget` (None: unconditionally). Returns (charged, units spent).
+        """
+        with self._lock:
+            spent = self._spent.get(day, 0)
+            if budget is not None and spent + cost > budget:
+                return False, spent
+            self._spent[day] = spent + cost
+            return True, spent + cost
+
+    def exhaust(self, day, units):
+        """Raises the day's spend to at least `units`."""
+        with self._lock:
+            self._spent[day] = max(self._spent.get(day, 0), units)
+
+
+def _served_from_cache(request):
+    """True when the request's HTTP layer holds a fresh cached response for it."""
+    is_fresh = getattr(getattr(request, "http", None), "is_fresh", None)
+    return is_fresh is not None and getattr(request, "method", "GET") == "GET" and is_fresh(request.uri)
+
+
+class QuotaScheduler:
+    """
+    Central gate for every YouTube API call.
+    - Charges quota units per endpoint against a daily budget; the spend is
+      kept in `ledger` (this process only unless a DatabaseQuotaLedger is
+      passed, which shares one spend between processes and restarts, each
+      scheduler's budget capping that shared spend)
+    - Rate limits with a token bucket
+    - Retries transient errors with jittered exponential backoff
+    - Raises QuotaExhaustedError once the budget (or YouTube's quota) is spent
+    Requests answered from the fresh response cache are neither charged nor
+    rate limited, since they never reach the API.
+    """
+
+    def __init__(self, daily_budget=DAILY_QUOTA, requests_per_second=REQUESTS_PER_SECOND,
+                 burst=BURST, max_attempts=MAX_ATTEMPTS, wait_max=30, ledger=None):
+        self.daily_budget = daily_budget
+        self.max_attempts = max_attempts
+        self.wait_max = wait_max
+        self.ledger = ledger or QuotaLedger()
+        self._bucket = TokenBucket(requests_per_second, burst) if requests_per_second > 0 else None
+        self._lock = threading.Lock()
+        self._day = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._day = self._today()
+        self._by_endpoint = {}
+        self._calls = 0
+        self._retries = 0
+        self._cache_hits = 0
+
+    def _today(self):
+        return datetime.now(QUOTA_TIMEZONE).date()
+
+    def _roll_day(self):
+        if self._today() != self._day:
+            self._reset_counters()
+
+    def _current_day(self):
+        with self._lock:
+            self._roll_day()
+            return self._day
+
+    def remaining(self):
+        return max(0, self.daily_budget - self.ledger.spent(self._current_day()))
+
+    def _charge(self, endpoint, cost, enforce=True):
+        day = self._current_day()
+        charged, spent = self.ledger.charge(day, cost, self.daily_budget if enforce else None)
+        if not charged:
+            self._publish_quota(spent)
+            raise QuotaExhaustedError(
+                f"YouTube API quota budget exhausted ({spent}/{self.daily_budget} units "
+                f"spent today); {endpoint} needs {cost}.",
+                spent=spent, budget=self.daily_budget
+            )
+        with self._lock:
+            self._by_endpoint[endpoint] = self._by_endpoint.get(endpoint, 0) + cost
+            self._calls += 1
+        self._publish_quota(spent)
+        increment("youtube_quota_units_total", cost, endpoint=endpoint)
+
+    def _count_cache_hit(self, endpoint):
+        with self._lock:
+            self._cache_hits += 1
+        increment("youtube_api_cache_hits_total", endpoint=endpoint)
+
+    def _mark_exhausted(self):
+        # YouTube's own quota is gone: every scheduler on the ledger stops
+        spent = max(self.daily_budget, DAILY_QUOTA)
+        self.ledger.exhaust(self._current_day(), spent)
+        self._publish_quota(spent)
+
+    def _publish_quota(self, spent):
+        set_gauge("youtube_quota_spent_units", spent)
+        set_gauge("youtube_quota_remaining_units", max(0, self.daily_budget - spent))
+        set_gauge("youtube_quota_budget_units", self.daily_budget)
+
+    def _execute(self, request, endpoint):
+        try:
+            with span(f"api.{endpoint}"):
+                response = request.execute()
+        except HttpError as e:
+            increment("youtube_api_requests_total", endpoint=endpoint, outcome=f"http_{e.resp.status}")
+            if _is_quota_error(e):
+                self._mark_exhausted()
+                raise QuotaExhaustedError(
+                    f"YouTube rejected {endpoint}: daily quota exceeded.",
+                    spent=self.daily_budget, budget=self.daily_budget
+                ) from e
+            raise
+
+        increment("youtube_api_requests_total", endpoint=endpoint, outcome="ok")
+        return response
+
+    def _attempt(self, request, endpoint, cost):
+        if _served_from_cache(request):
+            response = self._execute(request, endpoint)
+            if getattr(request.http, "last_request_source", None) == "cache":
+                self._count_cache_hit(endpoint)
+                return response
+            # The entry expired in between and the call reached the API
+            self._charge(endpoint, cost, enforce=False)
+            return response
+
+        self._charge(endpoint, cost)
+        if self._bucket is not None:
+            self._bucket.acquire()
+        return self._execute(request, endpoint)
+
+    def _before_retry(self, retry_state):
+        with self._lock:
+            self._retries += 1
+        increment("youtube_api_retries_total", endpoint=retry_state.args[1])
+
+    def execute(self, request, endpoint=None, cost=None):
+        """Executes a googleapiclient request under quota, rate limit and retry policy."""
+        endpoint = endpoint or endpoint_of(request)
+        cost = cost if cost is not None else QUOTA_COSTS.get(endpoint, DEFAULT_COST)
+
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=self.wait_max),
+            retry=retry_if_exception(is_transient),
+            before_sleep=self._before_retry,
+            reraise=True,
+        )
+        return retrying(self._attempt, request, endpoint, cost)
+
+    def usage(self):
+        """
+        Quota spent today (on the ledger), plus this scheduler's spend per
+        endpoint and call/retry/cache-hit counters.
+        """
+        day = self._current_day()
+        spent = self.ledger.spent(day)
+        with self._lock:
+            return {
+                "day": day.isoformat(),
+                "budget": self.daily_budget,
+                "spent": spent,
+                "remaining": max(0, self.daily_budget - spent),
+                "by_endpoint": dict(self._by_endpoint),
+                "calls": self._calls,
+                "retries": self._retries,
+                "cache_hits": self._cache_hits,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler shared by all extractors (ledger per YOUTUBE_QUOTA_LEDGER)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QuotaScheduler(ledger=DatabaseQuotaLedger() if QUOTA_LEDGER == "db" else None)
+        return _scheduler
+
+
+def set_scheduler(scheduler):
+    """Replaces the process-wide scheduler (e.g. with a different budget)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
+
+
+def execute_request(request, endpoint=None):
+    """Shorthand for get_scheduler().execute(request)."""
+    return get_scheduler().execute(request, endpoint=endpoint)
@@ -1,5 +1,7 @@
 import os
 import sys
+from dataclasses import dataclass, field
+from collections import deque
 import pandas as pd
 from googleapiclient.errors import HttpError
 
@@ -9,60 +11,161 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from streamlit_app.youtube_auth import get_youtube_service
+from data_processing.api_scheduler import QuotaExhaustedError, execute_request
+from data_processing.normalize import CHANNEL_FIELDS, normalize_channels
+from data_processing.video_extractor import _fetch_executor
+from database.persistence import save_channels_to_db
+from database.instrumentation import span
 
+# channels().list accepts at most 50 IDs per call
+CHANNEL_BATCH_SIZE = 50
 
-def extract_channel_data(channel_ids):
+# Concurrent channels().list calls; 1 disables the worker pool
+MAX_WORKERS = int(os.getenv("YOUTUBE_MAX_WORKERS", "4"))
+
+COLUMNS = list(CHANNEL_FIELDS)
+
+
+@dataclass
+class ChannelSyncResult:
+    """Outcome of sync_channels()."""
+    requested: int = 0
+    saved: int = 0
+    inserted: int = 0
+    updated: int = 0
+    invalid_ids: list = field(default_factory=list)
+    failed_ids: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+
+def _unique_ids(channel_ids):
+    """Strips blanks and duplicates while keeping the caller's order."""
+    seen = set()
+    unique = []
+    for cid in channel_ids:
+        cid = (cid or "").strip()
+        if cid and cid not in seen:
+            seen.add(cid)
+            unique.append(cid)
+    return unique
+
+
+def _chunk_ids(channel_ids):
+    return [channel_ids[i:i + CHANNEL_BATCH_SIZE] for i in range(0, len(channel_ids), CHANNEL_BATCH_SIZE)]
+
+
+@span("extract.channels")
+def _fetch_channel_chunk(batch_ids):
+    """One channels().list call for at most 50 IDs, on the shared client."""
+    youtube = get_youtube_service()
+    request = youtube.channels().list(
+        part="snippet,statistics",
+        id=",".join(batch_ids),
+        maxResults=CHANNEL_BATCH_SIZE
+    )
+    return execute_request(request).get("items", [])
+
+
+def iter_channel_batches(channel_ids, max_workers=MAX_WORKERS):
+    """
+    Fetches channels in 50-ID chunks, running the chunks concurrently on
+    the process-wide fetch pool, at most 2 * max_workers chunks ahead of
+    the consumer. Yields (batch_ids, DataFrame, error) per chunk in input
+    order; `error` is the HttpError for a failed chunk, otherwise None.
+    QuotaExhaustedError propagates and stops the stream.
+    """
+    chunks = _chunk_ids(_unique_ids(channel_ids))
+    if not chunks:
+        return
+
+    def fetch(batch_ids):
+        try:
+            return _fetch_channel_chunk(batch_ids), None
+        except HttpError as e:
+            return [], e
+
+    if max_workers <= 1 or len(chunks) == 1:
+        for batch_ids in chunks:
+            items, error = fetch(batch_ids)
+            yield batch_ids, normalize_channels(items), error
+        return
+
+    executor = _fetch_executor(max_workers)
+    max_in_flight = 2 * max_workers
+    pending = deque()
+
+    def drain(limit):
+        while len(pending) > limit:
+            batch_ids, future = pending.popleft()
+            items, error = future.result()
+            yield batch_ids, normalize_channels(items), error
+
+    try:
+        for batch_ids in chunks:
+            pending.append((batch_ids, executor.submit(fetch, batch_ids)))
+            yield from drain(max_in_flight)
+        yield from drain(0)
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def extract_channel_data(channel_ids, max_workers=MAX_WORKERS):
     """
     Extract YouTube channel data.
     - Returns data for valid channel IDs
-    - Gracefully ignores invalid IDs
-    - Never crashes the application
+    - Gracefully ignores invalid IDs (listed in df.attrs["invalid_ids"])
+    - Handles any number of IDs by chunking into 50-ID requests
+    - Never crashes the application, except for QuotaExhaustedError when
+      the daily API budget is spent
     """
-
-    youtube = get_youtube_service()
-    all_channel_data = []
+    frames = []
+    invalid_ids = []
 
     try:
-        request = youtube.channels().list(
-            part="snippet,statistics",
-            id=",".join(channel_ids)
-        )
-        response = request.execute()
-
-        returned_items = response.get("items", [])
-
-        # Identify invalid IDs
-        returned_ids = {item["id"] for item in returned_items}
-        invalid_ids = list(set(channel_ids) - returned_ids)
-
-        if invalid_ids:
-            print(f"⚠️ Invalid Channel IDs ignored: {invalid_ids}")
-
-        for channel in returned_items:
-            snippet = channel.get("snippet", {})
-            stats = channel.get("statistics", {})
-            thumbnails = snippet.get("thumbnails", {})
-
-            all_channel_data.append({
-                "channel_id": channel.get("id"),
-                "channel_name": snippet.get("title"),
-                "custom_url": snippet.get("customUrl"),
-                "description": snippet.get("description"),
-                "published_at": snippet.get("publishedAt"),
-                "subscriber_count": stats.get("subscriberCount"),
-                "video_count": stats.get("videoCount"),
-                "view_count": stats.get("viewCount"),
-                "thumbnail_default": thumbnails.get("default", {}).get("url"),
-                "thumbnail_medium": thumbnails.get("medium", {}).get("url"),
-                "thumbnail_high": thumbnails.get("high", {}).get("url"),
-            })
-
-        return pd.DataFrame(all_channel_data)
-
-    except HttpError as e:
-        print(f"❌ YouTube API error: {e}")
-        return pd.DataFrame()
+        for batch_ids, df, error in iter_channel_batches(channel_ids, max_workers=max_workers):
+            if error is not None:
+                print(f"❌ YouTube API error: {error}")
+                continue
+            frames.append(df)
+            returned_ids = set(df["channel_id"])
+            invalid_ids.extend(cid for cid in batch_ids if cid not in returned_ids)
+
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        result.attrs["invalid_ids"] = invalid_ids
+        return result
+
+    except QuotaExhaustedError:
+        raise
 
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         return pd.DataFrame()
+
+
+def sync_channels(channel_ids, max_workers=MAX_WORKERS):
+    """
+    Refreshes many channels (e.g. a watchlist of thousands) into the database.
+    - 50-ID channels().list chunks run concurrently
+    - Each chunk is bulk-upserted as soon as it arrives
+    - Invalid IDs and failed chunks are reported in a ChannelSyncResult
+    QuotaExhaustedError propagates; chunks saved before it stay saved.
+    """
+    result = ChannelSyncResult(requested=len(_unique_ids(channel_ids)))
+
+    for batch_ids, df, error in iter_channel_batches(channel_ids, max_workers=max_workers):
+        if error is not None:
+            result.failed_ids.extend(batch_ids)
+            result.errors.append(str(error))
+            continue
+
+        returned_ids = set(df["channel_id"])
+        result.invalid_ids.extend(cid for cid in batch_ids if cid not in returned_ids)
+
+        if not df.empty:
+            summary = save_channels_to_db(df)
+            result.inserted += summary["inserted"]
+            result.updated += summary["updated"]
+            result.saved += summary["inserted"] + summary["updated"]
+
+    return result
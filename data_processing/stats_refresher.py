@@ -0,0 +1,257 @@
+"""
+Headless statistics refresher for every channel in the `channels` table.
+
+Each cycle picks the videos whose statistics are due, most overdue first,
+and snapshots them with statistics-only videos().list calls of 50 IDs.
+How often a video is due depends on its age: recent uploads change fast
+and are polled often, the back catalog rarely (REFRESH_TIERS). Spending is
+paced so the configured daily quota lasts until the Pacific-time reset.
+
+    python -m data_processing.stats_refresher            # run until stopped
+    python -m data_processing.stats_refresher --once     # a single cycle
+    python -m data_processing.stats_refresher --channel UC... --daily-quota 2000
+"""
+import os
+import sys
+import math
+import signal
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Float, select, or_, and_, case, func, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from streamlit_app.youtube_auth import get_youtube_service
+from data_processing.api_scheduler import QuotaExhaustedError, QuotaScheduler, QUOTA_COSTS, QUOTA_TIMEZONE
+from data_processing.video_extractor import BATCH_SIZE, STATS_PARTS
+from data_processing.normalize import normalize_statistics
+from database.db_config import SessionLocal
+from database.models import Channel, Video, VideoLatestStats
+from database.persistence import save_statistics_to_db
+from database.quota import DatabaseQuotaLedger
+from database.instrumentation import write_textfile
+
+RECENT_DAYS = int(os.getenv("STATS_RECENT_DAYS", "7"))
+
+# (videos published less than this long ago, refresh at most this often);
+# the last tier (None) is the back catalog, including unknown publish dates
+REFRESH_TIERS = [
+    (timedelta(days=RECENT_DAYS), timedelta(minutes=int(os.getenv("STATS_RECENT_INTERVAL_MINUTES", "60")))),
+    (timedelta(days=30), timedelta(hours=12)),
+    (None, timedelta(hours=int(os.getenv("STATS_BACKLOG_INTERVAL_HOURS", "168")))),
+]
+
+# Seconds between cycles, and the day's quota spend (all processes) at
+# which the refresher stops
+POLL_SECONDS = int(os.getenv("STATS_REFRESH_POLL_SECONDS", "300"))
+REFRESH_DAILY_QUOTA = int(os.getenv("STATS_REFRESH_DAILY_QUOTA", "5000"))
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def refresh_interval(published_at, now):
+    """Refresh interval for a video published at `published_at` (naive UTC or None)."""
+    age = now - published_at if published_at is not None else None
+    for max_age, interval in REFRESH_TIERS:
+        if max_age is None or (age is not None and age < max_age):
+            return interval
+    return REFRESH_TIERS[-1][1]
+
+
+def _due_clause(now):
+    """Videos whose latest check is older than their tier's interval (or never checked)."""
+    clauses = []
+    younger = None  # upper age bound of the previous tier
+    for max_age, interval in REFRESH_TIERS:
+        conditions = [or_(VideoLatestStats.checked_at.is_(None), VideoLatestStats.checked_at <= now - interval)]
+        if max_age is not None:
+            conditions.append(Video.published_at > now - max_age)
+        if younger is not None:
+            older = Video.published_at <= now - younger
+            conditions.append(older if max_age is not None else or_(Video.published_at.is_(None), older))
+        clauses.append(and_(*conditions))
+        younger = max_age
+    return or_(*clauses)
+
+
+class _epoch_seconds(FunctionElement):
+    """Seconds since 1970-01-01 of a naive UTC DateTime column, as a float."""
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(_epoch_seconds)
+def _epoch_seconds_default(element, compiler, **kw):
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(_epoch_seconds, "sqlite")
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    return f"((julianday({compiler.process(element.clauses, **kw)}) - 2440587.5) * 86400.0)"
+
+
+@compiles(_epoch_seconds, "mysql")
+@compiles(_epoch_seconds, "mariadb")
+def _epoch_seconds_mysql(element, compiler, **kw):
+    # Not UNIX_TIMESTAMP(): that reads the value in the session time zone
+    return f"TIMESTAMPDIFF(MICROSECOND, '1970-01-01', {compiler.process(element.clauses, **kw)}) / 1000000.0"
+
+
+def _interval_seconds(now):
+    """SQL CASE mirroring refresh_interval(): the video's tier interval in seconds."""
+    whens = [(Video.published_at > now - max_age, interval.total_seconds())
+             for max_age, interval in REFRESH_TIERS if max_age is not None]
+    return case(*whens, else_=REFRESH_TIERS[-1][1].total_seconds())
+
+
+def _due_select(columns, now, channel_ids):
+    stmt = (
+        select(*columns)
+        .select_from(Video)
+        .join(Channel, Channel.channel_id == Video.channel_id)
+        .outerjoin(VideoLatestStats, VideoLatestStats.video_id == Video.video_id)
+        .where(_due_clause(now))
+    )
+    if channel_ids is not None:
+        stmt = stmt.where(Channel.channel_id.in_(list(channel_ids)))
+    return stmt
+
+
+def due_videos(now=None, limit=None, channel_ids=None):
+    """
+    Video IDs of tracked channels (or of `channel_ids`) that are due for a
+    refresh, highest priority first (at most `limit`). Priority is how many
+    refresh intervals have passed since the last check (never checked
+    first), newest uploads breaking ties. Ranking and LIMIT run in SQL.
+    """
+    now = now or _utcnow()
+    now_seconds = (now - datetime(1970, 1, 1)).total_seconds()
+    overdue = (literal(now_seconds) - _epoch_seconds(VideoLatestStats.checked_at)) / _interval_seconds(now)
+    stmt = _due_select([Video.video_id], now, channel_ids).order_by(
+        VideoLatestStats.checked_at.is_not(None),
+        overdue.desc(),
+        Video.published_at.is_(None),
+        Video.published_at.desc(),
+        Video.video_id,
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    db = SessionLocal()
+    try:
+        return list(db.scalars(stmt))
+    finally:
+        db.close()
+
+
+def count_due_videos(now=None, channel_ids=None):
+    """Number of videos due_videos() would return without a limit."""
+    db = SessionLocal()
+    try:
+        return db.execute(_due_select([func.count()], now or _utcnow(), channel_ids)).scalar() or 0
+    finally:
+        db.close()
+
+
+class StatsRefresher:
+    """
+    Runs refresh cycles against a QuotaScheduler of its own on the shared
+    quota ledger: it stops once the day's spend across processes reaches
+    `daily_quota`, leaving the rest of the quota to the app.
+    """
+
+    def __init__(self, daily_quota=REFRESH_DAILY_QUOTA, poll_seconds=POLL_SECONDS, scheduler=None,
+                 channel_ids=None):
+        self.poll_seconds = poll_seconds
+        self.channel_ids = channel_ids
+        self.scheduler = scheduler or QuotaScheduler(daily_budget=daily_quota, ledger=DatabaseQuotaLedger())
+        self._stop = threading.Event()
+
+    def _cycles_left_today(self):
+        now = datetime.now(QUOTA_TIMEZONE)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(1, math.ceil((midnight - now).total_seconds() / max(1, self.poll_seconds)))
+
+    def calls_allowed(self):
+        """videos().list calls for this cycle: the remaining quota spread over the cycles left today."""
+        cost = QUOTA_COSTS["videos.list"]
+        return math.ceil(self.scheduler.remaining() / cost / self._cycles_left_today())
+
+    def run_once(self, now=None):
+        """
+        One refresh cycle. Returns a dict with due/requested/calls counts, the
+        persistence counts (statistics/skipped/missing) and quota_remaining.
+        """
+        now = now or _utcnow()
+        max_calls = self.calls_allowed()
+        video_ids = due_videos(now, limit=max_calls * BATCH_SIZE, channel_ids=self.channel_ids)
+        summary = {"due": count_due_videos(now, self.channel_ids), "requested": 0, "calls": 0,
+                   "statistics": 0, "skipped": 0, "missing": 0}
+
+        youtube = get_youtube_service() if video_ids else None
+        for i in range(0, len(video_ids), BATCH_SIZE):
+            batch_ids = video_ids[i:i + BATCH_SIZE]
+            try:
+                response = self.scheduler.execute(youtube.videos().list(part=STATS_PARTS, id=",".join(batch_ids)))
+            except QuotaExhaustedError as e:
+                print(f"⚠️ Quota budget spent, stopping this cycle: {e}")
+                break
+            stats = normalize_statistics(response.get("items", []))
+            counts = save_statistics_to_db(stats, checked_ids=batch_ids)
+            summary["requested"] += len(batch_ids)
+            summary["calls"] += 1
+            for key in ("statistics", "skipped", "missing"):
+                summary[key] += counts[key]
+
+        summary["quota_remaining"] = self.scheduler.remaining()
+        return summary
+
+    def run_forever(self):
+        """Runs cycles every poll_seconds until stop() is called."""
+        while not self._stop.is_set():
+            try:
+                summary = self.run_once()
+                print(f"🔄 {summary['requested']}/{summary['due']} due videos refreshed in "
+                      f"{summary['calls']} calls, {summary['statistics']} new snapshots, "
+                      f"{summary['quota_remaining']} quota units left today")
+            except Exception as e:
+                print(f"❌ Refresh cycle failed: {e}")
+            # No-op unless METRICS_TEXTFILE is set
+            write_textfile()
+            self._stop.wait(self.poll_seconds)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh video statistics for every tracked channel.")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--poll-seconds", type=int, default=POLL_SECONDS)
+    parser.add_argument("--daily-quota", type=int, default=REFRESH_DAILY_QUOTA)
+    parser.add_argument("--channel", action="append", dest="channel_ids",
+                        help="only refresh this channel (repeatable; default: all tracked channels)")
+    args = parser.parse_args(argv)
+
+    refresher = StatsRefresher(daily_quota=args.daily_quota, poll_seconds=args.poll_seconds,
+                               channel_ids=args.channel_ids)
+    if args.once:
+        print(refresher.run_once())
+        write_textfile()
+        return
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: refresher.stop())
+    refresher.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 import os
 import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import pandas as pd
 from googleapiclient.errors import HttpError
-import isodate
 
 # Add project root to Python path
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -10,98 +12,259 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from streamlit_app.youtube_auth import get_youtube_service
+from data_processing.api_scheduler import QuotaExhaustedError, execute_request
+from database.queries import get_known_video_ids, load_videos_from_db
+from database.instrumentation import span
+from data_processing.video_frame import compact_video_frame, thumbnail_urls
+from data_processing.normalize import VIDEO_FIELDS, normalize_videos, normalize_statistics
 
-def get_all_video_metadata(channel_id):
+# YouTube caps playlistItems/videos list calls at 50 IDs per request
+BATCH_SIZE = 50
+
+FULL_PARTS = "snippet,contentDetails,statistics"
+STATS_PARTS = "statistics"
+
+# Incremental mode stops paging the uploads playlist after this many
+# consecutive already-known video IDs (one full page by default), provided
+# the archive already holds as many videos as the channel reports.
+KNOWN_RUN_LIMIT = 50
+
+# Concurrent videos().list batch fetches; 1 disables the worker pool
+MAX_WORKERS = int(os.getenv("YOUTUBE_MAX_WORKERS", "4"))
+
+COLUMNS = list(VIDEO_FIELDS)
+NUMERIC_COLUMNS = ["duration_seconds", "view_count", "like_count", "comment_count"]
+
+
+def _get_uploads_playlist(youtube, channel_id):
     """
-    Extract detailed metadata for all videos in a YouTube channel.
-    - Uses pagination to handle channels with many videos.
-    - Handles missing fields gracefully.
-    - Returns a pandas DataFrame with processed numerical fields.
+    Returns (uploads playlist ID, the channel's public video count or None),
+    or (None, None) when the channel does not exist. Same quota cost as
+    asking for contentDetails alone.
     """
-    youtube = get_youtube_service()
-    
-    try:
-        # 1. Get the 'uploads' playlist ID for the channel
-        channel_response = youtube.channels().list(
-            part="contentDetails",
-            id=channel_id
-        ).execute()
+    channel_response = execute_request(youtube.channels().list(
+        part="contentDetails,statistics",
+        id=channel_id
+    ))
 
-        if not channel_response.get("items"):
-            print(f"⚠️ No channel found with ID: {channel_id}")
-            return pd.DataFrame()
+    if not channel_response.get("items"):
+        return None, None
 
-        uploads_playlist_id = channel_response["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+    item = channel_response["items"][0]
+    video_count = item.get("statistics", {}).get("videoCount")
+    return item["contentDetails"]["relatedPlaylists"]["uploads"], int(video_count) if video_count else None
 
-        # 2. Extract all video IDs from the uploads playlist with pagination
-        video_ids = []
-        next_page_token = None
 
-        while True:
-            playlist_response = youtube.playlistItems().list(
+def _iter_playlist_pages(youtube, playlist_id):
+    """Yields the list of video IDs on each page of a playlist (newest first)."""
+    next_page_token = None
+
+    while True:
+        with span("extract.playlist_page"):
+            playlist_response = execute_request(youtube.playlistItems().list(
                 part="contentDetails",
-                playlistId=uploads_playlist_id,
-                maxResults=50,
+                playlistId=playlist_id,
+                maxResults=BATCH_SIZE,
                 pageToken=next_page_token
-            ).execute()
+            ))
+
+        yield [item["contentDetails"]["videoId"] for item in playlist_response.get("items", [])]
+
+        next_page_token = playlist_response.get("nextPageToken")
+        if not next_page_token:
+            break
+
+
+@span("extract.video_details")
+def _fetch_batch(youtube, video_ids, part):
+    video_response = execute_request(youtube.videos().list(
+        part=part,
+        id=",".join(video_ids)
+    ))
+    return video_response.get("items", [])
+
+
+def _submit(executor, youtube, batch_ids, part):
+    """
+    Schedules one videos().list call (at most 50 IDs) and returns its future.
+    - With a pool, the call runs on a worker thread; the client is shared,
+      its transport lends each request its own pooled connection
+    - Without one, the call runs inline
+    """
+    if executor is None:
+        future = Future()
+        future.set_result(_fetch_batch(youtube, batch_ids, part))
+        return future
+    return executor.submit(_fetch_batch, youtube, batch_ids, part)
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _fetch_executor(max_workers):
+    """Long-lived worker pool of the given size, shared by every extraction in the process."""
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = _executors[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f"youtube-fetch-{max_workers}")
+        return executor
+
+
+def _to_frame(records):
+    """Builds the typed video DataFrame from record dicts or a frame with the same columns."""
+    df = pd.DataFrame(records, columns=COLUMNS)
+
+    if not df.empty:
+        # Type conversions for numerical fields
+        for col in NUMERIC_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+
+        # Convert published_at to datetime
+        df["published_at"] = pd.to_datetime(df["published_at"], utc=True)
+
+    return df
 
-            for item in playlist_response.get("items", []):
-                video_ids.append(item["contentDetails"]["videoId"])
 
-            next_page_token = playlist_response.get("nextPageToken")
-            if not next_page_token:
+@span("extract.merge_known")
+def _known_batch_frame(channel_id, items):
+    """
+    Stored metadata for already-archived videos joined with fresh statistics.
+    Only the statistics part was requested from the API for these videos.
+    Videos that no longer exist on YouTube are dropped.
+    """
+    stats = normalize_statistics(items)
+    if stats.empty:
+        return _to_frame([])
+
+    stored = load_videos_from_db(channel_id, video_ids=stats["video_id"].tolist())
+    merged = stats.merge(stored, on="video_id", how="inner")
+    for col, values in thumbnail_urls(merged["video_id"].tolist()).items():
+        merged[col] = values
+
+    return _to_frame(merged)
+
+
+def _batch_frame(channel_id, part, items):
+    if part == STATS_PARTS:
+        return _known_batch_frame(channel_id, items)
+    return normalize_videos(items)
+
+
+def iter_video_batches(channel_id, incremental=False, known_run_limit=KNOWN_RUN_LIMIT,
+                       max_workers=MAX_WORKERS, max_in_flight=None):
+    """
+    Streams a channel's videos as typed DataFrame batches of at most 50 rows.
+    - Batches come in playlist order (newest first); in incremental mode the
+      statistics-only batches for archived videos follow the new uploads
+    - At most `max_in_flight` batches are fetched ahead of the consumer, so
+      memory stays bounded regardless of channel size
+    - API errors propagate to the caller (QuotaExhaustedError, HttpError)
+    See get_all_video_metadata for `incremental` and `max_workers`.
+    """
+    youtube = get_youtube_service()
+    executor = _fetch_executor(max_workers) if max_workers > 1 else None
+    max_in_flight = max_in_flight or max(2, 2 * max_workers)
+    pending = deque()
+
+    def drain(limit):
+        while len(pending) > limit:
+            part, future = pending.popleft()
+            frame = _batch_frame(channel_id, part, future.result())
+            if not frame.empty:
+                yield frame
+
+    try:
+        known_order = get_known_video_ids(channel_id) if incremental else []
+        known_ids = set(known_order)
+
+        # 1. Get the 'uploads' playlist ID and video count for the channel
+        uploads_playlist_id, video_count = _get_uploads_playlist(youtube, channel_id)
+        if not uploads_playlist_id:
+            print(f"⚠️ No channel found with ID: {channel_id}")
+            return
+
+        # 2. Page through the uploads playlist, stopping early once a run of
+        #    known uploads is reached and the archive plus the new uploads
+        #    covers the channel's video count; a crawl that died part-way
+        #    left older uploads missing, so those syncs walk to the end and
+        #    backfill them. 3. The detail batch for each page's new video IDs
+        #    is scheduled as soon as the page arrives.
+        known_run = 0
+        new_count = 0
+
+        for page_ids in _iter_playlist_pages(youtube, uploads_playlist_id):
+            page_new_ids = []
+            for video_id in page_ids:
+                if video_id in known_ids:
+                    known_run += 1
+                else:
+                    page_new_ids.append(video_id)
+                    known_run = 0
+
+            if page_new_ids:
+                new_count += len(page_new_ids)
+                pending.append((FULL_PARTS, _submit(executor, youtube, page_new_ids, FULL_PARTS)))
+            yield from drain(max_in_flight)
+
+            archive_complete = video_count is None or len(known_ids) + new_count >= video_count
+            if known_ids and known_run >= known_run_limit and archive_complete:
                 break
 
-        if not video_ids:
+        # 4. Refresh statistics only for already-archived videos
+        for i in range(0, len(known_order), BATCH_SIZE):
+            batch_ids = known_order[i:i + BATCH_SIZE]
+            pending.append((STATS_PARTS, _submit(executor, youtube, batch_ids, STATS_PARTS)))
+            yield from drain(max_in_flight)
+
+        yield from drain(0)
+
+    finally:
+        # The pool outlives this call: drop what has not started, let the
+        # rest finish so no request runs on after the caller moved on
+        for _, future in pending:
+            future.cancel()
+        wait([future for _, future in pending])
+
+
+def get_all_video_metadata(channel_id, incremental=False, known_run_limit=KNOWN_RUN_LIMIT,
+                           max_workers=MAX_WORKERS, compact=False):
+    """
+    Extract detailed metadata for all videos in a YouTube channel.
+    - Uses pagination to handle channels with many videos.
+    - Handles missing fields gracefully.
+    - Returns a pandas DataFrame with processed numerical fields.
+    - incremental=True checks the `videos` table first: paging stops after
+      `known_run_limit` consecutive known uploads (unless fewer videos are
+      archived than the channel reports, e.g. after an interrupted crawl),
+      full metadata is fetched only for new uploads and only statistics are
+      re-fetched for the rest.
+    - max_workers > 1 runs the 50-ID detail batches on a bounded thread pool,
+      overlapping them with playlist paging. Results keep playlist order.
+    - compact=True returns the compact schema (see video_frame), converting
+      each batch as it arrives so full-width batches are not accumulated.
+    - Raises QuotaExhaustedError when the daily API budget is spent.
+    Thin wrapper that concatenates iter_video_batches().
+    """
+    try:
+        batches = [
+            compact_video_frame(batch) if compact else batch
+            for batch in iter_video_batches(
+                channel_id,
+                incremental=incremental,
+                known_run_limit=known_run_limit,
+                max_workers=max_workers,
+            )
+        ]
+
+        if not batches:
             return pd.DataFrame()
 
-        # 3. Fetch detailed metadata for these video IDs in batches of 50
-        all_video_data = []
-
-        for i in range(0, len(video_ids), 50):
-            batch_ids = video_ids[i:i+50]
-            video_response = youtube.videos().list(
-                part="snippet,contentDetails,statistics",
-                id=",".join(batch_ids)
-            ).execute()
-
-            for video in video_response.get("items", []):
-                snippet = video.get("snippet", {})
-                stats = video.get("statistics", {})
-                content_details = video.get("contentDetails", {})
-                
-                # Parse duration (ISO 8601 to seconds)
-                duration_str = content_details.get("duration", "PT0S")
-                duration_seconds = int(isodate.parse_duration(duration_str).total_seconds())
-
-                all_video_data.append({
-                    "video_id": video.get("id"),
-                    "title": snippet.get("title"),
-                    "description": snippet.get("description"),
-                    "published_at": snippet.get("publishedAt"),
-                    "duration_seconds": duration_seconds,
-                    "view_count": stats.get("viewCount"),
-                    "like_count": stats.get("likeCount"),
-                    "comment_count": stats.get("commentCount"),
-                    "thumbnail_default": snippet.get("thumbnails", {}).get("default", {}).get("url"),
-                    "thumbnail_medium": snippet.get("thumbnails", {}).get("medium", {}).get("url"),
-                    "thumbnail_high": snippet.get("thumbnails", {}).get("high", {}).get("url"),
-                })
-
-        # 4. Process data into a DataFrame
-        df = pd.DataFrame(all_video_data)
-
-        if not df.empty:
-            # Type conversions for numerical fields
-            numeric_cols = ["duration_seconds", "view_count", "like_count", "comment_count"]
-            for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
-            
-            # Convert published_at to datetime
-            df["published_at"] = pd.to_datetime(df["published_at"])
-
-        return df
+        return pd.concat(batches, ignore_index=True)
 
+    except QuotaExhaustedError:
+        raise
     except HttpError as e:
         print(f"❌ YouTube API error: {e}")
         return pd.DataFrame()
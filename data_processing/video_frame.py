@@ -0,0 +1,136 @@
+"""
+Compact in-memory representation of a channel's video catalog.
+
+The extractor frame carries full descriptions, three thumbnail URL columns
+and int64/object dtypes. Frames kept around by the app (the shared cache,
+session state) use the compact schema instead:
+- Arrow-backed strings for video_id and title
+- Counters downcast to the smallest unsigned integer type that fits
+- Thumbnail URLs derived from video_id on demand (with_thumbnails)
+- Descriptions loaded from the database on demand (with_descriptions)
+
+    python -m data_processing.video_frame UC...   # memory report for a stored channel
+"""
+import os
+import sys
+import pandas as pd
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.queries import load_video_descriptions, load_video_frame
+
+COMPACT_COLUMNS = [
+    "video_id", "title", "published_at", "duration_seconds",
+    "view_count", "like_count", "comment_count",
+]
+STRING_COLUMNS = ["video_id", "title"]
+COUNTER_COLUMNS = ["duration_seconds", "view_count", "like_count", "comment_count"]
+STRING_DTYPE = "string[pyarrow]"
+
+# Column -> i.ytimg.com file name; every video has these three renditions
+THUMBNAILS = {
+    "thumbnail_default": "default",
+    "thumbnail_medium": "mqdefault",
+    "thumbnail_high": "hqdefault",
+}
+
+
+def thumbnail_urls(video_ids):
+    """Standard i.ytimg.com thumbnail URLs, derivable from the video ID alone."""
+    return {
+        col: [f"https://i.ytimg.com/vi/{vid}/{name}.jpg" for vid in video_ids]
+        for col, name in THUMBNAILS.items()
+    }
+
+
+def compact_video_frame(df):
+    """Converts an extractor or DB video frame to the compact schema (a new frame)."""
+    compact = pd.DataFrame(index=df.index)
+    for col in COMPACT_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if col in STRING_COLUMNS:
+            values = values.astype(STRING_DTYPE)
+        elif col in COUNTER_COLUMNS:
+            values = pd.to_numeric(values, errors="coerce").fillna(0).clip(lower=0)
+            values = pd.to_numeric(values.astype("int64"), downcast="unsigned")
+        elif col == "published_at":
+            values = pd.to_datetime(values, utc=True)
+        compact[col] = values
+    return compact.reset_index(drop=True)
+
+
+def with_thumbnails(df, columns=tuple(THUMBNAILS)):
+    """Copy of `df` with the requested thumbnail URL columns derived from video_id."""
+    urls = thumbnail_urls(df["video_id"].tolist())
+    result = df.copy()
+    for col in columns:
+        result[col] = urls[col]
+    return result
+
+
+def with_descriptions(df):
+    """Copy of `df` with descriptions loaded from the database for its videos."""
+    descriptions = load_video_descriptions(df["video_id"].tolist())
+    result = df.copy()
+    result["description"] = df["video_id"].map(descriptions).astype(STRING_DTYPE)
+    return result
+
+
+def memory_report(df):
+    """
+    Deep memory usage per column, largest first, with a TOTAL row.
+    Columns: dtype, bytes, bytes_per_row, share.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    rows = max(len(df), 1)
+    report = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "bytes": usage,
+        "bytes_per_row": usage / rows,
+    }).sort_values("bytes", ascending=False)
+    total = int(usage.sum())
+    report["share"] = report["bytes"] / total if total else 0.0
+    report.loc["TOTAL"] = ["", total, total / rows, 1.0 if total else 0.0]
+    return report
+
+
+def format_memory_report(df, title=None):
+    report = memory_report(df)
+    lines = [title] if title else []
+    lines.append(f"{'column':<20}{'dtype':<22}{'MB':>10}{'B/row':>10}{'share':>8}")
+    for col, row in report.iterrows():
+        lines.append(f"{col:<20}{row['dtype']:<22}{row['bytes'] / 1e6:>10.2f}"
+                     f"{row['bytes_per_row']:>10.1f}{row['share']:>8.0%}")
+    return "\n".join(lines)
+
+
+def main(channel_id):
+    """Compares the full-width frame with the compact one for a stored channel."""
+    compact = compact_video_frame(load_video_frame(channel_id))
+    if compact.empty:
+        print(f"No stored videos for {channel_id}")
+        return
+
+    # What the app used to hold: every column, object strings, int64 counters
+    full = with_thumbnails(with_descriptions(compact))
+    full = full.astype({col: object for col in STRING_COLUMNS + ["description"] + list(THUMBNAILS)})
+    full = full.astype({col: "int64" for col in COUNTER_COLUMNS})
+
+    print(format_memory_report(full, f"Full frame ({len(full)} videos)"))
+    print()
+    print(format_memory_report(compact, "Compact frame"))
+    full_bytes = memory_report(full).loc["TOTAL", "bytes"]
+    compact_bytes = memory_report(compact).loc["TOTAL", "bytes"]
+    print(f"\n{full_bytes / compact_bytes:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m data_processing.video_frame CHANNEL_ID")
+        sys.exit(1)
+    main(sys.argv[1])
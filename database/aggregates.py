@@ -0,0 +1,210 @@
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import select, insert, update, delete, bindparam
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.models import (
+    Video, VideoLatestStats, ChannelSummary, ChannelMonthlyPosts, ChannelTopVideo
+)
+
+# Rows kept in channel_top_videos. Deeper than the dashboard's top 10 so a
+# video whose views drop is replaced by the next one rather than leaving a gap.
+TOP_VIDEOS_KEPT = int(os.getenv("TOP_VIDEOS_KEPT", "25"))
+
+COUNTERS = ("view_count", "like_count", "comment_count")
+
+
+def month_key(published_at):
+    """'YYYY-MM' for a naive-UTC datetime, None when unknown."""
+    return published_at.strftime("%Y-%m") if published_at is not None else None
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ----------------- Incremental maintenance -----------------
+
+def _apply_summary(db, channel_id, added, deltas):
+    """
+    Adds the batch's changes to the channel's summary row in SQL
+    (column = column + delta), so concurrent writers never overwrite each
+    other's totals with values they read earlier.
+    """
+    if not added and not any(deltas.values()):
+        return
+    table = ChannelSummary.__table__
+    increments = {
+        "video_count": added,
+        "total_views": deltas["view_count"],
+        "total_likes": deltas["like_count"],
+        "total_comments": deltas["comment_count"],
+    }
+    now = _utcnow()
+    updated = db.execute(
+        update(table)
+        .where(table.c.channel_id == channel_id)
+        .values(updated_at=now, **{col: table.c[col] + value for col, value in increments.items()})
+    ).rowcount
+    if not updated:
+        db.execute(insert(table).values(channel_id=channel_id, updated_at=now, **increments))
+
+
+def _apply_monthly(db, channel_id, month_deltas):
+    month_deltas = {m: d for m, d in month_deltas.items() if m is not None and d}
+    if not month_deltas:
+        return
+    table = ChannelMonthlyPosts.__table__
+    stored = set(db.scalars(
+        select(table.c.month)
+        .where(table.c.channel_id == channel_id, table.c.month.in_(list(month_deltas)))
+    ))
+
+    new_rows = [
+        {"channel_id": channel_id, "month": month, "video_count": delta}
+        for month, delta in month_deltas.items() if month not in stored and delta > 0
+    ]
+    if new_rows:
+        db.execute(insert(table), new_rows)
+    if stored:
+        db.execute(
+            update(table)
+            .where(table.c.channel_id == channel_id, table.c.month == bindparam("_month"))
+            .values(video_count=table.c.video_count + bindparam("_delta")),
+            [{"_month": month, "_delta": month_deltas[month]} for month in stored]
+        )
+        db.execute(delete(table).where(
+            table.c.channel_id == channel_id, table.c.month.in_(list(stored)), table.c.video_count <= 0
+        ))
+
+
+def _apply_top(db, channel_id, candidates):
+    """Merges this batch's videos into the stored top list and keeps the best TOP_VIDEOS_KEPT."""
+    table = ChannelTopVideo.__table__
+    stored = {
+        row["video_id"]: dict(row)
+        for row in db.execute(select(table).where(table.c.channel_id == channel_id)).mappings()
+    }
+    merged = dict(stored)
+    merged.update({row["video_id"]: row for row in candidates})
+    ranked = sorted(merged.values(), key=lambda r: (-(r["view_count"] or 0), r["video_id"]))
+    kept = ranked[:TOP_VIDEOS_KEPT]
+
+    if {row["video_id"]: row for row in kept} == stored:
+        return
+    db.execute(delete(table).where(table.c.channel_id == channel_id))
+    if kept:
+        db.execute(insert(table), kept)
+
+
+def apply_video_batch(db, channel_id, video_rows, stored, previous, latest_rows):
+    """
+    Folds one persistence batch into the channel's aggregate tables.
+    - video_rows: the Video rows being upserted (empty for a statistics-only refresh)
+    - stored: {video_id: (title, description, published_at)} as stored
+      before this batch, for videos that already existed
+    - previous: {video_id: (views, likes, comments, record_date)} latest
+      counters before this batch
+    - latest_rows: the video_latest_stats rows being written
+    Must run in the same transaction as the batch it describes, and
+    `stored`/`previous` must have been read in it after the channel's write
+    lock was taken (persistence._lock_channels); otherwise a concurrent
+    writer's changes are counted twice.
+    """
+    added = sum(1 for row in video_rows if row["video_id"] not in stored)
+
+    deltas = dict.fromkeys(COUNTERS, 0)
+    for row in latest_rows:
+        before = previous.get(row["video_id"])
+        for i, name in enumerate(COUNTERS):
+            deltas[name] += (row[name] or 0) - ((before[i] or 0) if before else 0)
+    _apply_summary(db, channel_id, added, deltas)
+
+    month_deltas = Counter()
+    for row in video_rows:
+        new_month = month_key(row["published_at"])
+        old = stored.get(row["video_id"])
+        if old is None:
+            month_deltas[new_month] += 1
+        elif month_key(old[2]) != new_month:
+            month_deltas[month_key(old[2])] -= 1
+            month_deltas[new_month] += 1
+    _apply_monthly(db, channel_id, month_deltas)
+
+    # Statistics-only batches carry no video rows; titles then come from `stored`
+    titles = {vid: values[0] for vid, values in stored.items()}
+    titles.update((row["video_id"], row["title"]) for row in video_rows)
+    _apply_top(db, channel_id, [
+        {"channel_id": channel_id, "video_id": row["video_id"], "title": titles.get(row["video_id"]),
+         **{name: row[name] for name in COUNTERS}}
+        for row in latest_rows
+    ])
+
+
+# ----------------- Full rebuild -----------------
+
+def rebuild_aggregates(conn, channel_id=None):
+    """
+    Recomputes the aggregate tables from videos + video_latest_stats, for
+    one channel or all of them. Used to backfill existing databases and to
+    repair drift. Returns the number of channels rebuilt.
+    """
+    summaries = {}
+    months = Counter()
+    tops = {}
+
+    stmt = (
+        select(Video.channel_id, Video.video_id, Video.title, Video.published_at,
+               VideoLatestStats.view_count, VideoLatestStats.like_count, VideoLatestStats.comment_count)
+        .outerjoin(VideoLatestStats, VideoLatestStats.video_id == Video.video_id)
+    )
+    if channel_id is not None:
+        stmt = stmt.where(Video.channel_id == channel_id)
+
+    for cid, vid, title, published_at, views, likes, comments in conn.execute(stmt):
+        summary = summaries.setdefault(cid, [0, 0, 0, 0])
+        summary[0] += 1
+        summary[1] += views or 0
+        summary[2] += likes or 0
+        summary[3] += comments or 0
+        months[(cid, month_key(published_at))] += 1
+        tops.setdefault(cid, []).append({
+            "channel_id": cid, "video_id": vid, "title": title,
+            "view_count": views, "like_count": likes, "comment_count": comments,
+        })
+
+    for model in (ChannelSummary, ChannelMonthlyPosts, ChannelTopVideo):
+        table = model.__table__
+        stmt = delete(table)
+        if channel_id is not None:
+            stmt = stmt.where(table.c.channel_id == channel_id)
+        conn.execute(stmt)
+
+    now = _utcnow()
+    if summaries:
+        conn.execute(insert(ChannelSummary.__table__), [
+            {"channel_id": cid, "video_count": s[0], "total_views": s[1], "total_likes": s[2],
+             "total_comments": s[3], "updated_at": now}
+            for cid, s in summaries.items()
+        ])
+    month_rows = [
+        {"channel_id": cid, "month": month, "video_count": count}
+        for (cid, month), count in months.items() if month is not None
+    ]
+    if month_rows:
+        conn.execute(insert(ChannelMonthlyPosts.__table__), month_rows)
+    top_rows = [
+        row
+        for rows in tops.values()
+        for row in sorted(rows, key=lambda r: (-(r["view_count"] or 0), r["video_id"]))[:TOP_VIDEOS_KEPT]
+    ]
+    if top_rows:
+        conn.execute(insert(ChannelTopVideo.__table__), top_rows)
+
+    return len(summaries)
@@ -0,0 +1,271 @@
+"""
+Retention and downsampling for the video_statistics history.
+
+- Raw snapshots older than the raw retention window (cut at a UTC day
+  boundary) are folded into video_statistics_daily, one row per video/day
+- Daily rows older than the daily retention window (cut at a Monday) are
+  folded into video_statistics_weekly, one row per video/ISO week
+Rollup rows keep min/max/last of each counter and how many snapshots they
+stand for. Each video's newest raw snapshot is always kept, so
+video_latest_stats can still be rebuilt from video_statistics; growth
+analytics (database/growth.py) read the rollups' last counters alongside
+the raw snapshots.
+
+The source table is walked in (video_id, date) order in transactions of at
+most `batch_size` rows, so the job can run while ingest is live. Folds are
+merged into any rollup row that already exists, so an interrupted run or a
+late-arriving old snapshot is simply picked up by the next run.
+
+    python -m database.compaction
+    python -m database.compaction --raw-days 14 --daily-days 90 --batch-size 2000
+"""
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import select, delete, func, and_, or_, tuple_
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import engine
+from database.models import VideoStatistics, VideoStatisticsDaily, VideoStatisticsWeekly
+from database.persistence import _chunks, _datetime_column, _insert_rows, _int_column, _records, _text_column
+from database.instrumentation import span
+
+RAW_RETENTION_DAYS = int(os.getenv("STATS_RAW_RETENTION_DAYS", "30"))
+DAILY_RETENTION_DAYS = int(os.getenv("STATS_DAILY_RETENTION_DAYS", "180"))
+# Source rows folded per transaction
+BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "5000"))
+
+COUNTERS = ("view_count", "like_count", "comment_count")
+ROLLUP_COLUMNS = ["video_id", "period_start", "samples", "first_recorded_at", "last_recorded_at"] + [
+    f"{counter}_{agg}" for counter in COUNTERS for agg in ("min", "max", "last")
+]
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of compact_statistics()."""
+    raw_cutoff: datetime = None
+    daily_cutoff: datetime = None
+    raw_rows_removed: int = 0
+    daily_rows_added: int = 0
+    daily_rows_removed: int = 0
+    weekly_rows_added: int = 0
+    transactions: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_reclaimed(self):
+        """Net rows removed across video_statistics and both rollup tables."""
+        return self.raw_rows_removed + self.daily_rows_removed - self.daily_rows_added - self.weekly_rows_added
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _day(ts):
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _week(ts):
+    day = _day(ts)
+    return day - timedelta(days=day.weekday())
+
+
+def _week_starts(dates):
+    days = dates.dt.floor("D")
+    return days - pd.to_timedelta(days.dt.weekday, unit="D")
+
+
+def _fold(rollups, period):
+    """
+    Merges rollup-shaped rows that share (video_id, period(period_start))
+    into one: samples add up, min/max of mins/maxes, last = the counters of
+    the most recently recorded row.
+    """
+    rollups = rollups.assign(period_start=period(rollups["period_start"])).sort_values("last_recorded_at")
+    aggs = {"samples": "sum", "first_recorded_at": "min", "last_recorded_at": "max"}
+    for counter in COUNTERS:
+        aggs.update({f"{counter}_min": "min", f"{counter}_max": "max", f"{counter}_last": "last"})
+    return rollups.groupby(["video_id", "period_start"], as_index=False, sort=True).agg(aggs)[ROLLUP_COLUMNS]
+
+
+def _raw_as_rollups(raw):
+    """Raw snapshots as single-sample rollup rows (period_start = the snapshot time)."""
+    rollups = pd.DataFrame({
+        "video_id": raw["video_id"],
+        "period_start": raw["record_date"],
+        "samples": 1,
+        "first_recorded_at": raw["record_date"],
+        "last_recorded_at": raw["record_date"],
+    })
+    for counter in COUNTERS:
+        for agg in ("min", "max", "last"):
+            rollups[f"{counter}_{agg}"] = raw[counter]
+    return rollups[ROLLUP_COLUMNS]
+
+
+def _frame(rows, columns):
+    df = pd.DataFrame(rows, columns=columns)
+    for col in columns:
+        if col.endswith(("_at", "_start", "_date")):
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def _write_rollups(conn, model, folded):
+    """
+    Merges `folded` rows into the rollup table: existing rows in the same
+    (video, period range) are read, folded in and replaced. Returns the net
+    number of rows added.
+    """
+    table = model.__table__
+    video_ids = folded["video_id"].unique().tolist()
+    low, high = folded["period_start"].min(), folded["period_start"].max()
+    in_range = and_(table.c.period_start >= low.to_pydatetime(), table.c.period_start <= high.to_pydatetime())
+
+    existing = []
+    for chunk in _chunks(video_ids):
+        existing.extend(conn.execute(
+            select(*[table.c[col] for col in ROLLUP_COLUMNS]).where(table.c.video_id.in_(chunk), in_range)
+        ).all())
+    if existing:
+        folded = _fold(pd.concat([_frame(existing, ROLLUP_COLUMNS), folded], ignore_index=True), lambda p: p)
+        for chunk in _chunks(video_ids):
+            conn.execute(delete(table).where(table.c.video_id.in_(chunk), in_range))
+
+    columns = {"video_id": _text_column(folded, "video_id")}
+    for col in ROLLUP_COLUMNS[1:]:
+        columns[col] = _datetime_column(folded, col) if col.endswith(("_at", "_start")) else _int_column(folded, col)
+    _insert_rows(conn, table, _records(columns))
+    return len(folded) - len(existing)
+
+
+def _after(key_cols, last):
+    """Keyset condition: (video_id, date) strictly after `last`."""
+    if last is None:
+        return True
+    video_col, date_col = key_cols
+    return or_(video_col > last[0], and_(video_col == last[0], date_col > last[1]))
+
+
+def _compact_raw_batch(conn, cutoff, last, batch_size):
+    """
+    Folds the next batch of raw snapshots before `cutoff` into daily rows.
+    Returns (last key read or None when done, raw rows removed, daily rows added).
+    """
+    s = VideoStatistics
+    rows = conn.execute(
+        select(s.id, s.video_id, s.record_date, s.view_count, s.like_count, s.comment_count)
+        .where(s.record_date < cutoff, _after((s.video_id, s.record_date), last))
+        .order_by(s.video_id, s.record_date)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return None, 0, 0
+    raw = _frame(rows, ["id", "video_id", "record_date", *COUNTERS])
+    next_key = (rows[-1].video_id, rows[-1].record_date)
+
+    # A video's newest snapshot stays raw, however old it is
+    newest = {}
+    for chunk in _chunks(raw["video_id"].unique().tolist()):
+        newest.update(conn.execute(
+            select(s.video_id, func.max(s.record_date)).where(s.video_id.in_(chunk)).group_by(s.video_id)
+        ).all())
+    raw = raw[raw["record_date"] != pd.to_datetime(raw["video_id"].map(newest))]
+    if raw.empty:
+        return next_key, 0, 0
+
+    for chunk in _chunks(raw["id"].tolist()):
+        conn.execute(delete(s).where(s.id.in_(chunk)))
+    added = _write_rollups(conn, VideoStatisticsDaily, _fold(_raw_as_rollups(raw), lambda p: p.dt.floor("D")))
+    return next_key, len(raw), added
+
+
+def _compact_daily_batch(conn, cutoff, last, batch_size):
+    """
+    Folds the next batch of daily rows before `cutoff` into weekly rows.
+    Returns (last key read or None when done, daily rows removed, weekly rows added).
+    """
+    table = VideoStatisticsDaily.__table__
+    rows = conn.execute(
+        select(*[table.c[col] for col in ROLLUP_COLUMNS])
+        .where(table.c.period_start < cutoff, _after((table.c.video_id, table.c.period_start), last))
+        .order_by(table.c.video_id, table.c.period_start)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return None, 0, 0
+    daily = _frame(rows, ROLLUP_COLUMNS)
+
+    keys = [(row.video_id, row.period_start) for row in rows]
+    for chunk in _chunks(keys):
+        conn.execute(delete(table).where(tuple_(table.c.video_id, table.c.period_start).in_(chunk)))
+    added = _write_rollups(conn, VideoStatisticsWeekly, _fold(daily, _week_starts))
+    return keys[-1], len(daily), added
+
+
+def _run_batches(step, cutoff, batch_size, bind, report):
+    removed = added = 0
+    last = ()
+    while last is not None:
+        with bind.begin() as conn:
+            last, batch_removed, batch_added = step(conn, cutoff, last or None, batch_size)
+        report.transactions += 1
+        removed += batch_removed
+        added += batch_added
+    return removed, added
+
+
+def compact_statistics(raw_days=RAW_RETENTION_DAYS, daily_days=DAILY_RETENTION_DAYS,
+                       batch_size=BATCH_SIZE, now=None, bind=None):
+    """
+    Keeps raw snapshots for `raw_days`, daily rollups for `daily_days`, and
+    weekly rollups beyond that. Each batch of at most `batch_size` source
+    rows is folded and deleted in its own transaction.
+    Returns a CompactionReport.
+    """
+    bind = bind or engine
+    now = now or _utcnow()
+    report = CompactionReport(raw_cutoff=_day(now - timedelta(days=raw_days)),
+                              daily_cutoff=_week(now - timedelta(days=daily_days)))
+    start = time.perf_counter()
+
+    with span("compact.raw_to_daily"):
+        report.raw_rows_removed, report.daily_rows_added = _run_batches(
+            _compact_raw_batch, report.raw_cutoff, batch_size, bind, report)
+    with span("compact.daily_to_weekly"):
+        report.daily_rows_removed, report.weekly_rows_added = _run_batches(
+            _compact_daily_batch, report.daily_cutoff, batch_size, bind, report)
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll old statistics snapshots into daily and weekly rows.")
+    parser.add_argument("--raw-days", type=int, default=RAW_RETENTION_DAYS, help="keep raw snapshots this long")
+    parser.add_argument("--daily-days", type=int, default=DAILY_RETENTION_DAYS, help="keep daily rollups this long")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="source rows per transaction")
+    args = parser.parse_args(argv)
+
+    report = compact_statistics(args.raw_days, args.daily_days, args.batch_size)
+    print(f"🧹 Raw snapshots before {report.raw_cutoff:%Y-%m-%d}: {report.raw_rows_removed} folded into "
+          f"{report.daily_rows_added} new daily rows")
+    print(f"🧹 Daily rows before {report.daily_cutoff:%Y-%m-%d}: {report.daily_rows_removed} folded into "
+          f"{report.weekly_rows_added} new weekly rows")
+    print(f"✅ {report.rows_reclaimed} rows reclaimed in {report.transactions} transactions, "
+          f"{report.seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
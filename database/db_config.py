@@ -1,14 +1,102 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from database.instrumentation import instrument_engine
 
 load_dotenv()
 
 # Default to SQLite for local development if no DB_URL is provided
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/youtube_analytics.db")
 
-engine = create_engine(DATABASE_URL, echo=False)
+# Engine profile: "tuned" (per-backend settings below) or "default" (plain
+# create_engine, the historical behaviour)
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_settings():
+    """SQLite pragmas for the tuned profile, overridable from the environment."""
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000")),
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+    }
+
+
+def pool_settings():
+    """Connection pool options for the tuned Postgres/MySQL profile."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def _ensure_sqlite_dir(url):
+    database = url.database
+    if database and database != ":memory:" and not database.startswith("file:"):
+        directory = os.path.dirname(os.path.abspath(database))
+        os.makedirs(directory, exist_ok=True)
+
+
+def _tuned_sqlite_engine(url):
+    settings = sqlite_settings()
+    engine = create_engine(
+        url,
+        echo=False,
+        connect_args={"timeout": settings["busy_timeout"] / 1000, "check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets Streamlit readers run while an ingest job writes
+        cursor.execute(f"PRAGMA journal_mode={settings['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous={settings['synchronous']}")
+        cursor.execute(f"PRAGMA mmap_size={settings['mmap_size']}")
+        cursor.execute(f"PRAGMA busy_timeout={settings['busy_timeout']}")
+        cursor.execute(f"PRAGMA cache_size=-{settings['cache_size']}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    return engine
+
+
+def build_engine(database_url=DATABASE_URL, profile=None):
+    """
+    Creates the SQLAlchemy engine for `database_url`.
+    - profile "default": plain create_engine()
+    - profile "tuned" + SQLite: WAL, synchronous=NORMAL, mmap, busy timeout
+    - profile "tuned" + Postgres/MySQL: sized pool, overflow, recycle, pre-ping
+    The profile defaults to the DB_PROFILE environment variable.
+    """
+    profile = (profile or DB_PROFILE).lower()
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+
+    if backend == "sqlite":
+        _ensure_sqlite_dir(url)
+
+    if profile == "default":
+        return create_engine(url, echo=False)
+
+    if backend == "sqlite":
+        return _tuned_sqlite_engine(url)
+
+    return create_engine(url, echo=False, **pool_settings())
+
+
+# Statement counts and timings feed the Diagnostics page and metrics export
+engine = instrument_engine(build_engine(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
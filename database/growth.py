@@ -0,0 +1,285 @@
+"""
+View velocity and growth analytics over the video_statistics history.
+
+Every snapshot interval of a video (two consecutive snapshots) yields
+views/day and likes/day; acceleration is the change in views/day between
+two consecutive intervals, per day. Channel growth curves add up the
+per-snapshot increments by day.
+
+The previous one and two snapshots of each row come from LAG() window
+functions when the backend has them (SQLite >= 3.25, PostgreSQL, MySQL 8,
+MariaDB 10.2), otherwise from vectorized NumPy shifts over rows ordered by
+(video_id, record_date). Either way rows are streamed from a Core select in
+partitions straight into column arrays, never as ORM objects.
+
+Snapshots that database/compaction.py rolled up still count: each
+video_statistics_daily / _weekly row contributes its last counters at its
+last_recorded_at, so curves keep their full span at a coarser resolution.
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, union_all, BigInteger, String, func, type_coerce
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import engine
+from database.models import Video, VideoStatistics, VideoStatisticsDaily, VideoStatisticsWeekly
+
+# Rows fetched per partition while streaming snapshots
+FETCH_SIZE = int(os.getenv("GROWTH_FETCH_SIZE", "50000"))
+
+SQL, NUMPY = "sql", "numpy"
+
+_DAY_NS = 86_400 * 10**9
+_LAGGED = ("prev_date", "prev_views", "prev_likes", "prev2_date", "prev2_views")
+
+VELOCITY_COLUMNS = [
+    "video_id", "record_date", "view_count", "like_count",
+    "days", "views_per_day", "likes_per_day", "acceleration",
+]
+
+
+def supports_window_functions(conn):
+    """True when the connected backend evaluates LAG() ... OVER (...)."""
+    dialect = conn.dialect
+    version = dialect.server_version_info or ()
+    if dialect.name == "sqlite":
+        return version >= (3, 25)
+    if dialect.name in ("mysql", "mariadb"):
+        return version >= ((10, 2) if getattr(dialect, "is_mariadb", False) else (8, 0))
+    return dialect.name in ("postgresql", "mssql", "oracle")
+
+
+def _raw_date(column):
+    # Fetched as the driver returns it: skips per-row DateTime result
+    # processing, the whole column is parsed by pandas in one call instead
+    return type_coerce(column, String)
+
+
+def _history(channel_id, video_ids):
+    """
+    (video_id, record_date, view_count, like_count) of every raw snapshot of
+    the channel's videos, plus the closing sample of each rollup row.
+    """
+    sources = [(VideoStatistics, VideoStatistics.record_date, VideoStatistics.view_count, VideoStatistics.like_count)]
+    for rollup in (VideoStatisticsDaily, VideoStatisticsWeekly):
+        sources.append((rollup, rollup.last_recorded_at, rollup.view_count_last, rollup.like_count_last))
+
+    parts = []
+    for model, date, views, likes in sources:
+        part = (
+            select(model.video_id, date.label("record_date"), views.label("view_count"), likes.label("like_count"))
+            .join(Video, Video.video_id == model.video_id)
+            .where(Video.channel_id == channel_id)
+        )
+        if video_ids is not None:
+            part = part.where(model.video_id.in_(list(video_ids)))
+        parts.append(part)
+    return union_all(*parts).subquery("history")
+
+
+def _window_select(channel_id, video_ids, since):
+    h = _history(channel_id, video_ids)
+    window = {"partition_by": h.c.video_id, "order_by": h.c.record_date}
+    lagged = select(
+        h.c.video_id,
+        _raw_date(h.c.record_date).label("record_date"),
+        h.c.view_count,
+        h.c.like_count,
+        _raw_date(func.lag(h.c.record_date).over(**window)).label("prev_date"),
+        func.lag(h.c.view_count, type_=BigInteger).over(**window).label("prev_views"),
+        func.lag(h.c.like_count, type_=BigInteger).over(**window).label("prev_likes"),
+        _raw_date(func.lag(h.c.record_date, 2).over(**window)).label("prev2_date"),
+        func.lag(h.c.view_count, 2, type_=BigInteger).over(**window).label("prev2_views"),
+    ).subquery()
+
+    # `since` is applied after the window so the first row kept still sees its predecessors
+    stmt = select(lagged).order_by(lagged.c.video_id, lagged.c.record_date)
+    if since is not None:
+        stmt = stmt.where(type_coerce(lagged.c.record_date, VideoStatistics.record_date.type) >= since)
+    return stmt
+
+
+def _plain_select(channel_id, video_ids):
+    h = _history(channel_id, video_ids)
+    return select(
+        h.c.video_id, _raw_date(h.c.record_date).label("record_date"), h.c.view_count, h.c.like_count,
+    ).order_by(h.c.video_id, h.c.record_date)
+
+
+def _stream_columns(conn, stmt, dtypes):
+    """
+    Executes `stmt` and returns {name: array} for the {name: dtype} columns,
+    fetching FETCH_SIZE rows at a time. NULL counts become NaN.
+    """
+    parts = {name: [] for name in dtypes}
+    result = conn.execution_options(yield_per=FETCH_SIZE).execute(stmt)
+    for rows in result.partitions():
+        for (name, dtype), values in zip(dtypes.items(), zip(*rows)):
+            parts[name].append(np.array(values, dtype=dtype))
+    return {name: np.concatenate(chunks) if chunks else np.empty(0, dtype=dtypes[name])
+            for name, chunks in parts.items()}
+
+
+def _as_days(values):
+    """Datetimes (None allowed) to float days since the epoch, NaN for missing."""
+    stamps = pd.to_datetime(pd.Series(values, dtype=object)).to_numpy(dtype="datetime64[ns]")
+    days = stamps.astype("int64") / _DAY_NS
+    days[np.isnat(stamps)] = np.nan
+    return days
+
+
+def _shift(values, same, fill=np.nan):
+    """values[i - 1] where row i - 1 belongs to the same video, else `fill`."""
+    shifted = np.empty_like(values)
+    shifted[0:1] = fill
+    shifted[1:] = values[:-1]
+    shifted[~same] = fill
+    return shifted
+
+
+def _numpy_lags(columns):
+    """Adds the LAG columns of _window_select to rows ordered by (video_id, record_date)."""
+    video_ids = columns["video_id"]
+    same = np.zeros(len(video_ids), dtype=bool)
+    same[1:] = video_ids[1:] == video_ids[:-1]
+    same2 = same & _shift(same, same, False)
+
+    columns["prev_date"] = _shift(columns["record_date"], same)
+    columns["prev_views"] = _shift(columns["view_count"], same)
+    columns["prev_likes"] = _shift(columns["like_count"], same)
+    columns["prev2_date"] = _shift(columns["prev_date"], same2)
+    columns["prev2_views"] = _shift(columns["prev_views"], same2)
+    return columns
+
+
+def load_snapshot_lags(channel_id, video_ids=None, since=None, method=None, bind=None):
+    """
+    Every snapshot of the channel's videos (recorded at or after `since`)
+    with the dates and counts of the video's previous one and two snapshots,
+    ordered by video_id and record_date. Dates are float days since the
+    epoch, counts floats, NaN where there is no earlier snapshot.
+    method: "sql" (LAG window functions), "numpy", or None to pick "sql"
+    whenever the backend supports it.
+    """
+    dtypes = {"video_id": object, "record_date": object, "view_count": float, "like_count": float}
+    with (bind or engine).connect() as conn:
+        if method is None:
+            method = SQL if supports_window_functions(conn) else NUMPY
+        if method == SQL:
+            dtypes.update({"prev_date": object, "prev_views": float, "prev_likes": float,
+                           "prev2_date": object, "prev2_views": float})
+            columns = _stream_columns(conn, _window_select(channel_id, video_ids, since), dtypes)
+        else:
+            columns = _stream_columns(conn, _plain_select(channel_id, video_ids), dtypes)
+
+    for name in ("record_date", "prev_date", "prev2_date"):
+        if name in columns:
+            columns[name] = _as_days(columns[name])
+    if method != SQL:
+        columns = _numpy_lags(columns)
+        if since is not None:
+            keep = columns["record_date"] >= pd.Timestamp(since).value / _DAY_NS
+            columns = {name: values[keep] for name, values in columns.items()}
+
+    frame = pd.DataFrame(columns, columns=list(dtypes) + [n for n in _LAGGED if n not in dtypes])
+    frame["video_id"] = frame["video_id"].astype(str)
+    return frame
+
+
+def _per_day(delta, days):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(days > 0, delta / days, np.nan)
+
+
+def video_velocity(channel_id, video_ids=None, since=None, method=None, bind=None):
+    """
+    One row per snapshot interval (a snapshot and the one before it) of the
+    channel's videos: the interval length in days, views/day, likes/day and
+    acceleration (change in views/day since the previous interval, per day;
+    NaN for a video's first interval). `since` limits the intervals to those
+    ending at or after it. Ordered by video_id, record_date.
+    """
+    lags = load_snapshot_lags(channel_id, video_ids, since, method, bind)
+    lags = lags[lags["prev_date"].notna()].reset_index(drop=True)
+
+    days = lags["record_date"].to_numpy() - lags["prev_date"].to_numpy()
+    views_per_day = _per_day(lags["view_count"].to_numpy() - lags["prev_views"].to_numpy(), days)
+    prev_days = lags["prev_date"].to_numpy() - lags["prev2_date"].to_numpy()
+    prev_views_per_day = _per_day(lags["prev_views"].to_numpy() - lags["prev2_views"].to_numpy(), prev_days)
+
+    out = pd.DataFrame({
+        "video_id": lags["video_id"],
+        "record_date": pd.to_datetime(lags["record_date"].to_numpy() * _DAY_NS),
+        "view_count": lags["view_count"].fillna(0).astype("int64"),
+        "like_count": lags["like_count"].fillna(0).astype("int64"),
+        "days": days,
+        "views_per_day": views_per_day,
+        "likes_per_day": _per_day(lags["like_count"].to_numpy() - lags["prev_likes"].to_numpy(), days),
+        "acceleration": _per_day(views_per_day - prev_views_per_day, days),
+    }, columns=VELOCITY_COLUMNS)
+    return out
+
+
+def latest_velocity(channel_id, n=None, method=None, bind=None):
+    """
+    Each video's most recent interval from video_velocity(), joined with its
+    title, fastest first (top `n` when given). Videos with a single
+    snapshot have no velocity yet and are left out.
+    """
+    velocity = video_velocity(channel_id, method=method, bind=bind)
+    latest = velocity.drop_duplicates(subset="video_id", keep="last")
+    latest = latest.sort_values(["views_per_day", "video_id"], ascending=[False, True])
+    if n is not None:
+        latest = latest.head(n)
+
+    with (bind or engine).connect() as conn:
+        titles = dict(conn.execute(
+            select(Video.video_id, Video.title).where(Video.video_id.in_(latest["video_id"].tolist()))
+        ).all()) if len(latest) else {}
+    latest.insert(1, "title", latest["video_id"].map(titles))
+    return latest.reset_index(drop=True)
+
+
+def channel_growth(channel_id, freq="D", method=None, bind=None):
+    """
+    Channel-level growth curve, one row per `freq` period with snapshots:
+    - total_views / total_likes: sum over videos of their latest counts as
+      of the end of the period (videos count from their first snapshot)
+    - views_gained / likes_gained: increments measured by snapshot
+      intervals ending in the period (first snapshots excluded, so
+      archiving a new video is not counted as growth)
+    - videos_tracked: videos with at least one snapshot so far
+    """
+    lags = load_snapshot_lags(channel_id, method=method, bind=bind)
+    columns = ["period", "total_views", "total_likes", "views_gained", "likes_gained", "videos_tracked"]
+    if lags.empty:
+        return pd.DataFrame(columns=columns)
+
+    first = lags["prev_date"].isna().to_numpy()
+    view_delta = np.nan_to_num(lags["view_count"].to_numpy()) - np.nan_to_num(lags["prev_views"].to_numpy())
+    like_delta = np.nan_to_num(lags["like_count"].to_numpy()) - np.nan_to_num(lags["prev_likes"].to_numpy())
+    period = pd.to_datetime(lags["record_date"].to_numpy() * _DAY_NS).floor(freq)
+
+    daily = pd.DataFrame({
+        "period": period,
+        "view_delta": view_delta,
+        "like_delta": like_delta,
+        "views_gained": np.where(first, 0, view_delta),
+        "likes_gained": np.where(first, 0, like_delta),
+        "new_videos": first.astype("int64"),
+    }).groupby("period", sort=True).sum()
+
+    return pd.DataFrame({
+        "period": daily.index,
+        "total_views": daily["view_delta"].cumsum().astype("int64").to_numpy(),
+        "total_likes": daily["like_delta"].cumsum().astype("int64").to_numpy(),
+        "views_gained": daily["views_gained"].astype("int64").to_numpy(),
+        "likes_gained": daily["likes_gained"].astype("int64").to_numpy(),
+        "videos_tracked": daily["new_videos"].cumsum().to_numpy(),
+    }, columns=columns)
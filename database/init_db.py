@@ -1,5 +1,6 @@
 import sys
 import os
+from sqlalchemy import Index, MetaData, Table, inspect, select, insert, func
 
 # Add project root to path
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -7,12 +8,114 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from database.db_config import engine
-from database.models import Base
+from database.models import Base, Video, VideoStatistics, VideoLatestStats, ChannelSummary
+from database.search import ensure_search_index
+from database.aggregates import rebuild_aggregates
+
+
+def _create_missing_indexes(bind):
+    """create_all() skips indexes on tables that already exist; add them here."""
+    inspector = inspect(bind)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+                created.append(index.name)
+    return created
+
+
+# Indexes replaced by a wider one in the models: {table: [index name]}
+SUPERSEDED_INDEXES = {
+    "videos": ["ix_videos_channel_published"],  # now ix_videos_channel_published_id
+}
+
+
+def _drop_superseded_indexes(bind):
+    inspector = inspect(bind)
+    dropped = []
+    for table_name, names in SUPERSEDED_INDEXES.items():
+        existing = {ix["name"] for ix in inspector.get_indexes(table_name)}
+        for name in names:
+            if name in existing:
+                # A detached Table: attaching to Base.metadata would leave the
+                # empty Index behind for the next create_all()
+                Index(name, _table=Table(table_name, MetaData())).drop(bind=bind)
+                dropped.append(name)
+    return dropped
+
+
+def _backfill_latest_stats(bind):
+    """Fills video_latest_stats from the snapshot history if it is empty."""
+    with bind.begin() as conn:
+        if conn.execute(select(func.count()).select_from(VideoLatestStats.__table__)).scalar():
+            return 0
+
+        # Newest snapshot per video = highest id (snapshots are append-only)
+        newest = (
+            select(func.max(VideoStatistics.id).label("id"))
+            .group_by(VideoStatistics.video_id)
+            .subquery()
+        )
+        rows = (
+            select(
+                VideoStatistics.video_id,
+                Video.channel_id,
+                VideoStatistics.view_count,
+                VideoStatistics.like_count,
+                VideoStatistics.comment_count,
+                VideoStatistics.record_date,
+                VideoStatistics.record_date,
+            )
+            .join(newest, VideoStatistics.id == newest.c.id)
+            .join(Video, Video.video_id == VideoStatistics.video_id)
+        )
+        result = conn.execute(insert(VideoLatestStats.__table__).from_select(
+            ["video_id", "channel_id", "view_count", "like_count", "comment_count",
+             "record_date", "checked_at"],
+            rows
+        ))
+        return result.rowcount
+
+
+def _backfill_aggregates(bind):
+    """Builds the dashboard aggregate tables if they are empty but videos exist."""
+    with bind.begin() as conn:
+        if conn.execute(select(func.count()).select_from(ChannelSummary.__table__)).scalar():
+            return 0
+        if not conn.execute(select(func.count()).select_from(Video.__table__)).scalar():
+            return 0
+        return rebuild_aggregates(conn)
+
+
+def migrate(bind=engine):
+    """
+    Brings an existing database up to the current models.
+    - Creates missing tables and indexes, drops ones they replace
+    - Backfills derived tables (video_latest_stats, dashboard aggregates)
+    - Creates and fills the full-text search index
+    """
+    Base.metadata.create_all(bind=bind)
+    for name in _create_missing_indexes(bind):
+        print(f"   ➕ Created index {name}")
+    for name in _drop_superseded_indexes(bind):
+        print(f"   ➖ Dropped superseded index {name}")
+    backfilled = _backfill_latest_stats(bind)
+    if backfilled:
+        print(f"   ➕ Backfilled {backfilled} rows into video_latest_stats")
+    channels = _backfill_aggregates(bind)
+    if channels:
+        print(f"   ➕ Built dashboard aggregates for {channels} channels")
+    with bind.begin() as conn:
+        if ensure_search_index(conn):
+            print("   ➕ Created the video search index")
+
 
 def init_db():
     print("🚀 Initializing database tables...")
     try:
-        Base.metadata.create_all(bind=engine)
+        migrate(engine)
         print("✅ Database tables created successfully.")
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
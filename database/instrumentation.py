@@ -0,0 +1,296 @@
+"""
+Lightweight in-process pipeline instrumentation.
+
+- span("persist.video_batch") times a block (or, as a decorator, every
+  call); spans nest, and each SQL statement run inside a span is counted
+  against it and its enclosing spans
+- increment() / set_gauge() record labelled counters and gauges (API
+  requests, quota units, retries, ...)
+- instrument_engine() hooks SQLAlchemy cursor events to count statements,
+  affected rows and time per statement kind
+Metrics are kept per process. prometheus_text() renders them in the
+Prometheus text exposition format and write_textfile() writes that to
+METRICS_TEXTFILE for the node_exporter textfile collector, either after a
+unit of work (stats_refresher) or every METRICS_WRITE_SECONDS from
+start_textfile_writer() (the Streamlit app, which has no natural cycle).
+"""
+import os
+import math
+import time
+import numbers
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE")
+# How often start_textfile_writer() rewrites METRICS_TEXTFILE
+METRICS_WRITE_SECONDS = float(os.getenv("METRICS_WRITE_SECONDS", "15"))
+METRIC_PREFIX = "youtube_analytics_"
+
+SQL_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+# HELP lines for the counters and gauges recorded across the code base
+METRIC_HELP = {
+    "db_statements_total": "SQL statements executed, by statement kind.",
+    "db_statement_seconds_total": "Time spent executing SQL statements, by statement kind.",
+    "db_rows_total": "Rows affected by INSERT/UPDATE/DELETE statements.",
+    "db_statement_errors_total": "SQL statements that raised, by statement kind.",
+    "youtube_api_requests_total": "YouTube API requests sent, by endpoint and outcome.",
+    "youtube_api_retries_total": "Retries of transient YouTube API errors, by endpoint.",
+    "youtube_api_cache_hits_total": "API calls answered from the HTTP response cache, by endpoint.",
+    "youtube_quota_units_total": "Quota units charged, by endpoint (cache hits are not charged).",
+    "youtube_quota_spent_units": "Quota units spent today.",
+    "youtube_quota_remaining_units": "Quota units left today.",
+    "youtube_quota_budget_units": "Daily quota budget.",
+}
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_gauges = {}
+_writer = None
+_writer_stop = threading.Event()
+
+# Stage records of the spans open in the current thread / task
+_active = ContextVar("active_spans", default=())
+
+
+def _new_stage():
+    return {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+            "sql_statements": 0, "sql_seconds": 0.0}
+
+
+def _stage(name):
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = _new_stage()
+        return stage
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block as stage `name`; usable as a decorator too."""
+    stage = _stage(name)
+    token = _active.set(_active.get() + (stage,))
+    failed = False
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _active.reset(token)
+        with _lock:
+            stage["calls"] += 1
+            stage["errors"] += failed
+            stage["seconds"] += elapsed
+            stage["max_seconds"] = max(stage["max_seconds"], elapsed)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def increment(name, value=1, **labels):
+    """Adds `value` to counter `name` with the given labels."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def _statement_kind(statement):
+    word = statement.lstrip()[:6].upper()
+    return word if word in SQL_KINDS else "OTHER"
+
+
+# Start times of the statements running on a connection, by cursor; an
+# entry is removed when its statement completes or raises
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", {})[id(cursor)] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started", {}).pop(id(cursor), None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    kind = _statement_kind(statement)
+    rows = cursor.rowcount if kind != "SELECT" and cursor.rowcount > 0 else 0
+    stages = _active.get()
+    with _lock:
+        for name, value in (("db_statements_total", 1), ("db_statement_seconds_total", elapsed),
+                            ("db_rows_total", rows)):
+            key = (name, (("kind", kind),))
+            _counters[key] = _counters.get(key, 0) + value
+        for stage in stages:
+            stage["sql_statements"] += 1
+            stage["sql_seconds"] += elapsed
+
+
+def _handle_error(context):
+    conn, execution = context.connection, context.execution_context
+    cursor = getattr(execution, "cursor", None)
+    if conn is None or cursor is None:
+        return
+    # Only statements that failed in execute; errors after it (e.g. while
+    # fetching) were already counted as completed statements
+    if conn.info.get("metrics_started", {}).pop(id(cursor), None) is not None:
+        increment("db_statement_errors_total", kind=_statement_kind(context.statement or ""))
+
+
+def instrument_engine(engine):
+    """Counts the statements run on `engine`, and those that fail; safe to call more than once."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def snapshot():
+    """
+    Copy of the current metrics:
+    - stages: {name: calls/errors/seconds/max_seconds/sql_statements/sql_seconds}
+    - counters / gauges: {(name, ((label, value), ...)): value}
+    """
+    with _lock:
+        return {
+            "stages": {name: dict(stage) for name, stage in _stages.items()},
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+        }
+
+
+def reset():
+    """Clears all stages and counters (gauges describe current state and are kept)."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def counter_total(name, **labels):
+    """Sum of counter `name` over every label set matching `labels`."""
+    wanted = set(labels.items())
+    with _lock:
+        return sum(value for (metric, key), value in _counters.items()
+                   if metric == name and wanted <= set(key))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    # Exact integers (":g" would round counters past 10^6 to 6 digits) and
+    # shortest round-tripping floats
+    if isinstance(value, numbers.Integral):
+        return f"{int(value):d}"
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _sample(name, labels, value):
+    label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    value = _format_value(value)
+    return f"{METRIC_PREFIX}{name}{{{label_text}}} {value}" if label_text else f"{METRIC_PREFIX}{name} {value}"
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    data = snapshot()
+    families = {}
+
+    stage_metrics = (
+        ("stage_calls_total", "calls", "counter", "Completed calls of each pipeline stage."),
+        ("stage_errors_total", "errors", "counter", "Calls of each pipeline stage that raised."),
+        ("stage_seconds_total", "seconds", "counter", "Wall time spent in each pipeline stage."),
+        ("stage_max_seconds", "max_seconds", "gauge", "Slowest single call of each pipeline stage."),
+        ("stage_sql_statements_total", "sql_statements", "counter", "SQL statements run inside each stage."),
+        ("stage_sql_seconds_total", "sql_seconds", "counter", "SQL execution time inside each stage."),
+    )
+    for metric, field, kind, help_text in stage_metrics:
+        families[metric] = (kind, help_text, [
+            ((("stage", name),), stage[field]) for name, stage in sorted(data["stages"].items())
+        ])
+
+    for kind, values in (("counter", data["counters"]), ("gauge", data["gauges"])):
+        for (name, labels), value in sorted(values.items()):
+            family = families.setdefault(name, (kind, METRIC_HELP.get(name, name.replace("_", " ")), []))
+            family[2].append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        if not samples:
+            continue
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+        lines.extend(_sample(name, labels, value) for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path=None):
+    """
+    Writes prometheus_text() to `path` (default METRICS_TEXTFILE) through a
+    temporary file and rename, so a scraper never reads a partial file.
+    Returns the path, or None when no path is configured.
+    """
+    path = path or METRICS_TEXTFILE
+    if not path:
+        return None
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _write_every(path, interval, stop):
+    while not stop.wait(interval):
+        try:
+            write_textfile(path)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {path}: {e}")
+
+
+def start_textfile_writer(path=None, interval=METRICS_WRITE_SECONDS):
+    """
+    Writes the textfile now and then every `interval` seconds from a daemon
+    thread. One writer per process: later calls return the running thread.
+    Returns None when no path is configured.
+    """
+    global _writer, _writer_stop
+    path = path or METRICS_TEXTFILE
+    if not path:
+        return None
+    with _lock:
+        if _writer is not None and _writer.is_alive():
+            return _writer
+        _writer_stop = threading.Event()
+        _writer = threading.Thread(target=_write_every, args=(path, interval, _writer_stop),
+                                   name="metrics-textfile", daemon=True)
+    write_textfile(path)
+    _writer.start()
+    return _writer
+
+
+def stop_textfile_writer():
+    """Stops the start_textfile_writer() thread (if any) after its current write."""
+    _writer_stop.set()
+    if _writer is not None:
+        _writer.join()
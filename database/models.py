@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, ForeignKey, Text, Index, PrimaryKeyConstraint, desc
+from sqlalchemy.orm import relationship, declarative_base, declared_attr
 from datetime import datetime, timezone
 
 Base = declarative_base()
@@ -32,6 +32,12 @@ class Video(Base):
     
     channel = relationship("Channel", back_populates="videos")
     statistics = relationship("VideoStatistics", back_populates="video", cascade="all, delete-orphan")
+    latest_stats = relationship("VideoLatestStats", back_populates="video", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # "videos of channel X", newest first; video_id is the keyset tie-breaker
+        Index("ix_videos_channel_published_id", "channel_id", "published_at", "video_id"),
+    )
 
 class VideoStatistics(Base):
     __tablename__ = 'video_statistics'
@@ -44,3 +50,116 @@ class VideoStatistics(Base):
     record_date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     video = relationship("Video", back_populates="statistics")
+
+    __table_args__ = (
+        # "latest stats per video" and time-range scans over the snapshot history
+        Index("ix_video_statistics_video_record_date", "video_id", desc("record_date")),
+        Index("ix_video_statistics_record_date", "record_date"),
+    )
+
+
+class VideoLatestStats(Base):
+    """One row per video with its most recent counters, kept current by persistence."""
+    __tablename__ = 'video_latest_stats'
+
+    video_id = Column(String(50), ForeignKey('videos.video_id'), primary_key=True)
+    channel_id = Column(String(50), ForeignKey('channels.channel_id'), nullable=False)
+    view_count = Column(BigInteger)
+    like_count = Column(BigInteger)
+    comment_count = Column(BigInteger)
+    record_date = Column(DateTime)  # date of the snapshot these counts come from
+    checked_at = Column(DateTime)   # last time the counts were fetched
+
+    video = relationship("Video", back_populates="latest_stats")
+
+    __table_args__ = (
+        Index("ix_video_latest_stats_channel_views", "channel_id", "view_count"),
+    )
+
+
+# ----------------- Dashboard aggregates -----------------
+# Maintained incrementally by database/aggregates.py on every video write,
+# so the dashboard reads a handful of rows instead of the whole catalog.
+
+class ChannelSummary(Base):
+    """Video count and latest-counter totals per channel (means = total / count)."""
+    __tablename__ = 'channel_summaries'
+
+    channel_id = Column(String(50), ForeignKey('channels.channel_id'), primary_key=True)
+    video_count = Column(BigInteger, nullable=False, default=0)
+    total_views = Column(BigInteger, nullable=False, default=0)
+    total_likes = Column(BigInteger, nullable=False, default=0)
+    total_comments = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+
+class ChannelMonthlyPosts(Base):
+    """Videos published per channel and calendar month (UTC, 'YYYY-MM')."""
+    __tablename__ = 'channel_monthly_posts'
+
+    channel_id = Column(String(50), ForeignKey('channels.channel_id'), primary_key=True)
+    month = Column(String(7), primary_key=True)
+    video_count = Column(Integer, nullable=False, default=0)
+
+
+class ChannelTopVideo(Base):
+    """A channel's most viewed videos, kept a little deeper than the dashboard shows."""
+    __tablename__ = 'channel_top_videos'
+
+    channel_id = Column(String(50), ForeignKey('channels.channel_id'), primary_key=True)
+    video_id = Column(String(50), ForeignKey('videos.video_id'), primary_key=True)
+    title = Column(String(255))
+    view_count = Column(BigInteger)
+    like_count = Column(BigInteger)
+    comment_count = Column(BigInteger)
+
+    __table_args__ = (
+        Index("ix_channel_top_videos_channel_views", "channel_id", "view_count"),
+    )
+
+
+# ----------------- Statistics rollups -----------------
+# Written by database/compaction.py: raw snapshots older than the retention
+# window are folded into one row per video and day, old days into one row
+# per video and ISO week (period_start = Monday 00:00 UTC).
+
+class _StatisticsRollup:
+    @declared_attr
+    def video_id(cls):
+        return Column(String(50), ForeignKey('videos.video_id'), nullable=False)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (PrimaryKeyConstraint("video_id", "period_start"),)
+
+    period_start = Column(DateTime, nullable=False)
+    samples = Column(Integer, nullable=False)  # raw snapshots folded into this row
+    first_recorded_at = Column(DateTime)
+    last_recorded_at = Column(DateTime)
+    view_count_min = Column(BigInteger)
+    view_count_max = Column(BigInteger)
+    view_count_last = Column(BigInteger)
+    like_count_min = Column(BigInteger)
+    like_count_max = Column(BigInteger)
+    like_count_last = Column(BigInteger)
+    comment_count_min = Column(BigInteger)
+    comment_count_max = Column(BigInteger)
+    comment_count_last = Column(BigInteger)
+
+
+class VideoStatisticsDaily(_StatisticsRollup, Base):
+    """Daily min/max/last counters of snapshots past the raw retention window."""
+    __tablename__ = 'video_statistics_daily'
+
+
+class VideoStatisticsWeekly(_StatisticsRollup, Base):
+    """Weekly min/max/last counters of daily rollups past the daily retention window."""
+    __tablename__ = 'video_statistics_weekly'
+
+
+class QuotaSpend(Base):
+    """YouTube API quota units spent per quota day (Pacific Time), shared by every process."""
+    __tablename__ = 'quota_spend'
+
+    day = Column(Date, primary_key=True)
+    spent = Column(Integer, nullable=False, default=0)
@@ -1,67 +1,479 @@
+import os
 from database.db_config import SessionLocal
-from database.models import Channel, Video, VideoStatistics
-from datetime import datetime
+from database.models import Channel, Video, VideoStatistics, VideoLatestStats
+from database.search import index_videos
+from database.aggregates import apply_video_batch
+from database.instrumentation import span
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+from sqlalchemy import select, insert, update, bindparam, text
+from sqlalchemy.dialects import sqlite, postgresql, mysql
+
+# IDs per lookup/DELETE ... IN (...), well below SQLite's bound-parameter
+# limit. Writes are executemany and need no chunking.
+BULK_CHUNK_SIZE = 500
+
+# Unchanged statistics are not re-recorded, except that a "heartbeat"
+# snapshot is kept once the latest one is this many days old (0 = never).
+STATS_HEARTBEAT_DAYS = int(os.getenv("STATS_HEARTBEAT_DAYS", "7"))
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _chunks(rows, size=BULK_CHUNK_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+# ----------------- Column helpers -----------------
+# These work on whole DataFrame columns instead of iterrows(), which is
+# what makes the bulk path cheap for large catalogs.
+
+def _text_column(df, name, default=None):
+    if name not in df.columns:
+        return [default] * len(df)
+    col = df[name].astype(object)
+    return col.where(col.notna(), default).tolist()
+
+
+def _int_column(df, name):
+    if name not in df.columns:
+        return [0] * len(df)
+    return pd.to_numeric(df[name], errors="coerce").fillna(0).astype("int64").tolist()
+
+
+def _datetime_column(df, name):
+    if name not in df.columns:
+        return [None] * len(df)
+    # Stored as naive UTC, matching the model defaults
+    col = pd.to_datetime(df[name], errors="coerce", utc=True).dt.tz_localize(None)
+    col = col.astype(object)
+    return col.where(col.notna(), None).tolist()
+
+
+def _records(columns):
+    """Turns a dict of equal-length column lists into row dicts."""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+# ----------------- Bulk write engine -----------------
+
+def _upsert_rows(db, table, rows, key, update_cols, existing_keys):
+    """
+    Inserts or updates `rows` using the dialect-native upsert.
+    - SQLite / Postgres: INSERT ... ON CONFLICT (key) DO UPDATE
+    - MySQL / MariaDB: INSERT ... ON DUPLICATE KEY UPDATE
+    - Anything else: INSERT for new keys, UPDATE for known keys
+    One statement per table, run as executemany: building a multi-row
+    VALUES statement per chunk made statement compilation dominate.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        insert_fn = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert_fn(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={col: stmt.excluded[col] for col in update_cols}
+        )
+        db.execute(stmt, rows)
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            {col: stmt.inserted[col] for col in update_cols}
+        )
+        db.execute(stmt, rows)
+        return
+
+    new_rows = [r for r in rows if r[key] not in existing_keys]
+    old_rows = [r for r in rows if r[key] in existing_keys]
+    _insert_rows(db, table, new_rows)
+    if old_rows:
+        stmt = (
+            update(table)
+            .where(table.c[key] == bindparam("_key"))
+            .values({col: bindparam(col) for col in update_cols})
+        )
+        db.execute(stmt, [{**r, "_key": r[key]} for r in old_rows])
+
+
+def _insert_rows(db, table, rows):
+    """Plain executemany INSERT (append-only tables)."""
+    if rows:
+        db.execute(insert(table), rows)
+
+
+@span("persist.channels")
+def save_channels_to_db(channel_df):
+    """
+    Bulk saves or updates channel rows in the database.
+    - Prefetches existing channel IDs in one query per chunk
+    - Writes with a dialect-native upsert
+    - Returns a dict with inserted/updated counts
+    """
+    summary = {"inserted": 0, "updated": 0}
+    if channel_df is None or len(channel_df) == 0:
+        return summary
+
+    channel_df = channel_df.drop_duplicates(subset="channel_id", keep="last")
+    now = _utcnow()
+    columns = {
+        "channel_id": _text_column(channel_df, "channel_id"),
+        "channel_name": _text_column(channel_df, "channel_name", ""),
+        "custom_url": _text_column(channel_df, "custom_url"),
+        "description": _text_column(channel_df, "description"),
+        "published_at": _datetime_column(channel_df, "published_at"),
+        "subscriber_count": _int_column(channel_df, "subscriber_count"),
+        "video_count": _int_column(channel_df, "video_count"),
+        "view_count": _int_column(channel_df, "view_count"),
+        "last_updated": [now] * len(channel_df),
+    }
+    rows = _records(columns)
+
+    db = SessionLocal()
+    try:
+        existing = set()
+        for chunk in _chunks(columns["channel_id"]):
+            existing.update(db.scalars(
+                select(Channel.channel_id).where(Channel.channel_id.in_(chunk))
+            ))
+
+        update_cols = [c for c in columns if c != "channel_id"]
+        _upsert_rows(db, Channel.__table__, rows, "channel_id", update_cols, existing)
+        db.commit()
+
+        summary["updated"] = len(existing)
+        summary["inserted"] = len(rows) - len(existing)
+    except Exception as e:
+        print(f"Error saving channels to DB: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    return summary
+
 
 def save_channel_to_db(channel_data_row):
     """Saves or updates channel data in the database."""
+    return save_channels_to_db(pd.DataFrame([channel_data_row]))
+
+
+LATEST_STATS_UPDATE_COLS = ["channel_id", "view_count", "like_count", "comment_count", "record_date", "checked_at"]
+
+
+def _lock_channels(db, channel_ids):
+    """
+    Takes the write lock for the channels about to be written, at the start
+    of the transaction and before the previous state the aggregate deltas
+    are computed from is read, so concurrent writers serialize instead of
+    both applying deltas against the same stale state.
+    - SQLite: BEGIN IMMEDIATE (pysqlite would only begin at the first DML,
+      leaving the reads outside the write transaction)
+    - Elsewhere: SELECT ... FOR UPDATE on the channels' rows, in key order
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("BEGIN IMMEDIATE"))
+    else:
+        db.execute(
+            select(Channel.channel_id)
+            .where(Channel.channel_id.in_(sorted(channel_ids)))
+            .order_by(Channel.channel_id)
+            .with_for_update()
+        )
+
+
+def _latest_snapshots(db, video_ids):
+    """
+    Latest (view, like, comment, record_date) per video, read from the
+    video_latest_stats table with one indexed lookup per chunk of IDs.
+    """
+    latest = {}
+    for chunk in _chunks(video_ids):
+        stmt = select(
+            VideoLatestStats.video_id,
+            VideoLatestStats.view_count,
+            VideoLatestStats.like_count,
+            VideoLatestStats.comment_count,
+            VideoLatestStats.record_date,
+        ).where(VideoLatestStats.video_id.in_(chunk))
+        for video_id, views, likes, comments, record_date in db.execute(stmt):
+            latest[video_id] = (views, likes, comments, record_date)
+    return latest
+
+
+def _stored_videos(db, video_ids):
+    """(title, description, published_at) per already-stored video, before a batch overwrites them."""
+    stored = {}
+    for chunk in _chunks(video_ids):
+        stmt = select(Video.video_id, Video.title, Video.description, Video.published_at).where(
+            Video.video_id.in_(chunk)
+        )
+        for video_id, title, description, published_at in db.execute(stmt):
+            stored[video_id] = (title, description, published_at)
+    return stored
+
+
+def _changed_snapshot_mask(stats_columns, latest, now, heartbeat_days):
+    """
+    True for each incoming snapshot that should be written: new videos,
+    changed counts, or (with heartbeat_days) a latest snapshot that is older
+    than the heartbeat interval.
+    """
+    heartbeat_before = now - timedelta(days=heartbeat_days) if heartbeat_days else None
+
+    mask = []
+    for vid, views, likes, comments in zip(stats_columns["video_id"], stats_columns["view_count"],
+                                           stats_columns["like_count"], stats_columns["comment_count"]):
+        previous = latest.get(vid)
+        if previous is None or previous[:3] != (views, likes, comments):
+            mask.append(True)
+        else:
+            mask.append(heartbeat_before is not None and previous[3] is not None
+                        and previous[3] <= heartbeat_before)
+    return mask
+
+
+def _snapshot_rows(stats_columns, channel_id, latest, now, skip_unchanged, heartbeat_days):
+    """
+    (video_statistics rows to insert, video_latest_stats rows to upsert) for
+    one channel's fetched counters. Every video gets a latest row with
+    checked_at = now; skipped snapshots keep their previous record_date.
+    """
+    if skip_unchanged:
+        keep = _changed_snapshot_mask(stats_columns, latest, now, heartbeat_days)
+    else:
+        keep = [True] * len(stats_columns["video_id"])
+
+    records = _records(stats_columns)
+    stats_rows = [row for row, k in zip(records, keep) if k]
+    latest_rows = [
+        {
+            "video_id": row["video_id"],
+            "channel_id": channel_id,
+            "view_count": row["view_count"],
+            "like_count": row["like_count"],
+            "comment_count": row["comment_count"],
+            "record_date": now if k else latest[row["video_id"]][3],
+            "checked_at": now,
+        }
+        for row, k in zip(records, keep)
+    ]
+    return stats_rows, latest_rows
+
+
+@span("persist.video_batch")
+def _write_video_batch(db, video_df, channel_id, existing, now,
+                       skip_unchanged=True, heartbeat_days=STATS_HEARTBEAT_DAYS):
+    """
+    Upserts one batch of videos and inserts their statistics snapshots.
+    `existing` is the set of the channel's stored video IDs; it is updated
+    in place so later batches of the same write see the new rows.
+    With skip_unchanged, snapshots identical to a video's latest one are
+    dropped (see _changed_snapshot_mask). video_latest_stats is upserted for
+    every video in the batch; the search index and dashboard aggregates are
+    updated in the same transaction.
+    """
+    video_df = video_df.drop_duplicates(subset="video_id", keep="last")
+    video_ids = _text_column(video_df, "video_id")
+
+    video_columns = {
+        "video_id": video_ids,
+        "channel_id": [channel_id] * len(video_ids),
+        "title": _text_column(video_df, "title", ""),
+        "description": _text_column(video_df, "description", ""),
+        "published_at": _datetime_column(video_df, "published_at"),
+        # Duration is expected to be parsed already in video_extractor
+        "duration_seconds": _int_column(video_df, "duration_seconds"),
+        "last_updated": [now] * len(video_ids),
+    }
+    stats_columns = {
+        "video_id": video_ids,
+        "view_count": _int_column(video_df, "view_count"),
+        "like_count": _int_column(video_df, "like_count"),
+        "comment_count": _int_column(video_df, "comment_count"),
+        "record_date": [now] * len(video_ids),
+    }
+
+    _lock_channels(db, [channel_id])
+    # Re-read under the lock: another writer may have stored some of these since `existing` was read
+    for chunk in _chunks(video_ids):
+        existing.update(db.scalars(
+            select(Video.video_id).where(Video.channel_id == channel_id, Video.video_id.in_(chunk))
+        ))
+    known_ids = [vid for vid in video_ids if vid in existing]
+    latest = _latest_snapshots(db, known_ids)
+    stored = _stored_videos(db, known_ids)
+    stats_rows, latest_rows = _snapshot_rows(stats_columns, channel_id, latest, now,
+                                             skip_unchanged, heartbeat_days)
+
+    update_cols = [c for c in video_columns if c != "video_id"]
+    video_rows = _records(video_columns)
+    with span("persist.search_index"):
+        index_videos(db, video_rows, stored)
+    _upsert_rows(db, Video.__table__, video_rows, "video_id", update_cols, existing)
+    _insert_rows(db, VideoStatistics.__table__, stats_rows)
+    _upsert_rows(db, VideoLatestStats.__table__, latest_rows, "video_id", LATEST_STATS_UPDATE_COLS, set(latest))
+    with span("persist.aggregates"):
+        apply_video_batch(db, channel_id, video_rows, stored, latest, latest_rows)
+
+    updated = sum(1 for vid in video_ids if vid in existing)
+    existing.update(video_ids)
+    return {
+        "inserted": len(video_ids) - updated,
+        "updated": updated,
+        "statistics": len(stats_rows),
+        "skipped": len(video_ids) - len(stats_rows),
+    }
+
+
+def _add_counts(summary, counts):
+    for key, value in counts.items():
+        summary[key] = summary.get(key, 0) + value
+
+
+def save_videos_to_db(video_df, channel_id, skip_unchanged=True, heartbeat_days=STATS_HEARTBEAT_DAYS):
+    """
+    Saves or updates video data and statistics in the database.
+    - Prefetches the channel's existing video IDs in a single query
+    - Upserts Video rows in chunks with the dialect-native upsert
+    - Bulk inserts a VideoStatistics snapshot per video whose counts changed
+      (or whose latest snapshot is older than heartbeat_days)
+    - Re-indexes new or retitled videos for full-text search
+    - Folds the batch into the dashboard aggregate tables
+    - Returns a dict with inserted/updated/statistics/skipped counts
+    """
+    summary = {"inserted": 0, "updated": 0, "statistics": 0, "skipped": 0}
+    if video_df is None or len(video_df) == 0:
+        return summary
+
     db = SessionLocal()
     try:
-        channel_id = channel_data_row['channel_id']
-        
-        # Check if exists
-        channel = db.query(Channel).filter(Channel.channel_id == channel_id).first()
-        
-        if not channel:
-            channel = Channel(channel_id=channel_id)
-            db.add(channel)
-            
-        channel.channel_name = channel_data_row['channel_name']
-        channel.custom_url = channel_data_row.get('custom_url')
-        channel.description = channel_data_row.get('description')
-        channel.published_at = pd.to_datetime(channel_data_row['published_at'])
-        channel.subscriber_count = int(channel_data_row['subscriber_count'])
-        channel.video_count = int(channel_data_row['video_count'])
-        channel.view_count = int(channel_data_row['view_count'])
-        
-        db.commit()
+        existing = set(db.scalars(
+            select(Video.video_id).where(Video.channel_id == channel_id)
+        ))
+        counts = _write_video_batch(db, video_df, channel_id, existing, _utcnow(),
+                                    skip_unchanged, heartbeat_days)
+        with span("persist.commit"):
+            db.commit()
+        _add_counts(summary, counts)
     except Exception as e:
-        print(f"Error saving channel to DB: {e}")
+        print(f"Error saving videos to DB: {e}")
         db.rollback()
     finally:
         db.close()
 
-def save_videos_to_db(video_df, channel_id):
-    """Saves or updates video data and statistics in the database."""
+    return summary
+
+
+def save_video_stream_to_db(batches, channel_id, skip_unchanged=True, heartbeat_days=STATS_HEARTBEAT_DAYS):
+    """
+    Persists a stream of video DataFrame batches (e.g. iter_video_batches).
+    - Prefetches the channel's existing video IDs once
+    - Commits after every batch, so a crawl that dies part-way keeps what
+      was already written and memory stays bounded by one batch
+    - Errors raised by the stream itself propagate after earlier batches
+      are committed; write errors roll back the current batch and stop
+    Returns a dict with inserted/updated/statistics/skipped/batches counts.
+    """
+    summary = {"inserted": 0, "updated": 0, "statistics": 0, "skipped": 0, "batches": 0}
+    now = _utcnow()
+
+    db = SessionLocal()
+    try:
+        existing = set(db.scalars(
+            select(Video.video_id).where(Video.channel_id == channel_id)
+        ))
+        for batch in batches:
+            if batch is None or len(batch) == 0:
+                continue
+            try:
+                counts = _write_video_batch(db, batch, channel_id, existing, now,
+                                            skip_unchanged, heartbeat_days)
+                with span("persist.commit"):
+                    db.commit()
+            except Exception as e:
+                print(f"Error saving videos to DB: {e}")
+                db.rollback()
+                break
+            _add_counts(summary, counts)
+            summary["batches"] += 1
+    finally:
+        db.close()
+
+    return summary
+
+
+@span("persist.statistics")
+def save_statistics_to_db(stats_df, checked_ids=(), skip_unchanged=True, heartbeat_days=STATS_HEARTBEAT_DAYS):
+    """
+    Records fresh counters for already-archived videos, without touching
+    their metadata (the statistics-only refresh path).
+    - stats_df: video_id, view_count, like_count, comment_count; IDs that
+      are not stored are ignored
+    - checked_ids: further IDs that were requested but not returned (e.g.
+      deleted videos); their checked_at is advanced so they are not asked
+      for again on every refresh
+    - Snapshots, video_latest_stats and the dashboard aggregates are written
+      per channel in one transaction
+    Returns a dict with statistics/skipped/missing counts.
+    """
+    summary = {"statistics": 0, "skipped": 0, "missing": 0}
+    now = _utcnow()
+    has_rows = stats_df is not None and len(stats_df) > 0
+
     db = SessionLocal()
     try:
-        for _, row in video_df.iterrows():
-            video_id = row['video_id']
-            
-            # Upsert Video
-            video = db.query(Video).filter(Video.video_id == video_id).first()
-            if not video:
-                video = Video(video_id=video_id, channel_id=channel_id)
-                db.add(video)
-                
-            video.title = row['title']
-            video.description = row.get('description', '')
-            video.published_at = pd.to_datetime(row['published_at'])
-            # Duration is expected to be parsed already in video_extractor
-            video.duration_seconds = int(row.get('duration_seconds', 0))
-            
-            # Add new statistics record
-            stats = VideoStatistics(
-                video_id=video_id,
-                view_count=int(row['view_count']),
-                like_count=int(row['like_count']),
-                comment_count=int(row['comment_count'])
+        if has_rows:
+            stats_df = stats_df.drop_duplicates(subset="video_id", keep="last")
+            video_ids = _text_column(stats_df, "video_id")
+            channel_of = {}
+            for chunk in _chunks(video_ids):
+                channel_of.update(db.execute(
+                    select(Video.video_id, Video.channel_id).where(Video.video_id.in_(chunk))
+                ).all())
+
+            stats_df = stats_df[stats_df["video_id"].isin(channel_of)]
+            _lock_channels(db, set(channel_of.values()))
+            for channel_id, channel_df in stats_df.groupby(stats_df["video_id"].map(channel_of), sort=False):
+                ids = _text_column(channel_df, "video_id")
+                stats_columns = {
+                    "video_id": ids,
+                    "view_count": _int_column(channel_df, "view_count"),
+                    "like_count": _int_column(channel_df, "like_count"),
+                    "comment_count": _int_column(channel_df, "comment_count"),
+                    "record_date": [now] * len(ids),
+                }
+                latest = _latest_snapshots(db, ids)
+                stats_rows, latest_rows = _snapshot_rows(stats_columns, channel_id, latest, now,
+                                                         skip_unchanged, heartbeat_days)
+                _insert_rows(db, VideoStatistics.__table__, stats_rows)
+                _upsert_rows(db, VideoLatestStats.__table__, latest_rows, "video_id",
+                             LATEST_STATS_UPDATE_COLS, set(latest))
+                apply_video_batch(db, channel_id, [], _stored_videos(db, ids), latest, latest_rows)
+                summary["statistics"] += len(stats_rows)
+                summary["skipped"] += len(ids) - len(stats_rows)
+
+        returned = set(stats_df["video_id"]) if has_rows else set()
+        missing = [vid for vid in checked_ids if vid not in returned]
+        for chunk in _chunks(missing):
+            db.execute(
+                update(VideoLatestStats.__table__)
+                .where(VideoLatestStats.video_id.in_(chunk))
+                .values(checked_at=now)
             )
-            db.add(stats)
-            
+        summary["missing"] = len(missing)
         db.commit()
     except Exception as e:
-        print(f"Error saving videos to DB: {e}")
+        print(f"Error saving statistics to DB: {e}")
         db.rollback()
     finally:
         db.close()
+
+    return summary
@@ -0,0 +1,399 @@
+from database.db_config import SessionLocal
+from database.models import Channel, Video, VideoLatestStats, ChannelSummary, ChannelMonthlyPosts, ChannelTopVideo
+from database.search import search_clause, rank_videos, tokenize
+from database.growth import supports_window_functions
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, and_, or_, case
+import pandas as pd
+
+PAGE_SIZE = 50
+
+# Window (days) the comparison view measures recent posting cadence over
+CADENCE_DAYS = 90
+
+# Sort keys the Videos page can push down to SQL. These are bare columns so
+# an index such as ix_videos_channel_published_id can serve the ORDER BY;
+# NULLs sort below every value (see _keyset_after / _order_by).
+SORT_KEYS = {
+    "published_at": Video.published_at,
+    "view_count": VideoLatestStats.view_count,
+    "like_count": VideoLatestStats.like_count,
+    "comment_count": VideoLatestStats.comment_count,
+    "duration_seconds": Video.duration_seconds,
+    "title": Video.title,
+}
+# Backends whose default ordering puts NULLs above every value
+_NULLS_HIGH_DIALECTS = ("postgresql", "oracle")
+# "relevance" orders search results by full-text rank (see fetch_video_page)
+RELEVANCE = "relevance"
+
+PAGE_COLUMNS = [
+    "video_id", "title", "published_at", "duration_seconds",
+    "view_count", "like_count", "comment_count", "description",
+]
+
+
+def get_known_video_ids(channel_id):
+    """Returns the video IDs already stored for a channel, newest first."""
+    db = SessionLocal()
+    try:
+        return list(db.scalars(
+            select(Video.video_id)
+            .where(Video.channel_id == channel_id)
+            .order_by(Video.published_at.desc(), Video.video_id)
+        ))
+    finally:
+        db.close()
+
+
+def load_videos_from_db(channel_id, video_ids=None):
+    """
+    Loads stored video metadata for a channel, newest first.
+    - Returns the metadata columns only (no statistics)
+    - video_ids restricts the result to those videos
+    - Returns an empty DataFrame if nothing is stored
+    """
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(
+                Video.video_id,
+                Video.title,
+                Video.description,
+                Video.published_at,
+                Video.duration_seconds,
+            )
+            .where(Video.channel_id == channel_id)
+            .order_by(Video.published_at.desc(), Video.video_id)
+        )
+        if video_ids is not None:
+            stmt = stmt.where(Video.video_id.in_(list(video_ids)))
+        rows = db.execute(stmt).all()
+        return pd.DataFrame(rows, columns=[
+            "video_id", "title", "description", "published_at", "duration_seconds"
+        ])
+    finally:
+        db.close()
+
+
+def load_video_frame(channel_id):
+    """
+    Stored videos of a channel with their latest statistics, newest first.
+    Metadata/count columns of the extractor frame, without descriptions or
+    thumbnails (see data_processing.video_frame for loading those on demand).
+    """
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(
+                Video.video_id,
+                Video.title,
+                Video.published_at,
+                Video.duration_seconds,
+                VideoLatestStats.view_count,
+                VideoLatestStats.like_count,
+                VideoLatestStats.comment_count,
+            )
+            .outerjoin(VideoLatestStats, VideoLatestStats.video_id == Video.video_id)
+            .where(Video.channel_id == channel_id)
+            .order_by(Video.published_at.desc(), Video.video_id)
+        )
+        df = pd.DataFrame(db.execute(stmt).all(), columns=[
+            "video_id", "title", "published_at", "duration_seconds",
+            "view_count", "like_count", "comment_count",
+        ])
+    finally:
+        db.close()
+
+    if not df.empty:
+        for col in ["duration_seconds", "view_count", "like_count", "comment_count"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+        df["published_at"] = pd.to_datetime(df["published_at"], utc=True)
+    return df
+
+
+def load_video_descriptions(video_ids, chunk_size=500):
+    """{video_id: description} for the given videos."""
+    descriptions = {}
+    db = SessionLocal()
+    try:
+        for i in range(0, len(video_ids), chunk_size):
+            stmt = select(Video.video_id, Video.description).where(
+                Video.video_id.in_(video_ids[i:i + chunk_size])
+            )
+            descriptions.update(db.execute(stmt).all())
+    finally:
+        db.close()
+    return descriptions
+
+
+def _archive_filter(stmt, db, channel_id, search):
+    # A search clause is already scoped to the channel (see search_clause)
+    clause = search_clause(db, channel_id, search) if search else None
+    if clause is None:
+        return stmt.where(Video.channel_id == channel_id)
+    return stmt.where(clause)
+
+
+def count_videos(channel_id, search=None):
+    """Number of archived videos of a channel matching `search`."""
+    db = SessionLocal()
+    try:
+        stmt = _archive_filter(select(func.count()).select_from(Video), db, channel_id, search)
+        return db.execute(stmt).scalar() or 0
+    finally:
+        db.close()
+
+
+def channel_video_summary(channel_id):
+    """Video count and average latest views/likes/comments, from channel_summaries."""
+    db = SessionLocal()
+    try:
+        summary = db.get(ChannelSummary, channel_id)
+    finally:
+        db.close()
+
+    count = summary.video_count if summary is not None else 0
+    return {
+        "video_count": count,
+        "avg_views": summary.total_views / count if count else 0.0,
+        "avg_likes": summary.total_likes / count if count else 0.0,
+        "avg_comments": summary.total_comments / count if count else 0.0,
+    }
+
+
+def load_monthly_posts(channel_id):
+    """Videos posted per month ('YYYY-MM'), oldest first, from channel_monthly_posts."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(ChannelMonthlyPosts.month, ChannelMonthlyPosts.video_count)
+            .where(ChannelMonthlyPosts.channel_id == channel_id)
+            .order_by(ChannelMonthlyPosts.month)
+        ).all()
+    finally:
+        db.close()
+    return pd.DataFrame(rows, columns=["month_year", "video_count"])
+
+
+def load_top_videos(channel_id, n=10):
+    """The channel's n most viewed videos, from channel_top_videos."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(ChannelTopVideo.video_id, ChannelTopVideo.title, ChannelTopVideo.view_count,
+                   ChannelTopVideo.like_count, ChannelTopVideo.comment_count)
+            .where(ChannelTopVideo.channel_id == channel_id)
+            .order_by(ChannelTopVideo.view_count.desc(), ChannelTopVideo.video_id)
+            .limit(n)
+        ).all()
+    finally:
+        db.close()
+    return pd.DataFrame(rows, columns=["video_id", "title", "view_count", "like_count", "comment_count"])
+
+
+def _page_select(*extra):
+    return (
+        select(
+            Video.video_id,
+            Video.title,
+            Video.published_at,
+            Video.duration_seconds,
+            VideoLatestStats.view_count,
+            VideoLatestStats.like_count,
+            VideoLatestStats.comment_count,
+            Video.description,
+            *extra,
+        )
+        .outerjoin(VideoLatestStats, VideoLatestStats.video_id == Video.video_id)
+    )
+
+
+def _fetch_ranked_page(db, channel_id, search, offset, limit):
+    """Search results by relevance; the cursor is the offset into the ranking."""
+    ranked = rank_videos(db, channel_id, search, limit + 1, offset)
+    page_ids = ranked[:limit]
+    rows = db.execute(_page_select().where(Video.video_id.in_(page_ids))).all() if page_ids else []
+
+    df = pd.DataFrame(rows, columns=PAGE_COLUMNS)
+    order = {vid: i for i, vid in enumerate(page_ids)}
+    df = df.sort_values("video_id", key=lambda ids: ids.map(order)).reset_index(drop=True)
+    next_cursor = offset + limit if len(ranked) > limit else None
+    return df, next_cursor
+
+
+def _keyset_after(key, descending, after_key, after_id):
+    """Rows after the cursor (after_key, after_id) in (key, video_id) order, NULL keys lowest."""
+    if descending:
+        if after_key is None:
+            return and_(key.is_(None), Video.video_id < after_id)
+        return or_(key < after_key, key.is_(None), and_(key == after_key, Video.video_id < after_id))
+    if after_key is None:
+        return or_(key.is_not(None), and_(key.is_(None), Video.video_id > after_id))
+    return or_(key > after_key, and_(key == after_key, Video.video_id > after_id))
+
+
+def _order_by(stmt, key, descending, dialect):
+    if descending:
+        key, video_id = key.desc(), Video.video_id.desc()
+    else:
+        key, video_id = key.asc(), Video.video_id.asc()
+    # Spelled out only where it differs from the default, so SQLite/MySQL
+    # keep a plain ORDER BY that an index can satisfy
+    if dialect.name in _NULLS_HIGH_DIALECTS:
+        key = key.nulls_last() if descending else key.nulls_first()
+    return stmt.order_by(key, video_id)
+
+
+def _keyset_page_select(db, channel_id, sort, descending, search, after, limit):
+    key = SORT_KEYS[sort]
+    stmt = _archive_filter(_page_select(key.label("sort_key")), db, channel_id, search)
+    if after is not None:
+        stmt = stmt.where(_keyset_after(key, descending, *after))
+    return _order_by(stmt, key, descending, db.get_bind().dialect).limit(limit)
+
+
+def fetch_video_page(channel_id, sort="published_at", descending=True, search=None,
+                     after=None, limit=PAGE_SIZE):
+    """
+    One page of a channel's archive using keyset pagination.
+    - Ordered by (sort key, video_id); sorting and filtering run in SQL
+    - `search` matches title and description words by prefix through the
+      full-text index (database/search.py)
+    - sort="relevance" orders search results by rank instead; without a
+      search it falls back to published_at
+    - `after` is the cursor returned for the previous page (None = first page)
+    - Only `limit` rows are materialized
+    Returns (DataFrame, next_cursor); next_cursor is None on the last page.
+    """
+    db = SessionLocal()
+    try:
+        if sort == RELEVANCE:
+            if search and tokenize(search):
+                return _fetch_ranked_page(db, channel_id, search, after or 0, limit)
+            sort = "published_at"
+
+        # One extra row tells us whether another page exists
+        rows = db.execute(_keyset_page_select(db, channel_id, sort, descending, search, after, limit + 1)).all()
+    finally:
+        db.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    df = pd.DataFrame(rows, columns=PAGE_COLUMNS + ["sort_key"])
+    next_cursor = (rows[-1].sort_key, rows[-1].video_id) if has_more and rows else None
+    return df.drop(columns="sort_key"), next_cursor
+
+
+def list_channels():
+    """Stored channels with their archived video count, by name."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Channel.channel_id, Channel.channel_name, Channel.subscriber_count,
+                   func.coalesce(ChannelSummary.video_count, 0))
+            .outerjoin(ChannelSummary, ChannelSummary.channel_id == Channel.channel_id)
+            .order_by(Channel.channel_name, Channel.channel_id)
+        ).all()
+    finally:
+        db.close()
+    return pd.DataFrame(rows, columns=["channel_id", "channel_name", "subscriber_count", "archived_videos"])
+
+
+def _median_views(db, channel_ids):
+    """{channel_id: median latest view count}, computed in SQL where window functions exist."""
+    if supports_window_functions(db.connection()):
+        ranked = (
+            select(
+                VideoLatestStats.channel_id,
+                VideoLatestStats.view_count,
+                func.row_number().over(partition_by=VideoLatestStats.channel_id,
+                                       order_by=VideoLatestStats.view_count).label("rn"),
+                func.count().over(partition_by=VideoLatestStats.channel_id).label("n"),
+            )
+            .where(VideoLatestStats.channel_id.in_(channel_ids))
+            .subquery()
+        )
+        # The middle row (odd n) or the two middle rows (even n), in integer arithmetic
+        stmt = (
+            select(ranked.c.channel_id, func.avg(ranked.c.view_count))
+            .where(ranked.c.rn * 2 >= ranked.c.n, ranked.c.rn * 2 <= ranked.c.n + 2)
+            .group_by(ranked.c.channel_id)
+        )
+        return {cid: float(median) for cid, median in db.execute(stmt).all()}
+
+    rows = db.execute(
+        select(VideoLatestStats.channel_id, VideoLatestStats.view_count)
+        .where(VideoLatestStats.channel_id.in_(channel_ids))
+    ).all()
+    views = pd.DataFrame(rows, columns=["channel_id", "view_count"])
+    return views.groupby("channel_id")["view_count"].median().to_dict()
+
+
+def load_channel_comparison(channel_ids, cadence_days=CADENCE_DAYS, now=None):
+    """
+    Side-by-side metrics for stored channels, one row per channel in the
+    order given. Everything comes from grouped aggregates over videos and
+    video_latest_stats (one row per channel), never from per-video frames:
+    - archived_videos, total_views, avg_views, median_views
+    - engagement_rate: (likes + comments) / views; like_rate: likes / views
+    - uploads_per_week over the last `cadence_days`, days_between_uploads
+      over the whole archive, last_upload
+    """
+    channel_ids = list(dict.fromkeys(channel_ids))
+    columns = [
+        "channel_id", "channel_name", "subscriber_count", "archived_videos", "total_views",
+        "avg_views", "median_views", "engagement_rate", "like_rate",
+        "uploads_per_week", "days_between_uploads", "last_upload",
+    ]
+    if not channel_ids:
+        return pd.DataFrame(columns=columns)
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    since = now - timedelta(days=cadence_days)
+    db = SessionLocal()
+    try:
+        channels = db.execute(
+            select(Channel.channel_id, Channel.channel_name, Channel.subscriber_count)
+            .where(Channel.channel_id.in_(channel_ids))
+        ).all()
+        totals = db.execute(
+            select(
+                Video.channel_id,
+                func.count(Video.video_id),
+                func.coalesce(func.sum(VideoLatestStats.view_count), 0),
+                func.coalesce(func.sum(VideoLatestStats.like_count), 0),
+                func.coalesce(func.sum(VideoLatestStats.comment_count), 0),
+                func.min(Video.published_at),
+                func.max(Video.published_at),
+                func.sum(case((Video.published_at >= since, 1), else_=0)),
+            )
+            .outerjoin(VideoLatestStats, VideoLatestStats.video_id == Video.video_id)
+            .where(Video.channel_id.in_(channel_ids))
+            .group_by(Video.channel_id)
+        ).all()
+        medians = _median_views(db, channel_ids)
+    finally:
+        db.close()
+
+    df = pd.DataFrame(channels, columns=["channel_id", "channel_name", "subscriber_count"])
+    grouped = pd.DataFrame(totals, columns=[
+        "channel_id", "archived_videos", "views", "likes", "comments", "first_upload", "last_upload", "recent",
+    ])
+    df = df.merge(grouped, on="channel_id", how="left")
+    for col in ("archived_videos", "views", "likes", "comments", "recent"):
+        df[col] = pd.to_numeric(df[col]).fillna(0).astype("int64")
+
+    views = df["views"].where(df["views"] > 0)
+    span_days = (pd.to_datetime(df["last_upload"]) - pd.to_datetime(df["first_upload"])).dt.total_seconds() / 86400
+    df["total_views"] = df["views"]
+    df["avg_views"] = df["views"] / df["archived_videos"].where(df["archived_videos"] > 0)
+    df["median_views"] = df["channel_id"].map(medians)
+    df["engagement_rate"] = (df["likes"] + df["comments"]) / views
+    df["like_rate"] = df["likes"] / views
+    df["uploads_per_week"] = df["recent"] * 7 / cadence_days
+    df["days_between_uploads"] = span_days / (df["archived_videos"] - 1).where(df["archived_videos"] > 1)
+
+    order = {cid: i for i, cid in enumerate(channel_ids)}
+    df = df.sort_values("channel_id", key=lambda ids: ids.map(order)).reset_index(drop=True)
+    return df[columns]
@@ -0,0 +1,79 @@
+"""
+Daily YouTube API quota spend shared through the database.
+
+The app and the statistics refresher each run their own QuotaScheduler.
+With a DatabaseQuotaLedger (the refresher always; the app with
+YOUTUBE_QUOTA_LEDGER=db) they charge one quota_spend row per quota day, so
+restarts keep the day's spend and the processes together stay within
+YouTube's real quota. Each charge is a single conditional UPDATE, which
+keeps concurrent processes from overshooting a budget; the cost is one
+small write transaction per API call.
+"""
+import os
+import sys
+
+from sqlalchemy import inspect, select, insert, update, true
+from sqlalchemy.exc import IntegrityError
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import engine
+from database.models import QuotaSpend
+
+_table = QuotaSpend.__table__
+
+
+def _spent(conn, day):
+    return conn.execute(select(_table.c.spent).where(_table.c.day == day)).scalar()
+
+
+def _create_day(bind, day):
+    """Creates the day's row; another process may create it first."""
+    try:
+        with bind.begin() as conn:
+            conn.execute(insert(_table).values(day=day, spent=0))
+    except IntegrityError:
+        pass
+
+
+class DatabaseQuotaLedger:
+    """Quota spend per day in the quota_spend table (see QuotaLedger for the interface)."""
+
+    def __init__(self, bind=None):
+        self.bind = bind or engine
+        # Fail here rather than on the first API call, where extractors
+        # would report a missing table as a failed fetch
+        if not inspect(self.bind).has_table(_table.name):
+            raise RuntimeError(f"The {_table.name} table is missing; run `python -m database.init_db` first.")
+
+    def spent(self, day):
+        with self.bind.connect() as conn:
+            return _spent(conn, day) or 0
+
+    def _update(self, day, condition, values):
+        """Runs the update on the day's row, creating the row first if the day is new."""
+        for _ in range(2):
+            with self.bind.begin() as conn:
+                updated = conn.execute(
+                    update(_table).where(_table.c.day == day, condition).values(**values)
+                ).rowcount == 1
+                spent = _spent(conn, day)
+            if spent is not None:
+                return updated, spent
+            _create_day(self.bind, day)
+        return updated, spent or 0
+
+    def charge(self, day, cost, budget=None):
+        """
+        Adds `cost` units to the day's spend unless that would exceed
+        `budget` (None: unconditionally). Returns (charged, units spent).
+        """
+        within = _table.c.spent + cost <= budget if budget is not None else true()
+        return self._update(day, within, {"spent": _table.c.spent + cost})
+
+    def exhaust(self, day, units):
+        """Raises the day's spend to at least `units`."""
+        self._update(day, _table.c.spent < units, {"spent": units})
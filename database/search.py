@@ -0,0 +1,368 @@
+import os
+import re
+import sys
+import bisect
+import sqlite3
+import threading
+import unicodedata
+from sqlalchemy import select, text, func, and_, bindparam, literal_column, table, column
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.models import Video
+
+# auto (pick per database), fts5, postgres or memory
+SEARCH_BACKEND = os.getenv("VIDEO_SEARCH_BACKEND", "auto").lower()
+
+# Title matches rank above description matches in every backend
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# IDs per lookup/DELETE ... IN (...), well below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+# SQLite: standalone FTS5 table, one row per video. Prefix indexes serve
+# short prefixes without expanding them over the whole vocabulary.
+# UNINDEXED columns can only be scanned, so rows are replaced by rowid: the
+# keys table gives every video a stable integer ID (an explicit INTEGER
+# PRIMARY KEY, unlike the videos rowid, survives VACUUM) used as its rowid.
+FTS_TABLE = "video_search"
+FTS_KEYS_TABLE = "video_search_keys"
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "video_id UNINDEXED, channel_id UNINDEXED, title, description, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+FTS_KEYS_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {FTS_KEYS_TABLE} ("
+    "id INTEGER PRIMARY KEY, video_id VARCHAR(50) NOT NULL UNIQUE)"
+)
+video_search = table(FTS_TABLE, column("video_id"), column("channel_id"),
+                     column("title"), column("description"))
+
+# Postgres: GIN index over a weighted tsvector expression. Queries must use
+# the exact same expression for the planner to pick the index.
+PG_DOCUMENT = (
+    "(setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B'))"
+)
+PG_INDEX = "ix_videos_search_document"
+PG_DDL = f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON videos USING GIN ({PG_DOCUMENT})"
+
+_TOKEN = re.compile(r"[^\W_]+")
+_fts5_available = None
+
+
+def tokenize(value, fold=True):
+    """
+    Lowercased word tokens; fold=True also strips diacritics, matching the
+    FTS5 unicode61 tokenizer (Postgres' 'simple' config keeps them).
+    """
+    if not fold:
+        return _TOKEN.findall((value or "").lower())
+    folded = unicodedata.normalize("NFKD", (value or "").lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN.findall(folded)
+
+
+def _dialect(db):
+    dialect = getattr(db, "dialect", None)
+    return dialect if dialect is not None else db.get_bind().dialect
+
+
+def _sqlite_has_fts5():
+    global _fts5_available
+    if _fts5_available is None:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+            _fts5_available = True
+        except sqlite3.OperationalError:
+            _fts5_available = False
+        finally:
+            conn.close()
+    return _fts5_available
+
+
+def search_backend(db):
+    """fts5, postgres or memory for the database behind `db` (Session or Connection)."""
+    if SEARCH_BACKEND != "auto":
+        return SEARCH_BACKEND
+    name = _dialect(db).name
+    if name == "postgresql":
+        return "postgres"
+    if name == "sqlite" and _sqlite_has_fts5():
+        return "fts5"
+    return "memory"
+
+
+class InvertedIndex:
+    """
+    In-process fallback index for databases without native full-text search.
+    - Per channel: token -> {video_id: weight} postings and a sorted
+      vocabulary, so prefix terms are a bisect range scan
+    - Channels are loaded from the database on first search and then kept
+      current by index_videos()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def loaded(self, channel_id):
+        with self._lock:
+            return channel_id in self._channels
+
+    def load(self, channel_id, rows):
+        """Replaces a channel's index with (video_id, title, description) rows."""
+        index = {"postings": {}, "vocabulary": [], "documents": {}}
+        for video_id, title, description in rows:
+            self._add(index, video_id, title, description)
+        with self._lock:
+            self._channels[channel_id] = index
+
+    def update(self, channel_id, rows):
+        """Re-indexes rows for a channel that is already loaded; no-op otherwise."""
+        with self._lock:
+            index = self._channels.get(channel_id)
+            if index is None:
+                return
+            for video_id, title, description in rows:
+                self._add(index, video_id, title, description)
+
+    def _add(self, index, video_id, title, description):
+        self._remove(index, video_id)
+        weights = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0.0) + TITLE_WEIGHT
+        for token in tokenize(description):
+            weights[token] = weights.get(token, 0.0) + DESCRIPTION_WEIGHT
+
+        for token, weight in weights.items():
+            postings = index["postings"].get(token)
+            if postings is None:
+                postings = index["postings"][token] = {}
+                bisect.insort(index["vocabulary"], token)
+            postings[video_id] = weight
+        index["documents"][video_id] = list(weights)
+
+    def _remove(self, index, video_id):
+        for token in index["documents"].pop(video_id, []):
+            postings = index["postings"][token]
+            del postings[video_id]
+            if not postings:
+                del index["postings"][token]
+                vocabulary = index["vocabulary"]
+                del vocabulary[bisect.bisect_left(vocabulary, token)]
+
+    def search(self, channel_id, tokens):
+        """[(video_id, score)] of videos matching every token as a prefix, best first."""
+        with self._lock:
+            index = self._channels.get(channel_id)
+            if index is None or not tokens:
+                return []
+            vocabulary = index["vocabulary"]
+            scores = None
+            for token in tokens:
+                matched = {}
+                i = bisect.bisect_left(vocabulary, token)
+                while i < len(vocabulary) and vocabulary[i].startswith(token):
+                    for video_id, weight in index["postings"][vocabulary[i]].items():
+                        matched[video_id] = matched.get(video_id, 0.0) + weight
+                    i += 1
+                if scores is None:
+                    scores = matched
+                else:
+                    scores = {vid: scores[vid] + w for vid, w in matched.items() if vid in scores}
+                if not scores:
+                    return []
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+_memory_index = InvertedIndex()
+
+
+def _fts_exists(db):
+    found = db.execute(
+        text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN (:fts, :keys)"),
+        {"fts": FTS_TABLE, "keys": FTS_KEYS_TABLE}
+    ).scalar()
+    return found == 2
+
+
+def ensure_search_index(db):
+    """
+    Creates the backend's search index if it is missing.
+    The FTS5 table is backfilled from `videos` on creation (and rebuilt
+    once if it predates the keys table); Postgres builds its GIN index
+    itself. Returns True when something was created.
+    """
+    backend = search_backend(db)
+    if backend == "fts5":
+        if _fts_exists(db):
+            return False
+        db.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+        db.execute(text(FTS_KEYS_DDL))
+        db.execute(text(FTS_DDL))
+        db.execute(text(f"INSERT OR IGNORE INTO {FTS_KEYS_TABLE} (video_id) SELECT video_id FROM videos"))
+        db.execute(text(
+            f"INSERT INTO {FTS_TABLE} (rowid, video_id, channel_id, title, description) "
+            "SELECT k.id, v.video_id, v.channel_id, coalesce(v.title, ''), coalesce(v.description, '') "
+            f"FROM videos v JOIN {FTS_KEYS_TABLE} k ON k.video_id = v.video_id"
+        ))
+        return True
+    if backend == "postgres":
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": PG_INDEX}).scalar()
+        if exists:
+            return False
+        db.execute(text(PG_DDL))
+        return True
+    return False
+
+
+def _ensure_for_read(db):
+    """Read paths create a missing FTS5 table in their own short transaction."""
+    if search_backend(db) == "fts5" and not _fts_exists(db):
+        with db.get_bind().begin() as conn:
+            ensure_search_index(conn)
+
+
+def index_videos(db, rows, stored):
+    """
+    Keeps the search index in step with a batch of video rows about to be
+    upserted (dicts with video_id, channel_id, title, description).
+    `stored` maps already-stored video IDs to their current (title,
+    description, ...); only new videos and videos whose title or
+    description changed are (re)indexed.
+    Postgres maintains its expression index itself. Returns rows indexed.
+    """
+    backend = search_backend(db)
+    if backend == "postgres" or not rows:
+        return 0
+
+    changed = [
+        row for row in rows
+        if row["video_id"] not in stored
+        or (stored[row["video_id"]][0] or "", stored[row["video_id"]][1] or "")
+        != (row["title"] or "", row["description"] or "")
+    ]
+    if not changed:
+        return 0
+
+    if backend == "fts5":
+        ensure_search_index(db)
+        db.execute(text(f"INSERT OR IGNORE INTO {FTS_KEYS_TABLE} (video_id) VALUES (:video_id)"),
+                   [{"video_id": row["video_id"]} for row in changed])
+        video_ids = [row["video_id"] for row in changed]
+        keys = {}
+        for i in range(0, len(video_ids), LOOKUP_CHUNK):
+            keys.update(db.execute(
+                text(f"SELECT video_id, id FROM {FTS_KEYS_TABLE} WHERE video_id IN :ids")
+                .bindparams(bindparam("ids", expanding=True)),
+                {"ids": video_ids[i:i + LOOKUP_CHUNK]}
+            ).all())
+
+        # Keyed deletes are cheap, so every changed row is cleared first; a
+        # video stored under another channel is not in `stored` but indexed
+        replaced = [keys[video_id] for video_id in video_ids]
+        for i in range(0, len(replaced), LOOKUP_CHUNK):
+            db.execute(
+                text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :rowids").bindparams(bindparam("rowids", expanding=True)),
+                {"rowids": replaced[i:i + LOOKUP_CHUNK]}
+            )
+        db.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, video_id, channel_id, title, description) "
+                 "VALUES (:rowid, :video_id, :channel_id, :title, :description)"),
+            [{"rowid": keys[row["video_id"]], "video_id": row["video_id"], "channel_id": row["channel_id"],
+              "title": row["title"] or "", "description": row["description"] or ""} for row in changed]
+        )
+    else:
+        by_channel = {}
+        for row in changed:
+            by_channel.setdefault(row["channel_id"], []).append(
+                (row["video_id"], row["title"], row["description"])
+            )
+        for channel_id, channel_rows in by_channel.items():
+            _memory_index.update(channel_id, channel_rows)
+
+    return len(changed)
+
+
+def _fts_query(tokens):
+    # Every token must match as a prefix; quoting keeps user input from
+    # being parsed as FTS5 syntax
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _fts_matches(channel_id, tokens):
+    return (
+        select(video_search.c.video_id)
+        .where(
+            literal_column(FTS_TABLE).op("MATCH")(_fts_query(tokens)),
+            video_search.c.channel_id == channel_id,
+        )
+    )
+
+
+def _pg_query(tokens):
+    return func.to_tsquery(literal_column("'simple'"), " & ".join(f"{token}:*" for token in tokens))
+
+
+def _memory_matches(db, channel_id, tokens):
+    if not _memory_index.loaded(channel_id):
+        rows = db.execute(
+            select(Video.video_id, Video.title, Video.description).where(Video.channel_id == channel_id)
+        ).all()
+        _memory_index.load(channel_id, rows)
+    return _memory_index.search(channel_id, tokens)
+
+
+def search_clause(db, channel_id, query):
+    """
+    WHERE clause on `videos` selecting the channel's videos matching `query`
+    (title or description, prefix match on every word). The clause is
+    already scoped to the channel, so callers need no channel_id filter;
+    on SQLite that lets the match list drive the query.
+    Returns None when the query has no searchable words.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+
+    backend = search_backend(db)
+    if backend == "fts5":
+        _ensure_for_read(db)
+        return Video.video_id.in_(_fts_matches(channel_id, tokens))
+    if backend == "postgres":
+        ts_query = _pg_query(tokenize(query, fold=False))
+        return and_(Video.channel_id == channel_id, literal_column(PG_DOCUMENT).op("@@")(ts_query))
+    return Video.video_id.in_([vid for vid, _ in _memory_matches(db, channel_id, tokens)])
+
+
+def rank_videos(db, channel_id, query, limit, offset=0):
+    """IDs of the channel's videos matching `query`, most relevant first."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    backend = search_backend(db)
+    if backend == "fts5":
+        _ensure_for_read(db)
+        rank = func.bm25(literal_column(FTS_TABLE), 0.0, 0.0, TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        stmt = _fts_matches(channel_id, tokens).order_by(rank, video_search.c.video_id)
+    elif backend == "postgres":
+        ts_query = _pg_query(tokenize(query, fold=False))
+        rank = func.ts_rank(literal_column(PG_DOCUMENT), ts_query)
+        stmt = (
+            select(Video.video_id)
+            .where(Video.channel_id == channel_id, literal_column(PG_DOCUMENT).op("@@")(ts_query))
+            .order_by(rank.desc(), Video.video_id)
+        )
+    else:
+        ranked = _memory_matches(db, channel_id, tokens)
+        return [vid for vid, _ in ranked[offset:offset + limit]]
+
+    return list(db.scalars(stmt.limit(limit).offset(offset)))
@@ -0,0 +1,531 @@
+"""
+Columnar snapshot store: a channel's videos and statistics history as
+month-partitioned Parquet, for archival, cold starts and offline analysis.
+
+    <SNAPSHOT_DIR>/channels/channel_id=UC.../part-0.parquet
+    <SNAPSHOT_DIR>/videos/channel_id=UC.../month=2024-05/part-0.parquet
+    <SNAPSHOT_DIR>/statistics/channel_id=UC.../month=2024-05/part-0.parquet
+    <SNAPSHOT_DIR>/statistics_daily/channel_id=UC.../month=2023-11/part-0.parquet
+    <SNAPSHOT_DIR>/statistics_weekly/channel_id=UC.../month=2023-02/part-0.parquet
+
+Videos are partitioned by publication month and carry their latest
+counters; statistics rows by the month of their record_date. The daily and
+weekly rollups that compaction folds old snapshots into are exported too
+(by the month of period_start), so a snapshot keeps the full history.
+Reads go through a memory-mapped filesystem, and frames use Arrow-backed
+strings, so loading a snapshot neither copies file data into read buffers
+nor builds Python string objects.
+
+    python -m database.snapshots export UC... [UC...] [--dir DIR]
+    python -m database.snapshots export --all
+    python -m database.snapshots import UC... [--dir DIR]
+    python -m database.snapshots list
+"""
+import os
+import sys
+import shutil
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import engine
+from database.models import (
+    Channel, Video, VideoStatistics, VideoLatestStats, VideoStatisticsDaily, VideoStatisticsWeekly
+)
+from database.persistence import _chunks, _upsert_rows, _insert_rows, _stored_videos, LATEST_STATS_UPDATE_COLS
+from database.search import index_videos
+from database.aggregates import month_key, rebuild_aggregates
+from database.compaction import ROLLUP_COLUMNS
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "./data/snapshots")
+
+# Rows fetched from the database per Arrow record batch on export
+EXPORT_BATCH_ROWS = 50_000
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+CHANNEL_SCHEMA = pa.schema([
+    ("channel_name", pa.string()),
+    ("custom_url", pa.string()),
+    ("description", pa.string()),
+    ("published_at", _TIMESTAMP),
+    ("subscriber_count", pa.int64()),
+    ("video_count", pa.int64()),
+    ("view_count", pa.int64()),
+    ("last_updated", _TIMESTAMP),
+    ("exported_at", _TIMESTAMP),
+])
+VIDEO_SCHEMA = pa.schema([
+    ("video_id", pa.string()),
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("published_at", _TIMESTAMP),
+    ("duration_seconds", pa.int64()),
+    ("last_updated", _TIMESTAMP),
+    ("view_count", pa.int64()),
+    ("like_count", pa.int64()),
+    ("comment_count", pa.int64()),
+    ("stats_record_date", _TIMESTAMP),
+    ("month", pa.string()),
+])
+STATISTICS_SCHEMA = pa.schema([
+    ("video_id", pa.string()),
+    ("view_count", pa.int64()),
+    ("like_count", pa.int64()),
+    ("comment_count", pa.int64()),
+    ("record_date", _TIMESTAMP),
+    ("month", pa.string()),
+])
+
+ROLLUP_SCHEMA = pa.schema(
+    [(col, pa.string() if col == "video_id" else _TIMESTAMP if col.endswith(("_at", "_start")) else pa.int64())
+     for col in ROLLUP_COLUMNS]
+    + [("month", pa.string())]
+)
+# Snapshot dataset -> rollup model
+ROLLUP_DATASETS = {
+    "statistics_daily": VideoStatisticsDaily,
+    "statistics_weekly": VideoStatisticsWeekly,
+}
+
+_MONTH_PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+_WRITE_OPTIONS = ds.ParquetFileFormat().make_write_options(compression="zstd")
+_MMAP_FS = pafs.LocalFileSystem(use_mmap=True)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value):
+    """Arrow returns tz-aware UTC datetimes; the database stores naive UTC."""
+    return value.replace(tzinfo=None) if isinstance(value, datetime) else value
+
+
+def _channel_dir(root, dataset, channel_id):
+    return Path(root) / dataset / f"channel_id={channel_id}"
+
+
+# ----------------- Export -----------------
+
+def _record_batches(rows_iter, schema):
+    """Arrow record batches from an iterator of row-tuple partitions (columns in schema order)."""
+    for rows in rows_iter:
+        if rows:
+            columns = list(zip(*rows))
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            )
+
+
+def _write_partitioned(batches, schema, target, partitioning=_MONTH_PARTITIONING):
+    """
+    Writes (month-partitioned) Parquet into a temporary sibling of `target`
+    and swaps it in, so readers never see a half-written channel.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Dot-prefixed directories are ignored by dataset discovery
+    staging = target.parent / f".{target.name}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    ds.write_dataset(
+        batches, str(staging), schema=schema, format="parquet", partitioning=partitioning,
+        file_options=_WRITE_OPTIONS, basename_template="part-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    _swap_in(staging, target)
+
+
+def _swap_in(staging, target):
+    retired = target.parent / f".{target.name}.old"
+    shutil.rmtree(retired, ignore_errors=True)
+    if target.exists():
+        target.rename(retired)
+    staging.rename(target)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def _video_rows(conn, channel_id):
+    stmt = (
+        select(
+            Video.video_id, Video.title, Video.description, Video.published_at, Video.duration_seconds,
+            Video.last_updated, VideoLatestStats.view_count, VideoLatestStats.like_count,
+            VideoLatestStats.comment_count, VideoLatestStats.record_date,
+        )
+        .outerjoin(VideoLatestStats, VideoLatestStats.video_id == Video.video_id)
+        .where(Video.channel_id == channel_id)
+        .order_by(Video.published_at, Video.video_id)
+    )
+    for rows in conn.execute(stmt).yield_per(EXPORT_BATCH_ROWS).partitions():
+        yield [(*row, month_key(row.published_at)) for row in rows]
+
+
+def _statistics_rows(conn, channel_id):
+    stmt = (
+        select(VideoStatistics.video_id, VideoStatistics.view_count, VideoStatistics.like_count,
+               VideoStatistics.comment_count, VideoStatistics.record_date)
+        .join(Video, Video.video_id == VideoStatistics.video_id)
+        .where(Video.channel_id == channel_id)
+        .order_by(VideoStatistics.record_date, VideoStatistics.video_id)
+    )
+    for rows in conn.execute(stmt).yield_per(EXPORT_BATCH_ROWS).partitions():
+        yield [(*row, month_key(row.record_date)) for row in rows]
+
+
+def _rollup_rows(conn, model, channel_id):
+    table = model.__table__
+    stmt = (
+        select(*[table.c[col] for col in ROLLUP_COLUMNS])
+        .join(Video, Video.video_id == table.c.video_id)
+        .where(Video.channel_id == channel_id)
+        .order_by(table.c.period_start, table.c.video_id)
+    )
+    for rows in conn.execute(stmt).yield_per(EXPORT_BATCH_ROWS).partitions():
+        yield [(*row, month_key(row.period_start)) for row in rows]
+
+
+def export_channel(channel_id, root=SNAPSHOT_DIR, bind=engine):
+    """
+    Writes the channel's snapshot (channel row, videos, statistics history
+    including the daily/weekly rollups), replacing any previous one. Streams
+    rows in EXPORT_BATCH_ROWS batches from a single read transaction.
+    Returns {"videos": n, "statistics": n, "rollups": n} or None if the
+    channel is unknown.
+    """
+    with bind.connect() as conn:
+        channel = conn.execute(select(Channel).where(Channel.channel_id == channel_id)).mappings().first()
+        if channel is None:
+            return None
+
+        exported_at = _utcnow()
+        channel_table = pa.Table.from_pylist(
+            [{**{name: channel[name] for name in CHANNEL_SCHEMA.names if name != "exported_at"},
+              "exported_at": exported_at}],
+            schema=CHANNEL_SCHEMA,
+        )
+        _write_partitioned(channel_table, CHANNEL_SCHEMA, _channel_dir(root, "channels", channel_id),
+                           partitioning=None)
+        _write_partitioned(_record_batches(_video_rows(conn, channel_id), VIDEO_SCHEMA), VIDEO_SCHEMA,
+                           _channel_dir(root, "videos", channel_id))
+        _write_partitioned(_record_batches(_statistics_rows(conn, channel_id), STATISTICS_SCHEMA),
+                           STATISTICS_SCHEMA, _channel_dir(root, "statistics", channel_id))
+        for dataset, model in ROLLUP_DATASETS.items():
+            _write_partitioned(_record_batches(_rollup_rows(conn, model, channel_id), ROLLUP_SCHEMA),
+                               ROLLUP_SCHEMA, _channel_dir(root, dataset, channel_id))
+
+    info = snapshot_info(channel_id, root)
+    return {"videos": info["videos"], "statistics": info["statistics"],
+            "rollups": sum(info[dataset] for dataset in ROLLUP_DATASETS)}
+
+
+# ----------------- Read -----------------
+
+def _dataset(root, dataset, channel_id):
+    path = _channel_dir(root, dataset, channel_id)
+    if not path.is_dir():
+        return None
+    partitioning = None if dataset == "channels" else _MONTH_PARTITIONING
+    return ds.dataset(str(path), format="parquet", partitioning=partitioning, filesystem=_MMAP_FS)
+
+
+def _utc(bound):
+    """Naive bounds are UTC, like everything the database stores."""
+    ts = pd.Timestamp(bound)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _months_filter(since, until):
+    expr = None
+    for op, bound in (("ge", since), ("le", until)):
+        if bound is None:
+            continue
+        month = _utc(bound).strftime("%Y-%m")
+        term = ds.field("month") >= month if op == "ge" else ds.field("month") <= month
+        expr = term if expr is None else expr & term
+    return expr
+
+
+def read_videos(channel_id, root=SNAPSHOT_DIR, columns=None, since=None, until=None):
+    """
+    The channel's snapshot videos as a pyarrow Table (None without a
+    snapshot). since/until bound the publication month; only matching
+    partitions are opened.
+    """
+    dataset = _dataset(root, "videos", channel_id)
+    if dataset is None:
+        return None
+    return dataset.to_table(columns=columns, filter=_months_filter(since, until))
+
+
+def read_statistics(channel_id, root=SNAPSHOT_DIR, columns=None, since=None, until=None):
+    """
+    The channel's statistics history as a pyarrow Table (None without a
+    snapshot). since/until are inclusive datetimes on record_date; partitions
+    outside their months are skipped.
+    """
+    dataset = _dataset(root, "statistics", channel_id)
+    if dataset is None:
+        return None
+    expr = _months_filter(since, until)
+    for op, bound in (("ge", since), ("le", until)):
+        if bound is not None:
+            value = pa.scalar(_utc(bound).to_pydatetime(), type=_TIMESTAMP)
+            term = ds.field("record_date") >= value if op == "ge" else ds.field("record_date") <= value
+            expr = term if expr is None else expr & term
+    return dataset.to_table(columns=columns, filter=expr)
+
+
+def to_frame(table):
+    """pandas view of a snapshot table; strings stay Arrow-backed (no Python objects)."""
+    mapping = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return table.to_pandas(types_mapper=mapping.get)
+
+
+def read_video_frame(channel_id, root=SNAPSHOT_DIR):
+    """
+    Snapshot counterpart of queries.load_video_frame: videos with latest
+    statistics, newest first, without descriptions. None without a snapshot.
+    """
+    table = read_videos(channel_id, root, columns=[
+        "video_id", "title", "published_at", "duration_seconds",
+        "view_count", "like_count", "comment_count",
+    ])
+    if table is None:
+        return None
+    table = table.sort_by([("published_at", "descending"), ("video_id", "ascending")])
+    df = to_frame(table)
+    for col in ["duration_seconds", "view_count", "like_count", "comment_count"]:
+        df[col] = df[col].fillna(0).astype("int64")
+    return df
+
+
+def snapshot_info(channel_id, root=SNAPSHOT_DIR):
+    """exported_at and row counts of a channel's snapshot (from Parquet metadata), or None."""
+    channels = _dataset(root, "channels", channel_id)
+    if channels is None:
+        return None
+    exported_at = channels.to_table(columns=["exported_at"])["exported_at"][0].as_py()
+    counts = {}
+    for dataset in ("videos", "statistics", *ROLLUP_DATASETS):
+        data = _dataset(root, dataset, channel_id)
+        counts[dataset] = data.count_rows() if data is not None else 0
+    return {"channel_id": channel_id, "exported_at": _naive_utc(exported_at), **counts}
+
+
+def list_snapshots(root=SNAPSHOT_DIR):
+    """snapshot_info() for every channel under `root`."""
+    base = Path(root) / "channels"
+    if not base.is_dir():
+        return []
+    return [
+        snapshot_info(path.name.split("=", 1)[1], root)
+        for path in sorted(base.iterdir()) if path.is_dir() and path.name.startswith("channel_id=")
+    ]
+
+
+def snapshot_is_current(channel_id, root=SNAPSHOT_DIR, bind=engine):
+    """
+    True when the channel's snapshot was exported after its last database
+    write (or the database has nothing for it), i.e. reading the snapshot
+    gives the same videos as reading the database. Writes are metadata
+    (videos.last_updated) and new counters (video_latest_stats.record_date,
+    which statistics-only refreshes advance without touching videos).
+    """
+    info = snapshot_info(channel_id, root)
+    if info is None:
+        return False
+    with bind.connect() as conn:
+        last_video_write, last_stats_write = conn.execute(
+            select(
+                select(func.max(Video.last_updated)).where(Video.channel_id == channel_id).scalar_subquery(),
+                select(func.max(VideoLatestStats.record_date))
+                .where(VideoLatestStats.channel_id == channel_id).scalar_subquery(),
+            )
+        ).one()
+    return all(last_write is None or last_write <= info["exported_at"]
+               for last_write in (last_video_write, last_stats_write))
+
+
+# ----------------- Import -----------------
+
+def _latest_from_history(db, channel_id):
+    """Newest statistics row per video of the channel (by record_date, then id)."""
+    ranked = (
+        select(
+            VideoStatistics.video_id, VideoStatistics.view_count, VideoStatistics.like_count,
+            VideoStatistics.comment_count, VideoStatistics.record_date,
+            func.row_number().over(
+                partition_by=VideoStatistics.video_id,
+                order_by=(VideoStatistics.record_date.desc(), VideoStatistics.id.desc()),
+            ).label("rn"),
+        )
+        .join(Video, Video.video_id == VideoStatistics.video_id)
+        .where(Video.channel_id == channel_id)
+        .subquery()
+    )
+    return db.execute(select(ranked).where(ranked.c.rn == 1)).all()
+
+
+def _import_rollups(db, model, dataset, video_ids):
+    """Inserts a rollup dataset's rows not already stored. Returns rows inserted."""
+    # Nothing compacted yet: the dataset directory holds no files
+    if dataset is None or not dataset.files:
+        return 0
+    table = model.__table__
+    known = set()
+    for chunk in _chunks(video_ids):
+        known.update(db.execute(
+            select(table.c.video_id, table.c.period_start).where(table.c.video_id.in_(chunk))
+        ).all())
+    inserted = 0
+    for batch in dataset.to_batches(columns=ROLLUP_COLUMNS):
+        rows = [
+            {col: _naive_utc(value) for col, value in row.items()}
+            for row in batch.to_pylist()
+        ]
+        rows = [row for row in rows if (row["video_id"], row["period_start"]) not in known]
+        _insert_rows(db, table, rows)
+        known.update((row["video_id"], row["period_start"]) for row in rows)
+        inserted += len(rows)
+    return inserted
+
+
+def import_channel(channel_id, root=SNAPSHOT_DIR, bind=engine):
+    """
+    Loads a channel snapshot into the database in one transaction.
+    - Channel and video rows are upserted (snapshot values win)
+    - Statistics rows already stored (same video_id and record_date) are skipped,
+      as are rollup rows already stored (same video_id and period_start)
+    - video_latest_stats, the dashboard aggregates and the search index are
+      brought up to date for the channel
+    Safe to run repeatedly. Returns {"videos": n, "statistics": n inserted,
+    "rollups": n inserted} or None without a snapshot.
+    """
+    channels = _dataset(root, "channels", channel_id)
+    videos = read_videos(channel_id, root)
+    if channels is None or videos is None:
+        return None
+    channel = channels.to_table().to_pylist()[0]
+
+    with Session(bind) as db:
+        channel_row = {"channel_id": channel_id, **{
+            name: _naive_utc(value) for name, value in channel.items()
+            if name in Channel.__table__.c and name != "channel_id"
+        }}
+        existing = set(db.scalars(select(Channel.channel_id).where(Channel.channel_id == channel_id)))
+        _upsert_rows(db, Channel.__table__, [channel_row], "channel_id",
+                     [c for c in channel_row if c != "channel_id"], existing)
+
+        video_rows = [
+            {"video_id": row["video_id"], "channel_id": channel_id, "title": row["title"] or "",
+             "description": row["description"] or "", "published_at": _naive_utc(row["published_at"]),
+             "duration_seconds": row["duration_seconds"], "last_updated": _naive_utc(row["last_updated"])}
+            for row in videos.select(["video_id", "title", "description", "published_at",
+                                      "duration_seconds", "last_updated"]).to_pylist()
+        ]
+        video_ids = [row["video_id"] for row in video_rows]
+        stored = _stored_videos(db, video_ids)
+        index_videos(db, video_rows, stored)
+        _upsert_rows(db, Video.__table__, video_rows, "video_id",
+                     [c for c in video_rows[0] if c != "video_id"] if video_rows else [], set(stored))
+
+        known = set()
+        for chunk in _chunks(video_ids):
+            known.update(db.execute(
+                select(VideoStatistics.video_id, VideoStatistics.record_date)
+                .where(VideoStatistics.video_id.in_(chunk))
+            ).all())
+        inserted = 0
+        statistics = _dataset(root, "statistics", channel_id)
+        if statistics is not None:
+            for batch in statistics.to_batches(columns=["video_id", "view_count", "like_count",
+                                                        "comment_count", "record_date"]):
+                rows = [
+                    {**row, "record_date": _naive_utc(row["record_date"])}
+                    for row in batch.to_pylist()
+                ]
+                rows = [row for row in rows if (row["video_id"], row["record_date"]) not in known]
+                _insert_rows(db, VideoStatistics.__table__, rows)
+                known.update((row["video_id"], row["record_date"]) for row in rows)
+                inserted += len(rows)
+
+        rollups = sum(_import_rollups(db, model, _dataset(root, dataset, channel_id), video_ids)
+                      for dataset, model in ROLLUP_DATASETS.items())
+
+        checked = dict(db.execute(
+            select(VideoLatestStats.video_id, VideoLatestStats.checked_at)
+            .where(VideoLatestStats.channel_id == channel_id)
+        ).all())
+        latest_rows = [
+            {"video_id": vid, "channel_id": channel_id, "view_count": views, "like_count": likes,
+             "comment_count": comments, "record_date": record_date,
+             "checked_at": max(filter(None, (record_date, checked.get(vid))), default=None)}
+            for vid, views, likes, comments, record_date, _ in _latest_from_history(db, channel_id)
+        ]
+        _upsert_rows(db, VideoLatestStats.__table__, latest_rows, "video_id",
+                     LATEST_STATS_UPDATE_COLS, set(checked))
+        rebuild_aggregates(db, channel_id)
+        db.commit()
+
+    return {"videos": len(video_rows), "statistics": inserted, "rollups": rollups}
+
+
+# ----------------- CLI -----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export/import channel snapshots as partitioned Parquet.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help=f"snapshot root (default {SNAPSHOT_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write snapshots from the database")
+    export.add_argument("channel_ids", nargs="*")
+    export.add_argument("--all", action="store_true", help="every channel in the database")
+    load = commands.add_parser("import", help="load snapshots into the database")
+    load.add_argument("channel_ids", nargs="*")
+    load.add_argument("--all", action="store_true", help="every channel under --dir")
+    commands.add_parser("list", help="show the snapshots under --dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for info in list_snapshots(args.dir):
+            print(f"{info['channel_id']}  exported {info['exported_at']:%Y-%m-%d %H:%M}  "
+                  f"{info['videos']} videos  {info['statistics']} statistics rows  "
+                  f"{info['statistics_daily'] + info['statistics_weekly']} rollup rows")
+        return 0
+
+    channel_ids = args.channel_ids
+    if args.all:
+        if args.command == "export":
+            with engine.connect() as conn:
+                channel_ids = list(conn.scalars(select(Channel.channel_id).order_by(Channel.channel_id)))
+        else:
+            channel_ids = [info["channel_id"] for info in list_snapshots(args.dir)]
+    if not channel_ids:
+        parser.error("give channel IDs or --all")
+
+    action = export_channel if args.command == "export" else import_channel
+    status = 0
+    for channel_id in channel_ids:
+        result = action(channel_id, args.dir)
+        if result is None:
+            print(f"❌ {channel_id}: not found")
+            status = 1
+        else:
+            print(f"✅ {channel_id}: {result['videos']} videos, {result['statistics']} statistics rows, "
+                  f"{result['rollups']} rollup rows")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,11 +12,22 @@ if str(root_path) not in sys.path:
     sys.path.insert(0, str(root_path))
 
 from streamlit_app.youtube_auth import get_youtube_service
-from data_processing.channel_extractor import extract_channel_data
-from data_processing.video_extractor import get_all_video_metadata
-from database.persistence import save_channel_to_db, save_videos_to_db
+from streamlit_app.data_cache import load_channel, load_video_archive, load_stored_videos, cached_db_read, cache_stats
+from streamlit_app.charts import downsample_points, engagement_scatter
+from data_processing.video_frame import thumbnail_urls
+from database.queries import (
+    PAGE_SIZE, CADENCE_DAYS, channel_video_summary, count_videos, fetch_video_page, list_channels,
+    load_channel_comparison, load_monthly_posts, load_top_videos,
+)
+from data_processing.api_scheduler import QuotaExhaustedError
+from database.growth import channel_growth, latest_velocity
 from database.db_config import SessionLocal
 from database.models import Channel, Video, VideoStatistics
+from database.instrumentation import (
+    METRICS_TEXTFILE, counter_total, prometheus_text, reset as reset_metrics, snapshot, span,
+    start_textfile_writer, write_textfile,
+)
+from streamlit_app.http_cache import get_cache_stats
 
 # ----------------- Page Config -----------------
 st.set_page_config(
@@ -26,6 +37,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Keeps METRICS_TEXTFILE current for node_exporter whichever page is open
+# (no-op without METRICS_TEXTFILE; one writer thread per server process)
+start_textfile_writer()
+
 # ----------------- Theme Injection -----------------
 from streamlit_app.theme import THEME_CONTENT
 st.markdown(THEME_CONTENT, unsafe_allow_html=True)
@@ -33,23 +48,25 @@ st.markdown(THEME_CONTENT, unsafe_allow_html=True)
 # ----------------- Session State -----------------
 if 'channel_data' not in st.session_state:
     st.session_state.channel_data = None
-if 'video_data' not in st.session_state:
-    st.session_state.video_data = None
 if 'current_cid' not in st.session_state:
     st.session_state.current_cid = None
 if 'navigation' not in st.session_state:
     st.session_state.navigation = "🏠 Home"
-if 'video_page' not in st.session_state:
-    st.session_state.video_page = 0
+if 'video_cursors' not in st.session_state:
+    st.session_state.video_cursors = [None]
 
 # ----------------- Navigation -----------------
 # ----------------- Navigation -----------------
 with st.sidebar:
     st.markdown("<div class='sidebar-brand'><h1 style='font-family: \"Outfit\", sans-serif; font-size: 1.6rem; margin: 0; color: #1e3a8a; font-weight: 900;'>📊 YouTube Analytics</h1></div>", unsafe_allow_html=True)
     
+    pages = ["🏠 Home", "🔎 Channel", "🎬 Videos", "📈 Dashboard", "⚖️ Compare", "ℹ️ About"]
+    # Hidden page, listed only when the URL carries ?diagnostics=1
+    if st.query_params.get("diagnostics") == "1":
+        pages.append("🩺 Diagnostics")
     st.radio(
         "Navigation",
-        ["🏠 Home", "🔎 Channel", "🎬 Videos", "📈 Dashboard", "ℹ️ About"],
+        pages,
         label_visibility="collapsed",
         key="navigation"
     )
@@ -122,15 +139,17 @@ def show_analyzer():
                 cid_input = cid_input.strip()
                 if cid_input.startswith("UC") and len(cid_input) == 24:
                     with st.spinner("Fetching..."):
-                        df = extract_channel_data([cid_input])
-                        if not df.empty:
+                        try:
+                            df = load_channel(cid_input)
+                        except QuotaExhaustedError as e:
+                            st.error(f"⛔ {e}")
+                            df = None
+                        if df is not None and not df.empty:
                             st.session_state.channel_data = df.iloc[0]
                             st.session_state.current_cid = cid_input
-                            st.session_state.video_data = None
-                            st.session_state.video_page = 0
-                            save_channel_to_db(df.iloc[0])
+                            st.session_state.video_cursors = [None]
                             st.success("Analysis Complete!")
-                        else:
+                        elif df is not None:
                             st.error("Channel not found.")
                 else:
                     st.warning("Please enter a valid 24-char Channel ID.")
@@ -158,77 +177,111 @@ def show_analyzer():
                 url = f"https://youtube.com/{handle}" if handle else f"https://youtube.com/channel/{ch['channel_id']}"
                 st.link_button("VISIT YOUTUBE CHANNEL", url, use_container_width=True)
 
+SORT_OPTIONS = {
+    # Relevance ranks search results; without a search it means newest first
+    "Relevance": "relevance",
+    "Published": "published_at",
+    "Views": "view_count",
+    "Likes": "like_count",
+    "Comments": "comment_count",
+    "Duration": "duration_seconds",
+    "Title": "title",
+}
+
+def reset_video_pages():
+    """Back to the first page; video_cursors holds the keyset cursor of each visited page."""
+    st.session_state.video_cursors = [None]
+
 def show_video_analytics():
     if not st.session_state.current_cid:
         st.warning("⚠️ No channel selected. Go to Channel first.")
         return
 
     st.markdown('<h1 class="page-title">Video <span class="blue-accent">Archive</span></h1>', unsafe_allow_html=True)
-    
-    # Calculate averages or use placeholders
-    if st.session_state.video_data is not None:
-        v_df = st.session_state.video_data
-        avg_views = format_count(v_df['view_count'].mean())
-        avg_likes = format_count(v_df['like_count'].mean())
-        avg_comments = format_count(v_df['comment_count'].mean())
+    cid = st.session_state.current_cid
+    # Filled after LOAD ARCHIVE below, so the cards reflect a fresh sync
+    metric_cards = st.empty()
+
+    with st.container(border=True):
+        st.write(f"Exploring video library for **{st.session_state.channel_data['channel_name']}**")
+        refresh = st.checkbox("Bypass cache", value=False, help="Re-sync from YouTube even if this channel was loaded recently.")
+        if st.button("LOAD ARCHIVE"):
+            with st.spinner("Processing..."):
+                try:
+                    synced = load_video_archive(cid, refresh=refresh)
+                    st.success(f"Archived {synced} videos.")
+                except QuotaExhaustedError as e:
+                    st.error(f"⛔ {e}")
+                except Exception as e:
+                    # Batches committed before the failure are in the database
+                    st.error(f"❌ Archive load stopped: {e}")
+                reset_video_pages()
+
+    # Averages come from the pre-aggregated channel summary
+    summary = cached_db_read("summary", cid, lambda: channel_video_summary(cid))
+    if summary["video_count"]:
+        avg_views = format_count(summary["avg_views"])
+        avg_likes = format_count(summary["avg_likes"])
+        avg_comments = format_count(summary["avg_comments"])
     else:
         avg_views = "---"
         avg_likes = "---"
         avg_comments = "---"
 
     # Show video-specific metrics in cards
-    render_metric_cards([
-        {"label": "Avg Views", "value": avg_views, "icon": "📈"},
-        {"label": "Avg Likes", "value": avg_likes, "icon": "👍"},
-        {"label": "Avg Comments", "value": avg_comments, "icon": "💬"}
-    ])
+    with metric_cards.container():
+        render_metric_cards([
+            {"label": "Avg Views", "value": avg_views, "icon": "📈"},
+            {"label": "Avg Likes", "value": avg_likes, "icon": "👍"},
+            {"label": "Avg Comments", "value": avg_comments, "icon": "💬"}
+        ])
+
+    if not summary["video_count"]:
+        return
+
+    col_search, col_sort, col_order = st.columns([3, 1, 1])
+    with col_search:
+        search = st.text_input("🔍 Search titles and descriptions...", placeholder="Type to filter...").strip()
+    with col_sort:
+        sort_label = st.selectbox("Sort by", list(SORT_OPTIONS))
+    with col_order:
+        descending = st.selectbox("Order", ["Descending", "Ascending"]) == "Descending"
+
+    # Any change to the query starts again from the first page
+    query = (cid, search, SORT_OPTIONS[sort_label], descending)
+    if st.session_state.get("video_query") != query:
+        st.session_state.video_query = query
+        reset_video_pages()
+
+    cursors = st.session_state.video_cursors
+    total_items = cached_db_read(f"count:{search}", cid, lambda: count_videos(cid, search))
+    display_df, next_cursor = fetch_video_page(
+        cid, sort=SORT_OPTIONS[sort_label], descending=descending,
+        search=search, after=cursors[-1], limit=PAGE_SIZE
+    )
+    display_df["thumbnail_default"] = thumbnail_urls(display_df["video_id"].tolist())["thumbnail_default"]
+
+    page_index = len(cursors) - 1
+    total_pages = max(1, (total_items - 1) // PAGE_SIZE + 1)
+    start_idx = page_index * PAGE_SIZE
+    end_idx = start_idx + len(display_df)
 
     with st.container(border=True):
-        st.write(f"Exploring video library for **{st.session_state.channel_data['channel_name']}**")
-        if st.button("LOAD ARCHIVE"):
-            with st.spinner("Processing..."):
-                v_df = get_all_video_metadata(st.session_state.current_cid)
-                if not v_df.empty:
-                    st.session_state.video_data = v_df
-                    st.session_state.video_page = 0
-                    save_videos_to_db(v_df, st.session_state.current_cid)
-                    st.success(f"Archived {len(v_df)} videos.")
-
-    if st.session_state.video_data is not None:
-        v_df = st.session_state.video_data
-        search = st.text_input("🔍 Search titles...", placeholder="Type to filter...")
-        filtered = v_df[v_df['title'].str.contains(search, case=False)] if search else v_df
-        
-        # Pagination calculations
-        total_items = len(filtered)
-        items_per_page = 50
-        total_pages = max(1, (total_items - 1) // items_per_page + 1)
-        
-        # Ensure current page is within bounds
-        if st.session_state.video_page >= total_pages:
-            st.session_state.video_page = total_pages - 1
-            
-        start_idx = st.session_state.video_page * items_per_page
-        end_idx = min(start_idx + items_per_page, total_items)
-        
-        display_df = filtered.iloc[start_idx:end_idx]
-        
-        with st.container(border=True):
-            st.markdown(f"**Showing {start_idx+1}-{end_idx} of {total_items}**")
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
-            
-            # Navigation Controls
-            col_p, col_info, col_n = st.columns([1, 2, 1])
-            with col_p:
-                if st.button("⬅️ Prev", disabled=(st.session_state.video_page == 0), use_container_width=True):
-                    st.session_state.video_page -= 1
-                    st.rerun()
-            with col_info:
-                st.markdown(f"<p style='text-align: center; margin-top: 0.5rem;'>Page {st.session_state.video_page + 1} of {total_pages}</p>", unsafe_allow_html=True)
-            with col_n:
-                if st.button("Next ➡️", disabled=(st.session_state.video_page >= total_pages - 1), use_container_width=True):
-                    st.session_state.video_page += 1
-                    st.rerun()
+        st.markdown(f"**Showing {start_idx + 1 if end_idx else 0}-{end_idx} of {total_items}**")
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+        # Navigation Controls
+        col_p, col_info, col_n = st.columns([1, 2, 1])
+        with col_p:
+            if st.button("⬅️ Prev", disabled=(page_index == 0), use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with col_info:
+            st.markdown(f"<p style='text-align: center; margin-top: 0.5rem;'>Page {page_index + 1} of {total_pages}</p>", unsafe_allow_html=True)
+        with col_n:
+            if st.button("Next ➡️", disabled=(next_cursor is None), use_container_width=True):
+                cursors.append(next_cursor)
+                st.rerun()
 
 def show_dashboard():
     if not st.session_state.current_cid:
@@ -236,60 +289,160 @@ def show_dashboard():
         return
     
     st.markdown('<h1 class="page-title">Statistics <span class="blue-accent">Dashboard</span></h1>', unsafe_allow_html=True)
+    cid = st.session_state.current_cid
 
-    if st.session_state.video_data is not None:
-        df = st.session_state.video_data
-        
+    # Pre-aggregated tables, kept current on every archive write
+    summary = cached_db_read("summary", cid, lambda: channel_video_summary(cid))
+
+    if summary["video_count"]:
         # Row 1: Top Videos and Engagement
         rd1, rd2 = st.columns(2)
         with rd1:
             with st.container(border=True):
                 st.markdown("### Top 10 Videos")
-                top_10 = df.nlargest(10, 'view_count')
-                fig = px.bar(top_10, x='view_count', y='title', orientation='h', 
-                             color='view_count', color_continuous_scale='Blues')
-                fig.update_layout(yaxis={'autorange': 'reversed'}, showlegend=False, height=350,
-                                  margin=dict(l=0, r=0, t=20, b=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(fig, use_container_width=True)
+                top_10 = cached_db_read("top_videos", cid, lambda: load_top_videos(cid, 10))
+                with span("render.top_videos"):
+                    fig = px.bar(top_10, x='view_count', y='title', orientation='h', 
+                                 color='view_count', color_continuous_scale='Blues')
+                    fig.update_layout(yaxis={'autorange': 'reversed'}, showlegend=False, height=350,
+                                      margin=dict(l=0, r=0, t=20, b=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+                    st.plotly_chart(fig, use_container_width=True)
             
         with rd2:
             with st.container(border=True):
                 st.markdown("### View vs Like Engagement")
-                fig = px.scatter(df, x='view_count', y='like_count', size='comment_count', 
-                                 hover_name='title', color='view_count', color_continuous_scale='Blues')
-                fig.update_layout(margin=dict(l=0, r=0, t=20, b=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(fig, use_container_width=True)
+                # Every video is needed here: read the compact catalog (from the
+                # Parquet snapshot when current); only the downsampled points
+                # are sent to the browser
+                points = cached_db_read("engagement", cid, lambda: downsample_points(
+                    load_stored_videos(cid)[["title", "view_count", "like_count", "comment_count"]]))
+                with span("render.engagement"):
+                    st.plotly_chart(engagement_scatter(points), use_container_width=True)
+                st.caption(f"Showing {len(points):,} of {points.attrs['total_points']:,} points")
         
         # Row 2: Posting Frequency
         with st.container(border=True):
             st.markdown("### 📅 Posting Frequency")
             
-            # Prepare frequency data
-            freq_df = df.copy()
-            freq_df['month_year'] = freq_df['published_at'].dt.to_period('M').astype(str)
-            freq_counts = freq_df.groupby('month_year').size().reset_index(name='video_count')
-            freq_counts = freq_counts.sort_values('month_year')
-            
-            fig = px.bar(freq_counts, x='month_year', y='video_count',
-                         labels={'month_year': 'Month', 'video_count': 'Videos Posted'},
-                         color_discrete_sequence=['#2563eb'])
+            freq_counts = cached_db_read("monthly_posts", cid, lambda: load_monthly_posts(cid))
             
-            fig.update_layout(
-                height=300,
-                margin=dict(l=0, r=0, t=20, b=0),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis_title=None
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with span("render.monthly_posts"):
+                fig = px.bar(freq_counts, x='month_year', y='video_count',
+                             labels={'month_year': 'Month', 'video_count': 'Videos Posted'},
+                             color_discrete_sequence=['#2563eb'])
+                
+                fig.update_layout(
+                    height=300,
+                    margin=dict(l=0, r=0, t=20, b=0),
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    xaxis_title=None
+                )
+                st.plotly_chart(fig, use_container_width=True)
             
             # Simple summary
-            avg_freq = freq_counts['video_count'].mean()
-            st.info(f"💡 This channel posts approximately **{avg_freq:.1f}** videos per active month.")
+            if not freq_counts.empty:
+                avg_freq = freq_counts['video_count'].mean()
+                st.info(f"💡 This channel posts approximately **{avg_freq:.1f}** videos per active month.")
+
+        # Row 3: Growth, from the statistics snapshot history
+        with st.container(border=True):
+            st.markdown("### 🚀 Growth")
+            growth = cached_db_read("growth", cid, lambda: channel_growth(cid))
+            fastest = cached_db_read("velocity", cid, lambda: latest_velocity(cid, n=10))
+
+            if len(growth) < 2 or fastest.empty:
+                st.info("💡 Growth appears once videos have at least two statistics snapshots. "
+                        "Load the archive again later or run the statistics refresher.")
+            else:
+                rg1, rg2 = st.columns([3, 2])
+                with rg1:
+                    with span("render.growth"):
+                        fig = go.Figure()
+                        fig.add_bar(x=growth['period'], y=growth['views_gained'], name='Views gained',
+                                    marker_color='#93c5fd')
+                        fig.add_scatter(x=growth['period'], y=growth['total_views'], name='Total views',
+                                        mode='lines', line=dict(color='#1e3a8a', width=3), yaxis='y2')
+                        fig.update_layout(
+                            height=320,
+                            margin=dict(l=0, r=0, t=20, b=0),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            yaxis=dict(title='Views gained'),
+                            yaxis2=dict(title='Total views', overlaying='y', side='right', showgrid=False),
+                            legend=dict(orientation='h', y=1.1),
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                with rg2:
+                    st.markdown("**Fastest growing videos**")
+                    st.dataframe(
+                        fastest[['title', 'views_per_day', 'likes_per_day', 'acceleration']].round(1),
+                        use_container_width=True, hide_index=True,
+                    )
+                    st.caption("Views/day over each video's latest snapshot interval; acceleration is the "
+                               "change in views/day per day since the interval before.")
 
     else:
         st.info("💡 Load data in 'Analyzer' section to unlock charts.")
 
+def comparison_bar(df, column, title, tickformat=None):
+    fig = px.bar(df, x=column, y='channel_name', orientation='h', color_discrete_sequence=['#2563eb'],
+                 labels={column: title, 'channel_name': ''})
+    fig.update_layout(yaxis={'autorange': 'reversed'}, height=max(250, 28 * len(df)),
+                      margin=dict(l=0, r=0, t=20, b=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    if tickformat:
+        fig.update_xaxes(tickformat=tickformat)
+    return fig
+
+def show_compare():
+    st.markdown('<h1 class="page-title">Channel <span class="blue-accent">Comparison</span></h1>', unsafe_allow_html=True)
+
+    channels = list_channels()
+    if channels.empty:
+        st.info("💡 Analyze a channel first; every stored channel can be compared here.")
+        return
+
+    names = dict(zip(channels['channel_id'], channels['channel_name']))
+    default = [st.session_state.current_cid] if st.session_state.current_cid in names else []
+    with st.container(border=True):
+        selected = st.multiselect("Channels to compare", list(names), default=default,
+                                  format_func=lambda cid: f"{names[cid]} ({cid})")
+
+    if not selected:
+        st.info("💡 Pick the channels to compare; archive their videos first for view and cadence metrics.")
+        return
+
+    # A handful of grouped queries, however many channels are selected
+    df = load_channel_comparison(selected)
+
+    with st.container(border=True):
+        table = df.assign(engagement_rate=df['engagement_rate'] * 100).rename(columns={
+            'channel_name': 'Channel', 'subscriber_count': 'Subscribers', 'archived_videos': 'Videos',
+            'median_views': 'Median views', 'avg_views': 'Avg views', 'engagement_rate': 'Engagement',
+            'uploads_per_week': f'Uploads/week ({CADENCE_DAYS}d)', 'days_between_uploads': 'Days between uploads',
+            'last_upload': 'Last upload',
+        }).drop(columns=['channel_id', 'total_views', 'like_rate'])
+        st.dataframe(table, use_container_width=True, hide_index=True, column_config={
+            'Engagement': st.column_config.NumberColumn(format="%.2f%%"),
+            'Median views': st.column_config.NumberColumn(format="%d"),
+            'Avg views': st.column_config.NumberColumn(format="%d"),
+            f'Uploads/week ({CADENCE_DAYS}d)': st.column_config.NumberColumn(format="%.2f"),
+            'Days between uploads': st.column_config.NumberColumn(format="%.1f"),
+        })
+        st.caption("Engagement is (likes + comments) / views over each channel's archived videos.")
+
+    c1, c2, c3 = st.columns(3)
+    for col, (column, title, fmt) in zip((c1, c2, c3), [
+        ('uploads_per_week', 'Uploads per week', None),
+        ('median_views', 'Median views', None),
+        ('engagement_rate', 'Engagement ratio', '.1%'),
+    ]):
+        with col:
+            with st.container(border=True):
+                st.markdown(f"### {title}")
+                with span("render.compare"):
+                    st.plotly_chart(comparison_bar(df, column, title, fmt), use_container_width=True)
+
 def show_about():
     st.markdown('<h1 class="page-title">About <span class="blue-accent">Project</span></h1>', unsafe_allow_html=True)
     with st.container(border=True):
@@ -298,6 +451,69 @@ def show_about():
         st.divider()
         st.write("Professional Insight Suite • 2026")
 
+def show_diagnostics():
+    st.markdown('<h1 class="page-title">Pipeline <span class="blue-accent">Diagnostics</span></h1>', unsafe_allow_html=True)
+    metrics = snapshot()
+    counters = metrics["counters"]
+    # Set once this process has charged its first API call
+    quota_left = metrics["gauges"].get(("youtube_quota_remaining_units", ()))
+
+    render_metric_cards([
+        {"label": "API Requests", "value": format_count(counter_total("youtube_api_requests_total")), "icon": "📡"},
+        {"label": "API Retries", "value": format_count(counter_total("youtube_api_retries_total")), "icon": "🔁"},
+        {"label": "Quota Left Today", "value": format_count(quota_left) if quota_left is not None else "---", "icon": "🎫"},
+        {"label": "SQL Statements", "value": format_count(counter_total("db_statements_total")), "icon": "🗄️"},
+    ])
+
+    with st.container(border=True):
+        st.markdown("### Stage Timings")
+        stages = pd.DataFrame([
+            {"stage": name, "calls": s["calls"], "errors": s["errors"], "total_s": s["seconds"],
+             "mean_ms": 1000 * s["seconds"] / s["calls"] if s["calls"] else 0.0,
+             "max_ms": 1000 * s["max_seconds"], "sql_statements": s["sql_statements"], "sql_s": s["sql_seconds"]}
+            for name, s in metrics["stages"].items()
+        ])
+        if stages.empty:
+            st.info("💡 No stage has run in this server process yet.")
+        else:
+            st.dataframe(stages.sort_values("total_s", ascending=False), use_container_width=True, hide_index=True)
+        st.caption("Nested stages are included in their parents (e.g. api.* inside extract.*); SQL counts are inclusive too.")
+
+    def counter_frame(name, value_label):
+        rows = [{**dict(key), value_label: value} for (metric, key), value in counters.items() if metric == name]
+        return pd.DataFrame(rows)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        with st.container(border=True):
+            st.markdown("### SQL by Statement Kind")
+            sql = counter_frame("db_statements_total", "statements")
+            if not sql.empty:
+                sql = sql.merge(counter_frame("db_rows_total", "rows"), on="kind", how="left")
+                sql = sql.merge(counter_frame("db_statement_seconds_total", "seconds"), on="kind", how="left")
+            st.dataframe(sql, use_container_width=True, hide_index=True)
+    with c2:
+        with st.container(border=True):
+            st.markdown("### API Requests")
+            st.dataframe(counter_frame("youtube_api_requests_total", "requests"), use_container_width=True, hide_index=True)
+            st.dataframe(counter_frame("youtube_quota_units_total", "quota_units"), use_container_width=True, hide_index=True)
+
+    with st.container(border=True):
+        st.markdown("### Caches")
+        st.json({"app_cache": cache_stats(), "http_cache": get_cache_stats()}, expanded=False)
+
+    text = prometheus_text()
+    c1, c2 = st.columns(2)
+    with c1:
+        st.download_button("DOWNLOAD METRICS (.prom)", text, file_name="youtube_analytics.prom",
+                           mime="text/plain", use_container_width=True)
+    with c2:
+        if st.button("RESET COUNTERS", use_container_width=True):
+            reset_metrics()
+            st.rerun()
+    if METRICS_TEXTFILE:
+        st.caption(f"Metrics written to {write_textfile()}")
+
 # ----------------- Router -----------------
 if st.session_state.navigation == "🏠 Home":
     show_home()
@@ -307,5 +523,9 @@ elif st.session_state.navigation == "🎬 Videos":
     show_video_analytics()
 elif st.session_state.navigation == "📈 Dashboard":
     show_dashboard()
+elif st.session_state.navigation == "⚖️ Compare":
+    show_compare()
 elif st.session_state.navigation == "ℹ️ About":
     show_about()
+elif st.session_state.navigation == "🩺 Diagnostics":
+    show_diagnostics()
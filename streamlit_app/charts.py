@@ -0,0 +1,85 @@
+import os
+import numpy as np
+import plotly.express as px
+
+# Above this many points the scatter renders with WebGL (scattergl)
+SCATTER_WEBGL_THRESHOLD = int(os.getenv("SCATTER_WEBGL_THRESHOLD", "2000"))
+
+# Points actually sent to the browser; larger catalogs are downsampled
+SCATTER_MAX_POINTS = int(os.getenv("SCATTER_MAX_POINTS", "5000"))
+
+# Grid used for stratification, in log10 space on both axes
+SCATTER_BINS = 20
+
+
+def _extremes(values, k):
+    """Positions of the k smallest and k largest values."""
+    if len(values) <= 2 * k:
+        return np.arange(len(values))
+    return np.concatenate([np.argpartition(values, k)[:k], np.argpartition(values, -k)[-k:]])
+
+
+def downsample_points(df, max_points=SCATTER_MAX_POINTS, x="view_count", y="like_count",
+                      bins=SCATTER_BINS, seed=0):
+    """
+    Reduces a scatter to at most `max_points` rows while keeping its shape.
+    - Outliers are always kept: the extremes of each axis and of the y/x
+      ratio (e.g. unusually high or low like rate), up to half the budget
+    - The rest is a stratified sample over a log-spaced x/y grid: every
+      occupied cell keeps at least one point, dense cells proportionally more
+    - Sampling is seeded, so reruns show the same points
+    df.attrs["total_points"] holds the size before sampling.
+    """
+    total = len(df)
+    if total <= max_points:
+        result = df
+    else:
+        lx = np.log10(np.clip(df[x].to_numpy(dtype=float, na_value=0), 0, None) + 1)
+        ly = np.log10(np.clip(df[y].to_numpy(dtype=float, na_value=0), 0, None) + 1)
+
+        keep = np.zeros(total, dtype=bool)
+        k = max(1, max_points // 12)
+        for values in (lx, ly, ly - lx):
+            keep[_extremes(values, k)] = True
+
+        rest = np.flatnonzero(~keep)
+        budget = max_points - int(keep.sum())
+        if budget > 0 and len(rest):
+            def bin_of(values):
+                edges = np.linspace(values.min(), values.max(), bins + 1)[1:-1]
+                return np.digitize(values[rest], edges)
+
+            cell = bin_of(lx) * bins + bin_of(ly)
+            rng = np.random.default_rng(seed)
+            order = np.lexsort((rng.random(len(rest)), cell))
+            sorted_cells = cell[order]
+            starts = np.r_[0, np.flatnonzero(np.diff(sorted_cells)) + 1]
+            counts = np.diff(np.r_[starts, len(order)])
+            rank = np.arange(len(order)) - np.repeat(starts, counts)
+
+            if budget > len(counts):
+                quota = 1 + counts * (budget - len(counts)) // len(rest)
+                chosen = order[rank < np.repeat(quota, counts)]
+            else:
+                chosen = rng.choice(order[rank == 0], size=budget, replace=False)
+            keep[rest[chosen]] = True
+
+        result = df.iloc[np.flatnonzero(keep)]
+
+    result = result.copy()
+    result.attrs["total_points"] = total
+    return result
+
+
+def engagement_scatter(points):
+    """
+    View vs like scatter sized by comments. Switches to WebGL above
+    SCATTER_WEBGL_THRESHOLD points; pass points through downsample_points
+    first so the payload stays bounded.
+    """
+    render_mode = "webgl" if len(points) > SCATTER_WEBGL_THRESHOLD else "svg"
+    fig = px.scatter(points, x='view_count', y='like_count', size='comment_count',
+                     hover_name='title', color='view_count', color_continuous_scale='Blues',
+                     render_mode=render_mode)
+    fig.update_layout(margin=dict(l=0, r=0, t=20, b=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    return fig
@@ -0,0 +1,187 @@
+import os
+import sys
+import threading
+from pathlib import Path
+import pandas as pd
+import streamlit as st
+from cachetools import TTLCache
+
+# Add project root to Python path
+root_path = Path(__file__).resolve().parent.parent
+if str(root_path) not in sys.path:
+    sys.path.insert(0, str(root_path))
+
+from data_processing.channel_extractor import extract_channel_data
+from data_processing.video_extractor import iter_video_batches
+from data_processing.video_frame import compact_video_frame
+from database.persistence import save_channel_to_db, save_video_stream_to_db
+from database.queries import load_video_frame
+from database.snapshots import read_video_frame, snapshot_is_current
+from database.instrumentation import span
+
+# Shared across all sessions of the Streamlit server process
+CACHE_TTL_SECONDS = int(os.getenv("APP_CACHE_TTL_SECONDS", "900"))
+CACHE_MAX_MB = float(os.getenv("APP_CACHE_MAX_MB", "512"))
+
+
+# Charged per entry on top of its value (key tuple, TTL bookkeeping), so
+# that counts and small dicts still count against the memory cap
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def _value_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_value_size(k) + _value_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_value_size(item) for item in value)
+    return size
+
+
+def _entry_size(value):
+    """Approximate bytes held by a cache entry: its value, containers walked, plus a fixed overhead."""
+    return ENTRY_OVERHEAD_BYTES + _value_size(value)
+
+
+class _SharedCache:
+    """
+    TTL cache bounded by the memory size of its entries, with one lock per
+    key so concurrent sessions asking for the same channel run one load.
+    A key's lock only exists while a load for it is running or waited on.
+    Entries are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, ttl, max_bytes):
+        self._entries = TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=_entry_size)
+        self._lock = threading.Lock()
+        # key -> [lock, number of callers holding or waiting for it]
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader, refresh=False):
+        with self._lock:
+            if not refresh and key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+
+        try:
+            with key_lock[0]:
+                # Another session may have loaded it while we waited
+                with self._lock:
+                    if not refresh and key in self._entries:
+                        self.hits += 1
+                        return self._entries[key]
+                    self.misses += 1
+
+                value = loader()
+
+                with self._lock:
+                    if _entry_size(value) <= self._entries.maxsize:
+                        self._entries[key] = value
+                return value
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+    def invalidate(self, predicate):
+        with self._lock:
+            for key in [k for k in self._entries.keys() if predicate(k)]:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": int(self._entries.currsize),
+                "max_bytes": int(self._entries.maxsize),
+                "ttl_seconds": self._entries.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_cache():
+    return _SharedCache(CACHE_TTL_SECONDS, int(CACHE_MAX_MB * 1024 * 1024))
+
+
+def load_channel(channel_id, refresh=False):
+    """Channel row from the API (saved to the DB on each real fetch)."""
+    @span("app.load_channel")
+    def loader():
+        df = extract_channel_data([channel_id])
+        if not df.empty:
+            save_channel_to_db(df.iloc[0])
+        return df
+
+    return _shared_cache().get_or_load(("channel", channel_id), loader, refresh)
+
+
+def load_video_archive(channel_id, refresh=False):
+    """
+    Incremental archive sync through the streaming sink, cached per channel.
+    Full batches are persisted and dropped; returns the number of videos
+    synced (the pages read the archive back through load_stored_videos).
+    Invalidates the channel's DB reader entries once the write is done.
+    Errors propagate after committed batches are kept; nothing is cached then.
+    """
+    @span("app.load_archive")
+    def loader():
+        synced = 0
+
+        def count(stream):
+            nonlocal synced
+            for batch in stream:
+                synced += len(batch)
+                yield batch
+
+        try:
+            save_video_stream_to_db(count(iter_video_batches(channel_id, incremental=True)), channel_id)
+        finally:
+            invalidate_channel(channel_id, readers_only=True)
+        return synced
+
+    return _shared_cache().get_or_load(("archive", channel_id), loader, refresh)
+
+
+def load_stored_videos(channel_id):
+    """
+    The channel's archived videos with latest statistics, in the compact
+    schema (video_frame.with_thumbnails / with_descriptions add the omitted
+    columns on demand). Read from the channel's Parquet snapshot when it is
+    current (memory-mapped, no ORM round trip), from the DB otherwise.
+    """
+    @span("app.load_stored_videos")
+    def loader():
+        if snapshot_is_current(channel_id):
+            return compact_video_frame(read_video_frame(channel_id))
+        return compact_video_frame(load_video_frame(channel_id))
+
+    return _shared_cache().get_or_load(("db:videos", channel_id), loader)
+
+
+def cached_db_read(name, channel_id, loader):
+    """Caches any DB reader result under the channel's reader namespace."""
+    return _shared_cache().get_or_load((f"db:{name}", channel_id), loader)
+
+
+def invalidate_channel(channel_id, readers_only=False):
+    """Drops cached entries for a channel (only DB readers with readers_only)."""
+    def matches(key):
+        namespace, cid = key[0], key[1]
+        return cid == channel_id and (not readers_only or namespace.startswith("db:"))
+
+    _shared_cache().invalidate(matches)
+
+
+def cache_stats():
+    return _shared_cache().stats()
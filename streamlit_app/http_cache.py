@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import httplib2
+
+# Default freshness per response part, in seconds. A request is fresh for the
+# shortest TTL among the parts it asks for, so `statistics` keeps counters
+# current while snippet/contentDetails-only requests are served from disk.
+PART_TTLS = {
+    "statistics": int(os.getenv("YOUTUBE_CACHE_TTL_STATISTICS", 15 * 60)),
+    "snippet": int(os.getenv("YOUTUBE_CACHE_TTL_SNIPPET", 6 * 3600)),
+    "contentDetails": int(os.getenv("YOUTUBE_CACHE_TTL_CONTENT_DETAILS", 7 * 24 * 3600)),
+}
+# Endpoint-level overrides (the uploads playlist changes whenever a video is posted)
+ENDPOINT_TTLS = {
+    "playlistItems": int(os.getenv("YOUTUBE_CACHE_TTL_PLAYLIST_ITEMS", 10 * 60)),
+}
+DEFAULT_TTL = int(os.getenv("YOUTUBE_CACHE_TTL_DEFAULT", 3600))
+
+CacheEntry = namedtuple("CacheEntry", ["headers", "content", "etag", "expires_at"])
+
+
+def cache_key(uri):
+    """Stable key for a request URI; the API key is dropped so it is never stored."""
+    parts = urlsplit(uri)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if k != "key")
+    normalized = f"{parts.path}?{urlencode(query)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def endpoint_name(uri):
+    """`https://.../youtube/v3/videos?...` -> `videos`"""
+    return urlsplit(uri).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def ttl_for(uri):
+    endpoint = endpoint_name(uri)
+    if endpoint in ENDPOINT_TTLS:
+        return ENDPOINT_TTLS[endpoint]
+    query = dict(parse_qsl(urlsplit(uri).query))
+    parts = [p for p in query.get("part", "").split(",") if p]
+    ttls = [PART_TTLS.get(p, DEFAULT_TTL) for p in parts]
+    return min(ttls) if ttls else DEFAULT_TTL
+
+
+class ResponseCache:
+    """
+    Base class for response cache backends.
+    Subclasses implement _get/_put/_touch/_evict/_usage; this class keeps the
+    hit/miss counters that get_cache_stats() reports.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_served_from_cache": 0,
+        }
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key, endpoint, headers, content, etag, ttl):
+        with self._lock:
+            self._put(key, endpoint, headers, content, etag, time.time() + ttl)
+            self._counters["stores"] += 1
+            self._counters["evictions"] += self._evict()
+
+    def touch(self, key, ttl):
+        with self._lock:
+            self._touch(key, time.time() + ttl)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._usage()
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats.update({
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0,
+        })
+        return stats
+
+
+class SqliteResponseCache(ResponseCache):
+    """Single-file SQLite backend; LRU order is tracked in `last_access`."""
+
+    def __init__(self, path, max_bytes):
+        super().__init__(max_bytes)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, endpoint TEXT, headers TEXT, content BLOB,"
+            " etag TEXT, size INTEGER, expires_at REAL, last_access REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)"
+        )
+
+    def _get(self, key):
+        row = self._conn.execute(
+            "SELECT headers, content, etag, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(json.loads(row[0]), bytes(row[1]), row[2], row[3])
+
+    def _put(self, key, endpoint, headers, content, etag, expires_at):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, endpoint, json.dumps(headers), content, etag, len(content), expires_at, time.time())
+        )
+
+    def _touch(self, key, expires_at):
+        self._conn.execute(
+            "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+            (expires_at, time.time(), key)
+        )
+
+    def _usage(self):
+        entries, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return entries, size
+
+    def _evict(self):
+        _, size = self._usage()
+        evicted = 0
+        while size > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, entry_size in rows:
+                if size <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                size -= entry_size
+                evicted += 1
+        return evicted
+
+
+class FileResponseCache(ResponseCache):
+    """One `<key>.json` metadata file and one `<key>.body` file per response."""
+
+    def __init__(self, directory, max_bytes):
+        super().__init__(max_bytes)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def _read_meta(self, meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _get(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = self._read_meta(meta_path)
+            with open(body_path, "rb") as f:
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        meta["last_access"] = time.time()
+        self._write_meta(meta_path, meta)
+        return CacheEntry(meta["headers"], content, meta["etag"], meta["expires_at"])
+
+    def _put(self, key, endpoint, headers, content, etag, expires_at):
+        meta_path, body_path = self._paths(key)
+        with open(body_path, "wb") as f:
+            f.write(content)
+        self._write_meta(meta_path, {
+            "endpoint": endpoint, "headers": headers, "etag": etag, "size": len(content),
+            "expires_at": expires_at, "last_access": time.time(),
+        })
+
+    def _touch(self, key, expires_at):
+        meta_path, _ = self._paths(key)
+        try:
+            meta = self._read_meta(meta_path)
+        except (OSError, ValueError):
+            return
+        meta["expires_at"] = expires_at
+        meta["last_access"] = time.time()
+        self._write_meta(meta_path, meta)
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    meta = self._read_meta(entry.path)
+                except (OSError, ValueError):
+                    continue
+                entries.append((meta["last_access"], meta["size"], entry.name[:-5]))
+        return entries
+
+    def _usage(self):
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        evicted = 0
+        for _, entry_size, key in entries:
+            if size <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            size -= entry_size
+            evicted += 1
+        return evicted
+
+
+class CachingHttp:
+    """
+    httplib2.Http wrapper that serves GET requests from a ResponseCache.
+    - Fresh entries are returned without touching the network
+    - Stale entries with an ETag are revalidated with If-None-Match; a 304
+      refreshes the entry and returns the cached body
+    Everything else is delegated to the wrapped Http object.
+    """
+
+    def __init__(self, http, cache):
+        self._http = http
+        self._cache = cache
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+    @property
+    def last_request_source(self):
+        """How the last request on this thread was answered: network, cache or revalidated."""
+        return getattr(self._local, "source", "network")
+
+    def is_fresh(self, uri):
+        """True when a GET for `uri` would be answered from the cache without a request."""
+        entry = self._cache.get(cache_key(uri))
+        return entry is not None and entry.expires_at > time.time()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self._local.source = "network"
+        if method != "GET":
+            return self._http.request(uri, method=method, body=body, headers=headers, **kwargs)
+
+        key = cache_key(uri)
+        entry = self._cache.get(key)
+
+        if entry is not None and entry.expires_at > time.time():
+            self._cache.count("hits")
+            self._cache.count("bytes_served_from_cache", len(entry.content))
+            self._local.source = "cache"
+            return httplib2.Response(entry.headers), entry.content
+
+        headers = dict(headers or {})
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        resp, content = self._http.request(uri, method=method, body=body, headers=headers, **kwargs)
+
+        if resp.status == 304 and entry is not None:
+            self._cache.touch(key, ttl_for(uri))
+            self._cache.count("revalidated")
+            self._cache.count("bytes_served_from_cache", len(entry.content))
+            self._local.source = "revalidated"
+            return httplib2.Response(entry.headers), entry.content
+
+        self._cache.count("misses")
+        if resp.status == 200:
+            stored_headers = {k: v for k, v in resp.items() if k != "status"}
+            stored_headers["status"] = "200"
+            self._cache.put(key, endpoint_name(uri), stored_headers, content,
+                            resp.get("etag"), ttl_for(uri))
+
+        return resp, content
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Process-wide response cache configured from the environment.
+    - YOUTUBE_HTTP_CACHE: sqlite (default), file or off
+    - YOUTUBE_HTTP_CACHE_PATH: database file / directory location
+    - YOUTUBE_HTTP_CACHE_MAX_MB: size bound for LRU eviction
+    Returns None when caching is off.
+    """
+    global _cache
+    backend = os.getenv("YOUTUBE_HTTP_CACHE", "sqlite").lower()
+    if backend == "off":
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            max_bytes = int(float(os.getenv("YOUTUBE_HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+            if backend == "file":
+                path = os.getenv("YOUTUBE_HTTP_CACHE_PATH", "./data/http_cache")
+                _cache = FileResponseCache(path, max_bytes)
+            else:
+                path = os.getenv("YOUTUBE_HTTP_CACHE_PATH", "./data/http_cache.sqlite")
+                _cache = SqliteResponseCache(path, max_bytes)
+        return _cache
+
+
+def get_cache_stats():
+    """Hit/miss/revalidation counters plus current size of the response cache."""
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {}
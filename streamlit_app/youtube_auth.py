@@ -1,20 +1,134 @@
 import os
+import json
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import build_http
+from streamlit_app.http_cache import CachingHttp, get_response_cache
 
 # Load environment variables from .env file
 load_dotenv()
 
+# YouTube Data API v3 discovery document shipped with the app, so building a
+# client never needs the discovery endpoint (works offline / air-gapped).
+DISCOVERY_DOCUMENT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "discovery", "youtube.v3.json"
+)
+
+# Idle httplib2.Http objects (each with its keep-alive connections) kept
+# for reuse by PooledHttp; more are created while requests overlap
+HTTP_POOL_SIZE = int(os.getenv("YOUTUBE_HTTP_POOL_SIZE", "8"))
+
+# Built clients, one per (api key, endpoint), shared by every thread
+_services = {}
+_services_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def load_discovery_document():
+    """Parses the bundled discovery document once per process."""
+    with open(DISCOVERY_DOCUMENT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PooledHttp:
+    """
+    Thread-safe stand-in for httplib2.Http. httplib2.Http is not
+    thread-safe, so each request borrows one from a process-level pool and
+    returns it afterwards, keeping its connections open for the next caller
+    on any thread (Streamlit reruns, extractor workers, the refresher).
+    """
+
+    def __init__(self, factory=build_http, max_idle=HTTP_POOL_SIZE):
+        self._factory = factory
+        self._max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+        # Attribute reads (timeout, redirect_codes, ...) go to a pooled instance
+        self._release(self._acquire())
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        with self._lock:
+            template = self._idle[-1] if self._idle else None
+        if template is None:
+            template = self._factory()
+        return getattr(template, name)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return self._factory()
+
+    def _release(self, http):
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(http)
+                return
+        http.close()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        http = self._acquire()
+        try:
+            return http.request(uri, method=method, body=body, headers=headers, **kwargs)
+        finally:
+            self._release(http)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for http in idle:
+            http.close()
+
+
+def _build_service(api_key, endpoint=None):
+    http = PooledHttp()
+    cache = get_response_cache()
+    if cache is not None:
+        http = CachingHttp(http, cache)
+
+    return build_from_document(
+        load_discovery_document(),
+        http=http,
+        developerKey=api_key,
+        client_options={"api_endpoint": endpoint} if endpoint else None
+    )
+
+
 def get_youtube_service():
+    """
+    Returns the process-wide YouTube client, safe to share between threads.
+    - Built once from the bundled discovery document
+    - Requests borrow pooled HTTP connections (PooledHttp), so keep-alive
+      connections survive Streamlit reruns and worker threads alike
+    - Routes GET requests through the on-disk response cache (http_cache)
+    - YOUTUBE_API_ENDPOINT points it at another server, e.g. the offline
+      stand-in in benchmarks/fake_api_server.py
+    - A separate client is built per YOUTUBE_API_KEY / YOUTUBE_API_ENDPOINT
+    """
     api_key = os.getenv("YOUTUBE_API_KEY")
+    endpoint = os.getenv("YOUTUBE_API_ENDPOINT")
 
     if not api_key:
         raise Exception("YOUTUBE_API_KEY not found. Please check your .env file.")
 
-    youtube = build(
-        serviceName="youtube",
-        version="v3",
-        developerKey=api_key
-    )
+    key = (api_key, endpoint)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = _build_service(api_key, endpoint)
+    return service
+
 
-    return youtube
+def reset_youtube_service():
+    """Drops the cached clients and their pooled connections (e.g. after changing settings)."""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service._http.close()
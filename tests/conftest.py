@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+# Point the database layer at a throwaway SQLite file before anything imports
+# database.db_config, so tests never write to a real database.
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="yt_analytics_tests_")
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}"
+)
+# No client-side rate limiting against the in-process fake API
+os.environ["YOUTUBE_REQUESTS_PER_SECOND"] = "0"
+os.environ["YOUTUBE_HTTP_CACHE_PATH"] = os.path.join(_TEST_DB_DIR, "http_cache.sqlite")
+os.environ["SNAPSHOT_DIR"] = os.path.join(_TEST_DB_DIR, "snapshots")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _create_tables():
+    from database.db_config import engine
+    from database.models import Base
+
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+def _video_frame(ids, **columns):
+    ids = list(ids)
+    values = {
+        "video_id": ids,
+        "title": [f"Video {vid}" for vid in ids],
+        "description": "",
+        "published_at": "2024-01-01T00:00:00Z",
+        "duration_seconds": 60,
+        "view_count": 100,
+        "like_count": 1,
+        "comment_count": 0,
+    }
+    unknown = set(columns) - set(values)
+    if unknown:
+        raise TypeError(f"Not a video column: {sorted(unknown)}")
+    values.update(columns)
+    frame = pd.DataFrame({col: list(v) if isinstance(v, (list, tuple, pd.Index, pd.Series)) else v
+                          for col, v in values.items()})
+    frame["published_at"] = pd.to_datetime(frame["published_at"], utc=True)
+    return frame
+
+
+@pytest.fixture
+def make_videos():
+    """
+    Factory for the 8-column video DataFrame get_all_video_metadata()
+    returns: make_videos(ids, **columns). Columns left out get placeholder
+    values, a scalar is repeated for every video.
+    """
+    return _video_frame
@@ -0,0 +1,149 @@
+"""
+In-process stand-in for the googleapiclient YouTube service.
+Serves channels/playlistItems/videos list calls from a synthetic catalog and
+records every call so tests can assert on request patterns and quota.
+"""
+from datetime import datetime, timedelta, timezone
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def make_video(index, channel_id="UC_FAKE_CHANNEL_000000001", published_at=None, views=None):
+    published_at = published_at or datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index)
+    return {
+        "id": f"VID{index:07d}",
+        "channel_id": channel_id,
+        "title": f"Fake video {index}",
+        "description": f"Description for fake video {index}",
+        "published_at": published_at,
+        "duration": f"PT{index % 60}M{index % 60}S",
+        "view_count": views if views is not None else 1000 + index,
+        "like_count": 10 + index % 100,
+        "comment_count": index % 7,
+    }
+
+
+class _Request:
+    def __init__(self, method_id, handler, kwargs):
+        self.methodId = method_id
+        self._handler = handler
+        self._kwargs = kwargs
+
+    def execute(self):
+        return self._handler(**self._kwargs)
+
+
+class _Resource:
+    def __init__(self, service, name):
+        self._service = service
+        self._name = name
+
+    def list(self, **kwargs):
+        handler = getattr(self._service, f"_{self._name}_list")
+
+        def _record_and_handle(**kw):
+            self._service.calls.append((self._name, kw))
+            return handler(**kw)
+
+        return _Request(f"youtube.{self._name}.list", _record_and_handle, kwargs)
+
+
+class FakeYouTube:
+    """Fake service object. `uploads` is the uploads playlist, newest first."""
+
+    def __init__(self, channel_id="UC_FAKE_CHANNEL_000000001", videos=None, channel_name="Fake Channel",
+                 extra_channel_ids=()):
+        self.channel_id = channel_id
+        self.channel_name = channel_name
+        # Further valid channel IDs (no uploads) for multi-channel lookups
+        self.extra_channel_ids = set(extra_channel_ids)
+        self.uploads = list(videos or [])
+        self.calls = []
+
+    # --- resource accessors, mirroring googleapiclient ---
+    def channels(self):
+        return _Resource(self, "channels")
+
+    def playlistItems(self):
+        return _Resource(self, "playlistItems")
+
+    def videos(self):
+        return _Resource(self, "videos")
+
+    # --- helpers for tests ---
+    def add_uploads(self, new_videos):
+        """Prepends newly published videos to the uploads playlist."""
+        self.uploads = list(new_videos) + self.uploads
+
+    def calls_to(self, name):
+        return [kw for endpoint, kw in self.calls if endpoint == name]
+
+    # --- endpoint handlers ---
+    def _channels_list(self, part, id, **_):
+        ids = id.split(",")
+        if len(ids) > 50:
+            raise HttpError(httplib2.Response({"status": "400"}), b'{"error": {"code": 400}}')
+        items = []
+        for cid in ids:
+            if cid != self.channel_id and cid not in self.extra_channel_ids:
+                continue
+            items.append({
+                "id": cid,
+                "snippet": {
+                    "title": self.channel_name if cid == self.channel_id else f"Channel {cid}",
+                    "customUrl": "@fake",
+                    "description": "Fake channel",
+                    "publishedAt": "2015-06-01T00:00:00Z",
+                    "thumbnails": {
+                        size: {"url": f"https://yt3.example/{cid}/{size}.jpg"}
+                        for size in ("default", "medium", "high")
+                    },
+                },
+                "statistics": {
+                    "subscriberCount": "12345",
+                    "videoCount": str(len(self.uploads) if cid == self.channel_id else 0),
+                    "viewCount": str(sum(v["view_count"] for v in self.uploads) if cid == self.channel_id else 0),
+                },
+                "contentDetails": {"relatedPlaylists": {"uploads": "UU" + cid[2:]}},
+            })
+        return {"items": items}
+
+    def _playlistItems_list(self, part, playlistId, maxResults=50, pageToken=None, **_):
+        start = int(pageToken or 0)
+        page = self.uploads[start:start + maxResults]
+        response = {"items": [{"contentDetails": {"videoId": v["id"]}} for v in page]}
+        if start + maxResults < len(self.uploads):
+            response["nextPageToken"] = str(start + maxResults)
+        return response
+
+    def _videos_list(self, part, id, **_):
+        parts = set(part.split(","))
+        by_id = {v["id"]: v for v in self.uploads}
+        items = []
+        for vid in id.split(","):
+            video = by_id.get(vid)
+            if video is None:
+                continue
+            item = {"id": vid}
+            if "snippet" in parts:
+                item["snippet"] = {
+                    "title": video["title"],
+                    "description": video["description"],
+                    "publishedAt": video["published_at"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "thumbnails": {
+                        "default": {"url": f"https://i.ytimg.com/vi/{vid}/default.jpg"},
+                        "medium": {"url": f"https://i.ytimg.com/vi/{vid}/mqdefault.jpg"},
+                        "high": {"url": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg"},
+                    },
+                }
+            if "contentDetails" in parts:
+                item["contentDetails"] = {"duration": video["duration"]}
+            if "statistics" in parts:
+                item["statistics"] = {
+                    "viewCount": str(video["view_count"]),
+                    "likeCount": str(video["like_count"]),
+                    "commentCount": str(video["comment_count"]),
+                }
+            items.append(item)
+        return {"items": items}
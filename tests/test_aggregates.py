@@ -0,0 +1,122 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+from sqlalchemy import select
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import engine
+from database.models import ChannelSummary, ChannelMonthlyPosts, ChannelTopVideo
+from database.aggregates import rebuild_aggregates
+from database import persistence
+from database.persistence import save_statistics_to_db, save_videos_to_db
+from database.queries import channel_video_summary, load_monthly_posts, load_top_videos
+
+CHANNEL_ID = "UC_AGGREGATES_TEST_00001"
+
+
+def _mid_month(months):
+    return [f"{m}-15T12:00:00Z" for m in months]
+
+
+def _snapshot():
+    with engine.connect() as conn:
+        summary = conn.execute(
+            select(ChannelSummary.video_count, ChannelSummary.total_views,
+                   ChannelSummary.total_likes, ChannelSummary.total_comments)
+            .where(ChannelSummary.channel_id == CHANNEL_ID)
+        ).one()
+        months = conn.execute(
+            select(ChannelMonthlyPosts.month, ChannelMonthlyPosts.video_count)
+            .where(ChannelMonthlyPosts.channel_id == CHANNEL_ID).order_by(ChannelMonthlyPosts.month)
+        ).all()
+        top = conn.execute(
+            select(ChannelTopVideo.video_id, ChannelTopVideo.title, ChannelTopVideo.view_count)
+            .where(ChannelTopVideo.channel_id == CHANNEL_ID).order_by(ChannelTopVideo.video_id)
+        ).all()
+    return summary, months, top
+
+
+def test_incremental_aggregates_match_a_full_rebuild(make_videos):
+    ids = [f"AG{i:04d}" for i in range(40)]
+    save_videos_to_db(make_videos(ids, published_at=_mid_month(["2024-01"] * 20 + ["2024-02"] * 20),
+                                  view_count=[i * 100 for i in range(40)]), CHANNEL_ID)
+
+    # Counters grow, one video moves to another month, new uploads arrive
+    changed = make_videos(ids[:5], published_at=_mid_month(["2024-03"] + ["2024-01"] * 4),
+                          view_count=[10_000, 9_000, 8_000, 7_000, 6_000])
+    changed.loc[1, "title"] = "Renamed"
+    save_videos_to_db(changed, CHANNEL_ID)
+    save_videos_to_db(make_videos(["AG9000", "AG9001"], published_at=_mid_month(["2024-03"] * 2),
+                                  view_count=[50, 60]), CHANNEL_ID)
+
+    incremental = _snapshot()
+    summary, months, top = incremental
+    assert summary[0] == 42
+    assert months == [("2024-01", 19), ("2024-02", 20), ("2024-03", 3)]
+
+    with engine.begin() as conn:
+        rebuild_aggregates(conn, CHANNEL_ID)
+    assert _snapshot() == incremental
+
+    top_10 = load_top_videos(CHANNEL_ID, 10)
+    assert top_10["video_id"].tolist()[:3] == ["AG0000", "AG0001", "AG0002"]
+    assert top_10.loc[1, "title"] == "Renamed"
+    assert load_monthly_posts(CHANNEL_ID)["video_count"].tolist() == [19, 20, 3]
+    assert channel_video_summary(CHANNEL_ID)["avg_views"] == summary[1] / 42
+
+
+def test_interleaved_writers_do_not_lose_updates(make_videos, monkeypatch):
+    channel_id = "UC_AGGREGATES_RACE_00001"
+    ids = [f"AR{i:04d}" for i in range(4)]
+    save_videos_to_db(make_videos(ids), channel_id)
+
+    # Each writer pauses after reading the previous counters until the other
+    # has read too; with the channel lock the second one cannot get there
+    # first, so the pause times out and the writes run one after the other.
+    read_together = threading.Barrier(2)
+    latest_snapshots = persistence._latest_snapshots
+
+    def paused_latest_snapshots(db, video_ids):
+        latest = latest_snapshots(db, video_ids)
+        try:
+            read_together.wait(timeout=1)
+        except threading.BrokenBarrierError:
+            pass
+        return latest
+
+    monkeypatch.setattr(persistence, "_latest_snapshots", paused_latest_snapshots)
+    writers = [
+        threading.Thread(target=save_statistics_to_db, args=(pd.DataFrame({
+            "video_id": ids[:3] if n == 0 else ids[1:],
+            "view_count": [1_000 * (n + 1)] * 3,
+            "like_count": [10] * 3,
+            "comment_count": [1] * 3,
+        }),))
+        for n in range(2)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    with engine.connect() as conn:
+        incremental = conn.execute(
+            select(ChannelSummary.video_count, ChannelSummary.total_views)
+            .where(ChannelSummary.channel_id == channel_id)
+        ).one()
+    with engine.begin() as conn:
+        rebuild_aggregates(conn, channel_id)
+    with engine.connect() as conn:
+        rebuilt = conn.execute(
+            select(ChannelSummary.video_count, ChannelSummary.total_views)
+            .where(ChannelSummary.channel_id == channel_id)
+        ).one()
+    assert incremental == rebuilt
+    # AR0000 from the first writer, AR0003 from the second; AR0001/2 from whichever committed last
+    assert rebuilt[1] in (1_000 + 2 * 1_000 + 2_000, 1_000 + 2 * 2_000 + 2_000)
@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing import api_scheduler, video_extractor
+from data_processing.api_scheduler import QuotaExhaustedError, QuotaScheduler
+from database.db_config import build_engine
+from database.models import Base
+from database.quota import DatabaseQuotaLedger
+from streamlit_app.http_cache import CachingHttp, SqliteResponseCache
+from fake_youtube import FakeYouTube, make_video
+
+
+def _http_error(status, reason):
+    content = json.dumps({"error": {"code": status, "errors": [{"reason": reason}]}}).encode()
+    return HttpError(httplib2.Response({"status": str(status)}), content)
+
+
+class _FlakyRequest:
+    methodId = "youtube.videos.list"
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.attempts = 0
+
+    def execute(self):
+        self.attempts += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return {"items": []}
+
+
+def test_transient_errors_are_retried():
+    scheduler = QuotaScheduler(daily_budget=100, requests_per_second=0, wait_max=0.01)
+    request = _FlakyRequest([_http_error(503, "backendError"), _http_error(403, "rateLimitExceeded")])
+
+    assert scheduler.execute(request) == {"items": []}
+    usage = scheduler.usage()
+    assert request.attempts == 3
+    assert usage["retries"] == 2
+    assert usage["by_endpoint"] == {"videos.list": 3}
+
+
+def test_permanent_errors_are_not_retried():
+    scheduler = QuotaScheduler(daily_budget=100, requests_per_second=0, wait_max=0.01)
+    request = _FlakyRequest([_http_error(404, "videoNotFound")])
+
+    with pytest.raises(HttpError):
+        scheduler.execute(request)
+    assert request.attempts == 1
+
+
+def test_budget_and_quota_exceeded_raise_typed_error():
+    scheduler = QuotaScheduler(daily_budget=2, requests_per_second=0)
+    scheduler.execute(_FlakyRequest([]))
+    scheduler.execute(_FlakyRequest([]))
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.execute(_FlakyRequest([]))
+
+    scheduler = QuotaScheduler(daily_budget=100, requests_per_second=0)
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.execute(_FlakyRequest([_http_error(403, "quotaExceeded")]))
+    assert scheduler.remaining() == 0
+
+
+class _NetworkHttp:
+    def __init__(self):
+        self.requests = 0
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.requests += 1
+        return httplib2.Response({"status": "200"}), b'{"items": []}'
+
+
+class _CachedRequest:
+    """Just enough of googleapiclient's HttpRequest to go through CachingHttp."""
+    methodId = "youtube.videos.list"
+    method = "GET"
+    uri = "https://youtube.googleapis.com/youtube/v3/videos?part=snippet&id=a"
+
+    def __init__(self, http):
+        self.http = http
+
+    def execute(self):
+        resp, content = self.http.request(self.uri, method=self.method)
+        return json.loads(content)
+
+
+class _CountingBucket:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+def test_cache_hits_take_no_quota_or_rate_limit_token(tmp_path):
+    inner = _NetworkHttp()
+    http = CachingHttp(inner, SqliteResponseCache(str(tmp_path / "cache.sqlite"), 1024 * 1024))
+    scheduler = QuotaScheduler(daily_budget=1, requests_per_second=0)
+    scheduler._bucket = _CountingBucket()
+
+    for _ in range(3):
+        assert scheduler.execute(_CachedRequest(http)) == {"items": []}
+
+    usage = scheduler.usage()
+    assert inner.requests == 1 and scheduler._bucket.acquired == 1
+    assert usage["spent"] == 1 and usage["cache_hits"] == 2
+
+
+def test_database_ledger_shares_the_budget_across_schedulers(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'quota.db'}")
+    Base.metadata.create_all(engine)
+
+    app = QuotaScheduler(daily_budget=5, requests_per_second=0, ledger=DatabaseQuotaLedger(engine))
+    refresher = QuotaScheduler(daily_budget=3, requests_per_second=0, ledger=DatabaseQuotaLedger(engine))
+    for _ in range(3):
+        refresher.execute(_FlakyRequest([]))
+    with pytest.raises(QuotaExhaustedError):
+        refresher.execute(_FlakyRequest([]))
+
+    # The app's budget caps the shared spend, not its own calls
+    app.execute(_FlakyRequest([]))
+    app.execute(_FlakyRequest([]))
+    with pytest.raises(QuotaExhaustedError):
+        app.execute(_FlakyRequest([]))
+    assert app.usage()["by_endpoint"] == {"videos.list": 2}
+
+    # A restarted process picks up the day's spend
+    restarted = QuotaScheduler(daily_budget=5, requests_per_second=0, ledger=DatabaseQuotaLedger(engine))
+    assert restarted.remaining() == 0 and restarted.usage()["spent"] == 5
+
+    # YouTube's quotaExceeded stops every scheduler on the ledger
+    roomy = QuotaScheduler(daily_budget=50_000, requests_per_second=0, ledger=DatabaseQuotaLedger(engine))
+    with pytest.raises(QuotaExhaustedError):
+        roomy.execute(_FlakyRequest([_http_error(403, "quotaExceeded")]))
+    assert roomy.usage()["spent"] == 50_000
+
+
+def test_shared_ledger_is_opt_in_and_needs_its_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_scheduler, "_scheduler", None)
+    assert isinstance(api_scheduler.get_scheduler().ledger, api_scheduler.QuotaLedger)
+    monkeypatch.setattr(api_scheduler, "_scheduler", None)
+    monkeypatch.setattr(api_scheduler, "QUOTA_LEDGER", "db")
+    assert isinstance(api_scheduler.get_scheduler().ledger, DatabaseQuotaLedger)
+
+    # A database that predates the quota_spend table is reported up front
+    with pytest.raises(RuntimeError, match="quota_spend"):
+        DatabaseQuotaLedger(build_engine(f"sqlite:///{tmp_path / 'old.db'}"))
+
+
+def test_extractor_surfaces_exhausted_budget(monkeypatch):
+    fake = FakeYouTube(channel_id="UC_FAKE_QUOTA_0000000001",
+                       videos=[make_video(i) for i in range(200, 0, -1)])
+    monkeypatch.setattr(video_extractor, "get_youtube_service", lambda: fake)
+    monkeypatch.setattr(api_scheduler, "_scheduler", QuotaScheduler(daily_budget=3, requests_per_second=0))
+
+    with pytest.raises(QuotaExhaustedError):
+        video_extractor.get_all_video_metadata(fake.channel_id, max_workers=1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,69 @@
+import os
+import sys
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing import channel_extractor
+from database.db_config import SessionLocal
+from database.models import Channel
+from fake_youtube import FakeYouTube
+
+WATCHLIST = [f"UC_FAKE_WATCH_{i:010d}" for i in range(180)]
+
+
+def _use_fake(monkeypatch):
+    fake = FakeYouTube(channel_id=WATCHLIST[0], extra_channel_ids=WATCHLIST[1:])
+    monkeypatch.setattr(channel_extractor, "get_youtube_service", lambda: fake)
+    return fake
+
+
+def test_extract_channel_data_chunks_past_50_ids(monkeypatch):
+    fake = _use_fake(monkeypatch)
+    ids = WATCHLIST[:120] + ["UC_NOT_A_REAL_CHANNEL_01"]
+
+    df = channel_extractor.extract_channel_data(ids)
+
+    assert df["channel_id"].tolist() == WATCHLIST[:120]
+    assert df.attrs["invalid_ids"] == ["UC_NOT_A_REAL_CHANNEL_01"]
+    assert all(len(kw["id"].split(",")) <= 50 for kw in fake.calls_to("channels"))
+    assert len(fake.calls_to("channels")) == 3
+
+
+def test_sync_channels_streams_into_bulk_upsert(monkeypatch):
+    import threading
+
+    fake = _use_fake(monkeypatch)
+    ids = WATCHLIST + ["UC_NOT_A_REAL_CHANNEL_02", WATCHLIST[5]]
+    threads = set()
+    list_channels = fake.channels
+
+    def channels():
+        threads.add(threading.current_thread().name)
+        return list_channels()
+
+    fake.channels = channels
+
+    result = channel_extractor.sync_channels(ids, max_workers=3)
+
+    assert result.requested == 181
+    assert result.saved == 180 and result.failed_ids == []
+    assert result.invalid_ids == ["UC_NOT_A_REAL_CHANNEL_02"]
+
+    again = channel_extractor.sync_channels(WATCHLIST[:60], max_workers=3)
+    assert (again.inserted, again.updated) == (0, 60)
+    # Chunks ran on the shared long-lived fetch pool, not a per-call one
+    assert threads and all(name.startswith("youtube-fetch-3") for name in threads)
+
+    db = SessionLocal()
+    try:
+        assert db.query(Channel).filter(Channel.channel_id.in_(WATCHLIST)).count() == 180
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
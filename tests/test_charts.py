@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from streamlit_app.charts import downsample_points, engagement_scatter
+
+
+def _points(n, seed=1):
+    rng = np.random.default_rng(seed)
+    views = rng.lognormal(8, 2, n).astype("int64")
+    likes = (views * rng.uniform(0.01, 0.05, n)).astype("int64")
+    return pd.DataFrame({
+        "title": [f"Video {i}" for i in range(n)],
+        "view_count": views,
+        "like_count": likes,
+        "comment_count": rng.integers(0, 100, n),
+    })
+
+
+def test_downsampling_is_bounded_and_keeps_outliers():
+    df = _points(50_000)
+    # A viral video, a dud, and one with a far higher like rate than the rest
+    df.loc[10, ["view_count", "like_count"]] = [10**9, 10**6]
+    df.loc[20, ["view_count", "like_count"]] = [0, 0]
+    df.loc[30, ["view_count", "like_count"]] = [5_000, 4_000]
+
+    sample = downsample_points(df, max_points=2_000)
+
+    assert len(sample) <= 2_000
+    assert sample.attrs["total_points"] == 50_000
+    assert {10, 20, 30} <= set(sample.index)
+    assert sample["view_count"].max() == df["view_count"].max()
+    # Seeded: reruns send the same points
+    assert downsample_points(df, max_points=2_000).index.equals(sample.index)
+
+
+def test_small_catalogs_are_untouched_and_large_ones_use_webgl():
+    small = downsample_points(_points(300), max_points=2_000)
+    assert len(small) == 300 and small.attrs["total_points"] == 300
+    assert engagement_scatter(small).data[0].type == "scatter"
+
+    large = downsample_points(_points(20_000), max_points=5_000)
+    assert engagement_scatter(large).data[0].type == "scattergl"
@@ -0,0 +1,153 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.compaction import compact_statistics
+from database.growth import NUMPY, SQL, channel_growth, video_velocity
+from database.db_config import build_engine
+from database.models import Base, Channel, Video, VideoStatistics, VideoStatisticsDaily, VideoStatisticsWeekly
+
+CHANNEL_ID = "UC_COMPACT_00000000000001"
+NOW = datetime(2031, 6, 20, 12)  # a Friday
+RAW_DAYS, DAILY_DAYS = 7, 28
+
+
+def _snapshot(vid, at, views, likes=0):
+    return {"video_id": vid, "record_date": at, "view_count": views, "like_count": likes, "comment_count": 0}
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    # Compaction is database-wide, so it gets its own database
+    engine = build_engine(f"sqlite:///{tmp_path_factory.mktemp('compaction') / 'stats.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _history(engine):
+    videos = ["CMP_A", "CMP_B", "CMP_OLD"]
+    rows = []
+    # CMP_A: three snapshots a day for 60 days up to NOW
+    for day in range(60):
+        for hour in (1, 9, 17):
+            at = NOW - timedelta(days=60 - day) + timedelta(hours=hour - 12)
+            rows.append(_snapshot("CMP_A", at, 1_000 * day + hour, likes=day))
+    # CMP_B: out-of-order counts within one old day
+    base = NOW - timedelta(days=10)
+    rows += [_snapshot("CMP_B", base.replace(hour=2), 500), _snapshot("CMP_B", base.replace(hour=6), 300),
+             _snapshot("CMP_B", base.replace(hour=20), 400), _snapshot("CMP_B", NOW, 900)]
+    # CMP_OLD: stopped being tracked long ago; its newest snapshot must stay raw
+    rows += [_snapshot("CMP_OLD", NOW - timedelta(days=100, hours=h), 10 - h) for h in (3, 2, 1)]
+
+    with engine.begin() as conn:
+        conn.execute(insert(Channel), [{"channel_id": CHANNEL_ID, "channel_name": "Compaction"}])
+        conn.execute(insert(Video), [{"video_id": vid, "channel_id": CHANNEL_ID, "title": vid} for vid in videos])
+        conn.execute(insert(VideoStatistics), rows)
+
+
+def _rows(engine, model, vid):
+    with engine.connect() as conn:
+        return conn.execute(select(model).where(model.video_id == vid)
+                            .order_by(*model.__table__.primary_key.columns)).mappings().all()
+
+
+def test_compaction_rolls_up_and_is_rerunnable(engine):
+    with engine.connect() as conn:
+        total_before = sum(len(conn.execute(select(m)).all())
+                           for m in (VideoStatistics, VideoStatisticsDaily, VideoStatisticsWeekly))
+
+    growth_before = channel_growth(CHANNEL_ID, bind=engine).set_index("period")
+    report = compact_statistics(RAW_DAYS, DAILY_DAYS, batch_size=25, now=NOW, bind=engine)
+
+    assert report.raw_cutoff == datetime(2031, 6, 13)
+    assert report.daily_cutoff == datetime(2031, 5, 19)  # Monday of the week of NOW - 28 days
+    assert report.transactions > 60 * 3 // 25
+
+    raw_a = _rows(engine, VideoStatistics, "CMP_A")
+    assert min(r["record_date"] for r in raw_a) >= report.raw_cutoff
+
+    daily_a = _rows(engine, VideoStatisticsDaily, "CMP_A")
+    assert [r["period_start"] for r in daily_a] == [
+        report.daily_cutoff + timedelta(days=d) for d in range((report.raw_cutoff - report.daily_cutoff).days)
+    ]
+    first = daily_a[0]
+    day = (first["period_start"] - (NOW - timedelta(days=60)).replace(hour=0)).days
+    assert first["samples"] == 3
+    assert (first["view_count_min"], first["view_count_max"], first["view_count_last"]) == (
+        1_000 * day + 1, 1_000 * day + 17, 1_000 * day + 17)
+    assert first["first_recorded_at"].hour == 1 and first["last_recorded_at"].hour == 17
+
+    weekly_a = _rows(engine, VideoStatisticsWeekly, "CMP_A")
+    assert all(r["period_start"].weekday() == 0 for r in weekly_a)
+    assert weekly_a[-1]["period_start"] < report.daily_cutoff
+    assert sum(r["samples"] for r in weekly_a) + sum(r["samples"] for r in daily_a) + len(raw_a) == 60 * 3
+    full_week = weekly_a[1]
+    assert full_week["samples"] == 21
+    assert full_week["view_count_last"] == full_week["view_count_max"]
+    assert full_week["like_count_max"] - full_week["like_count_min"] == 6
+
+    (b_day,) = _rows(engine, VideoStatisticsDaily, "CMP_B")
+    assert (b_day["view_count_min"], b_day["view_count_max"], b_day["view_count_last"]) == (300, 500, 400)
+    assert [r["view_count"] for r in _rows(engine, VideoStatistics, "CMP_B")] == [900]
+
+    assert [r["view_count"] for r in _rows(engine, VideoStatistics, "CMP_OLD")] == [9]
+    (old_week,) = _rows(engine, VideoStatisticsWeekly, "CMP_OLD")
+    assert (old_week["samples"], old_week["view_count_min"], old_week["view_count_last"]) == (2, 7, 8)
+
+    with engine.connect() as conn:
+        total_after = sum(len(conn.execute(select(m)).all())
+                          for m in (VideoStatistics, VideoStatisticsDaily, VideoStatisticsWeekly))
+    assert report.rows_reclaimed == total_before - total_after > 0
+
+    # Growth analytics still cover the rolled-up history, at a coarser resolution
+    for method in (SQL, NUMPY):
+        growth_after = channel_growth(CHANNEL_ID, method=method, bind=engine).set_index("period")
+        assert growth_after.index[0] == growth_before.index[0]
+        assert growth_after.index[-1] == growth_before.index[-1]
+        assert len(growth_after) < len(growth_before)
+        # Totals as of the end of each remaining day are unchanged
+        assert growth_after["total_views"].equals(growth_before.loc[growth_after.index, "total_views"])
+        assert growth_after["videos_tracked"].iloc[-1] == 3
+    velocity = video_velocity(CHANNEL_ID, video_ids=["CMP_A"], bind=engine)
+    assert velocity["record_date"].min() < report.daily_cutoff
+
+    # A late snapshot for an already rolled-up day merges into its daily row
+    late = first["period_start"] + timedelta(hours=23)
+    with engine.begin() as conn:
+        conn.execute(insert(VideoStatistics), [_snapshot("CMP_A", late, 99_999)])
+    rerun = compact_statistics(RAW_DAYS, DAILY_DAYS, batch_size=25, now=NOW, bind=engine)
+    assert (rerun.raw_rows_removed, rerun.daily_rows_added, rerun.rows_reclaimed) == (1, 0, 1)
+    merged = _rows(engine, VideoStatisticsDaily, "CMP_A")[0]
+    assert (merged["samples"], merged["view_count_max"], merged["view_count_last"]) == (4, 99_999, 99_999)
+
+    assert compact_statistics(RAW_DAYS, DAILY_DAYS, batch_size=25, now=NOW, bind=engine).rows_reclaimed == 0
+
+
+def test_snapshots_carry_the_rolled_up_history(engine, tmp_path):
+    from database import snapshots
+    from database.init_db import migrate
+
+    with engine.connect() as conn:
+        rollups = sum(len(conn.execute(select(m)).all()) for m in (VideoStatisticsDaily, VideoStatisticsWeekly))
+    root = tmp_path / "snapshots"
+    exported = snapshots.export_channel(CHANNEL_ID, root, bind=engine)
+    assert exported["rollups"] == rollups > 0
+
+    target = build_engine(f"sqlite:///{tmp_path / 'restored.db'}")
+    migrate(target)
+    assert snapshots.import_channel(CHANNEL_ID, root, bind=target)["rollups"] == rollups
+    assert snapshots.import_channel(CHANNEL_ID, root, bind=target)["rollups"] == 0
+
+    # The restored database has the same growth history, not just the raw window
+    restored = channel_growth(CHANNEL_ID, bind=target)
+    assert restored.equals(channel_growth(CHANNEL_ID, bind=engine))
+    assert restored["period"].min() < NOW - timedelta(days=RAW_DAYS)
@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing import video_extractor
+from streamlit_app import data_cache
+from streamlit_app.data_cache import _SharedCache, _entry_size
+from data_processing.video_frame import with_thumbnails
+from fake_youtube import FakeYouTube, make_video
+
+
+def test_archive_is_shared_and_loaded_once(monkeypatch):
+    fake = FakeYouTube(channel_id="UC_FAKE_CACHE_0000000001",
+                       videos=[make_video(i) for i in range(120, 0, -1)])
+    monkeypatch.setattr(video_extractor, "get_youtube_service", lambda: fake)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(data_cache.load_video_archive(fake.channel_id)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [120] * 5
+    assert len(fake.calls_to("channels")) == 1
+    assert len(data_cache.load_stored_videos(fake.channel_id)) == 120
+
+    # A forced refresh syncs again and invalidates the DB readers
+    fake.add_uploads([make_video(121)])
+    assert data_cache.load_video_archive(fake.channel_id) == 120
+    assert data_cache.load_video_archive(fake.channel_id, refresh=True) == 121
+    assert len(data_cache.load_stored_videos(fake.channel_id)) == 121
+    stored = data_cache.load_stored_videos(fake.channel_id)
+    assert "thumbnail_high" not in stored and "description" not in stored
+    assert with_thumbnails(stored)["thumbnail_high"].str.contains("i.ytimg.com").all()
+
+
+def test_stored_videos_read_the_current_snapshot(make_videos, monkeypatch):
+    from database.persistence import save_channel_to_db, save_videos_to_db
+    from database.snapshots import export_channel
+
+    channel_id = "UC_FAKE_CACHE_SNAPSHOT01"
+    save_channel_to_db({"channel_id": channel_id, "channel_name": "Snapshot cache"})
+    save_videos_to_db(make_videos([f"CS{i:03d}" for i in range(5)], published_at="2024-03-01T00:00:00Z",
+                                  view_count=[10, 20, 30, 40, 50]), channel_id)
+    export_channel(channel_id)
+
+    def no_db_read(cid):
+        raise AssertionError("read the database although the snapshot is current")
+
+    monkeypatch.setattr(data_cache, "load_video_frame", no_db_read)
+    data_cache.invalidate_channel(channel_id)
+    stored = data_cache.load_stored_videos(channel_id)
+    assert sorted(stored["view_count"].tolist()) == [10, 20, 30, 40, 50]
+    assert str(stored["view_count"].dtype) == "uint8"
+
+
+def test_shared_cache_memory_cap_and_invalidation():
+    frame = pd.DataFrame({"x": range(1000)})
+    cache = _SharedCache(ttl=60, max_bytes=_entry_size(frame) * 2 + 10)
+
+    for cid in ("a", "b", "c"):
+        cache.get_or_load(("db:videos", cid), lambda: frame.copy())
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["size_bytes"] <= cache.stats()["max_bytes"]
+
+    cache.invalidate(lambda key: key[1] == "c")
+    loads = []
+    cache.get_or_load(("db:videos", "c"), lambda: loads.append(1) or frame)
+    assert loads == [1]
+
+    # Per-key locks live only while a load runs, not once per key ever seen
+    assert cache._key_locks == {}
+    started, release = threading.Event(), threading.Event()
+    slow = threading.Thread(target=lambda: cache.get_or_load(
+        ("db:videos", "d"), lambda: started.set() or release.wait() and frame))
+    slow.start()
+    started.wait()
+    assert list(cache._key_locks) == [("db:videos", "d")]
+    release.set()
+    slow.join()
+    assert cache._key_locks == {}
+
+
+def test_small_entries_count_against_the_cap():
+    counts = {"video_count": 120, "total_views": 10_000, "channel": "UC_FAKE_CACHE_SIZES0001"}
+    assert _entry_size(counts) > _entry_size(120) > 1
+
+    cache = _SharedCache(ttl=60, max_bytes=_entry_size(120) * 10)
+    for n in range(50):
+        cache.get_or_load(("archive", f"UC{n}"), lambda: 120)
+    assert cache.stats()["entries"] == 10
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
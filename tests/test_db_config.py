@@ -0,0 +1,38 @@
+import os
+import sys
+
+from sqlalchemy import text
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import build_engine
+
+
+def test_tuned_sqlite_profile_sets_pragmas(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "2500")
+    engine = build_engine(f"sqlite:///{tmp_path / 'nested' / 'tuned.db'}", profile="tuned")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+    engine.dispose()
+
+
+def test_default_profile_keeps_plain_engine(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'plain.db'}", profile="default")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "delete"
+    engine.dispose()
+
+
+def test_pooled_profile_reads_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "3")
+    # create_engine does not connect, so no server or driver session is needed
+    engine = build_engine("postgresql+psycopg2://user:pw@localhost/db", profile="tuned")
+    assert engine.pool.size() == 7
+    assert engine.pool._max_overflow == 3
+    assert engine.pool._pre_ping
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from benchmarks.fake_api_server import catalog_channel_id, start_server
+from data_processing import api_scheduler
+from data_processing.api_scheduler import QuotaExhaustedError, QuotaScheduler
+from data_processing.channel_extractor import extract_channel_data
+from data_processing.video_extractor import get_all_video_metadata
+from streamlit_app.youtube_auth import reset_youtube_service
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Real googleapiclient stack pointed at the local server, without the response cache."""
+    servers = []
+
+    def start(sizes, **faults):
+        server = start_server(sizes, **faults)
+        servers.append(server)
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", server.url)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "offline")
+        monkeypatch.setenv("YOUTUBE_HTTP_CACHE", "off")
+        monkeypatch.setattr(api_scheduler, "_scheduler",
+                            QuotaScheduler(daily_budget=1000, requests_per_second=0, wait_max=0.01))
+        reset_youtube_service()
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    reset_youtube_service()
+
+
+def test_extraction_over_http_with_injected_errors(fake_api):
+    server = fake_api([120, 1000], error_rate=0.2, seed=3)
+
+    df = get_all_video_metadata(catalog_channel_id(120), max_workers=1)
+    channels = extract_channel_data([catalog_channel_id(1000), "UC_NOT_IN_THE_CATALOG_00"], max_workers=1)
+
+    assert len(df) == 120 and df["video_id"].is_unique
+    assert df["duration_seconds"].min() >= 60 and df["view_count"].gt(0).all()
+    assert channels["video_count"].tolist() == [1000]
+    stats = server.stats()
+    assert stats["requests"]["playlistItems"] >= 3 and stats["requests"]["videos"] >= 3
+    # Injected 503s were retried by the scheduler rather than surfacing
+    assert stats["errors"] > 0
+    assert api_scheduler.get_scheduler().usage()["retries"] == stats["errors"]
+
+
+def test_quota_error_is_raised(fake_api):
+    fake_api([500], quota_limit=3)
+    with pytest.raises(QuotaExhaustedError):
+        get_all_video_metadata(catalog_channel_id(500), max_workers=1)
@@ -0,0 +1,88 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import insert
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database import growth
+from database.db_config import engine
+from database.models import Channel, Video, VideoStatistics
+
+CHANNEL_ID = "UC_GROWTH_000000000000001"
+START = datetime(2026, 3, 1)
+
+# video_id: [(hours after START, views, likes)]
+HISTORY = {
+    "GRW_A": [(0, 1_000, 100), (24, 3_000, 160), (48, 7_000, 260), (96, 11_000, 300)],
+    "GRW_B": [(12, 500, 5), (36, 600, 7)],
+    "GRW_C": [(24, 42, 1)],  # a single snapshot: no interval yet
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _history():
+    with engine.begin() as conn:
+        conn.execute(insert(Channel), [{"channel_id": CHANNEL_ID, "channel_name": "Growth"}])
+        conn.execute(insert(Video), [{"video_id": vid, "channel_id": CHANNEL_ID, "title": f"Title {vid}"}
+                                     for vid in HISTORY])
+        conn.execute(insert(VideoStatistics), [
+            {"video_id": vid, "record_date": START + timedelta(hours=h), "view_count": v,
+             "like_count": l, "comment_count": 0}
+            for vid, snapshots in HISTORY.items() for h, v, l in snapshots
+        ])
+
+
+@pytest.mark.parametrize("method", [growth.SQL, growth.NUMPY])
+def test_video_velocity(method):
+    velocity = growth.video_velocity(CHANNEL_ID, method=method)
+
+    assert velocity["video_id"].tolist() == ["GRW_A"] * 3 + ["GRW_B"]
+    a = velocity[velocity["video_id"] == "GRW_A"]
+    assert a["days"].tolist() == [1.0, 1.0, 2.0]
+    assert a["views_per_day"].tolist() == [2_000.0, 4_000.0, 2_000.0]
+    assert a["likes_per_day"].tolist() == [60.0, 100.0, 20.0]
+    # (4000 - 2000) / 1 day, then (2000 - 4000) / 2 days
+    assert np.isnan(a["acceleration"].iloc[0])
+    assert a["acceleration"].tolist()[1:] == [2_000.0, -1_000.0]
+    assert velocity["record_date"].iloc[0] == pd.Timestamp(START + timedelta(hours=24))
+
+    # Intervals ending at or after `since` keep their earlier snapshots as predecessors
+    recent = growth.video_velocity(CHANNEL_ID, since=START + timedelta(hours=40), method=method)
+    assert recent["video_id"].tolist() == ["GRW_A", "GRW_A"]
+    assert recent["acceleration"].tolist() == [2_000.0, -1_000.0]
+
+
+def test_sql_and_numpy_paths_agree():
+    with engine.connect() as conn:
+        assert growth.supports_window_functions(conn)
+    for fn in (growth.load_snapshot_lags, growth.video_velocity, growth.channel_growth):
+        pd.testing.assert_frame_equal(fn(CHANNEL_ID, method=growth.SQL), fn(CHANNEL_ID, method=growth.NUMPY))
+
+
+def test_latest_velocity_ranks_videos():
+    latest = growth.latest_velocity(CHANNEL_ID)
+    assert latest["video_id"].tolist() == ["GRW_A", "GRW_B"]
+    assert latest["title"].tolist() == ["Title GRW_A", "Title GRW_B"]
+    assert latest["views_per_day"].tolist() == [2_000.0, 100.0]
+    assert growth.latest_velocity(CHANNEL_ID, n=1)["video_id"].tolist() == ["GRW_A"]
+
+
+def test_channel_growth_curve():
+    curve = growth.channel_growth(CHANNEL_ID)
+
+    assert curve["period"].dt.day.tolist() == [1, 2, 3, 5]
+    # Day 1: A and B first seen; day 2: A +2000, B +100, C first seen; day 3: A +4000; day 5: A +4000
+    assert curve["total_views"].tolist() == [1_500, 3_642, 7_642, 11_642]
+    assert curve["views_gained"].tolist() == [0, 2_100, 4_000, 4_000]
+    assert curve["likes_gained"].tolist() == [0, 62, 100, 40]
+    assert curve["videos_tracked"].tolist() == [2, 3, 3, 3]
+
+    assert growth.channel_growth("UC_GROWTH_NO_SNAPSHOTS_01").empty
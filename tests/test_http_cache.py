@@ -0,0 +1,83 @@
+import os
+import sys
+
+import httplib2
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from streamlit_app import http_cache
+from streamlit_app.http_cache import CachingHttp, FileResponseCache, SqliteResponseCache
+
+STATS_URI = "https://youtube.googleapis.com/youtube/v3/videos?part=statistics&id=a&key=SECRET"
+
+
+class _FakeHttp:
+    """Answers with a fixed ETag and honours If-None-Match."""
+
+    def __init__(self):
+        self.requests = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return httplib2.Response({"status": "304", "etag": '"v1"'}), b""
+        return httplib2.Response({"status": "200", "etag": '"v1"'}), b'{"items": []}'
+
+
+def _exercise(cache, monkeypatch):
+    inner = _FakeHttp()
+    http = CachingHttp(inner, cache)
+
+    resp, content = http.request(STATS_URI)
+    assert resp.status == 200 and content == b'{"items": []}'
+    assert http.last_request_source == "network"
+
+    # Fresh: served without a network call
+    resp, content = http.request(STATS_URI)
+    assert resp.status == 200 and content == b'{"items": []}'
+    assert len(inner.requests) == 1 and http.last_request_source == "cache"
+
+    # Stale: revalidated with If-None-Match, 304 returns the stored body
+    monkeypatch.setitem(http_cache.PART_TTLS, "statistics", 0)
+    cache.touch(http_cache.cache_key(STATS_URI), 0)
+    resp, content = http.request(STATS_URI)
+    assert resp.status == 200 and content == b'{"items": []}'
+    assert inner.requests[-1]["If-None-Match"] == '"v1"'
+    assert http.last_request_source == "revalidated"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (1, 1, 1)
+    assert stats["entries"] == 1
+
+
+def test_sqlite_cache_hit_and_revalidation(tmp_path, monkeypatch):
+    _exercise(SqliteResponseCache(str(tmp_path / "cache.sqlite"), 1024 * 1024), monkeypatch)
+
+
+def test_file_cache_hit_and_revalidation(tmp_path, monkeypatch):
+    _exercise(FileResponseCache(str(tmp_path / "cache"), 1024 * 1024), monkeypatch)
+
+
+def test_lru_eviction_and_ttls(tmp_path):
+    cache = SqliteResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=350)
+    for i in range(5):
+        cache.put(f"k{i}", "videos", {"status": "200"}, b"x" * 100, None, 60)
+        if i == 2:
+            cache.get("k0")  # keep k0 recently used
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+    assert cache.stats()["size_bytes"] <= 350
+
+    # Shortest TTL among the requested parts wins; the API key never enters the key
+    assert http_cache.ttl_for(STATS_URI) == http_cache.PART_TTLS["statistics"]
+    assert http_cache.ttl_for(STATS_URI.replace("statistics", "contentDetails")) == \
+        http_cache.PART_TTLS["contentDetails"]
+    assert http_cache.cache_key(STATS_URI) == http_cache.cache_key(STATS_URI.replace("SECRET", "OTHER"))
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+import os
+import sys
+
+from sqlalchemy import create_engine, inspect, text
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.init_db import migrate
+
+
+def test_migrate_adds_indexes_and_backfills_latest_stats(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # Schema as created by the original models: no indexes, no latest table
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE videos (video_id VARCHAR(50) PRIMARY KEY, channel_id VARCHAR(50) NOT NULL,"
+                          " title VARCHAR(255) NOT NULL, description TEXT, published_at DATETIME,"
+                          " duration_seconds INTEGER, last_updated DATETIME)"))
+        conn.execute(text("CREATE TABLE video_statistics (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                          " video_id VARCHAR(50) NOT NULL, view_count BIGINT, like_count BIGINT,"
+                          " comment_count BIGINT, record_date DATETIME)"))
+        conn.execute(text("CREATE INDEX ix_videos_channel_published ON videos (channel_id, published_at)"))
+        conn.execute(text("INSERT INTO videos (video_id, channel_id, title) VALUES ('v1', 'UC1', 'T')"))
+        conn.execute(text("INSERT INTO video_statistics (video_id, view_count, like_count, comment_count, record_date)"
+                          " VALUES ('v1', 10, 1, 0, '2024-01-01 00:00:00'), ('v1', 25, 2, 1, '2024-01-08 00:00:00')"))
+
+    migrate(engine)
+    migrate(engine)  # idempotent
+
+    inspector = inspect(engine)
+    assert "ix_video_statistics_video_record_date" in {ix["name"] for ix in inspector.get_indexes("video_statistics")}
+    video_indexes = {ix["name"] for ix in inspector.get_indexes("videos")}
+    assert "ix_videos_channel_published_id" in video_indexes
+    assert "ix_videos_channel_published" not in video_indexes
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT video_id, channel_id, view_count FROM video_latest_stats")).all()
+    assert rows == [("v1", "UC1", 25)]
+    with engine.connect() as conn:
+        summary = conn.execute(text("SELECT channel_id, video_count, total_views FROM channel_summaries")).all()
+    assert summary == [("UC1", 1, 25)]
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database import instrumentation
+from database.instrumentation import (
+    counter_total, increment, instrument_engine, prometheus_text, set_gauge, snapshot, span,
+    start_textfile_writer, stop_textfile_writer, write_textfile,
+)
+from data_processing import video_extractor
+from database.persistence import save_channel_to_db, save_video_stream_to_db
+from fake_youtube import FakeYouTube, make_video
+
+
+@pytest.fixture(autouse=True)
+def _clean_metrics():
+    instrumentation.reset()
+    yield
+    instrumentation.reset()
+
+
+def test_spans_nest_and_count_their_sql():
+    engine = instrument_engine(create_engine("sqlite://"))
+    instrument_engine(engine)  # idempotent: statements are not counted twice
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        with span("outer"):
+            conn.execute(text("INSERT INTO t VALUES (1), (2), (3)"))
+            with span("inner"):
+                conn.execute(text("SELECT * FROM t")).all()
+                conn.execute(text("UPDATE t SET x = x + 1 WHERE x > 1"))
+
+    with pytest.raises(ValueError):
+        with span("inner"):
+            raise ValueError("boom")
+
+    # A failing statement is counted as an error and leaves no start time behind
+    with engine.connect() as conn:
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["metrics_started"] == {}
+
+    stages = snapshot()["stages"]
+    assert stages["outer"]["calls"] == 1
+    assert stages["outer"]["sql_statements"] == 3
+    assert stages["inner"]["calls"] == 2
+    assert stages["inner"]["errors"] == 1
+    assert stages["inner"]["sql_statements"] == 2
+    assert stages["outer"]["seconds"] >= stages["outer"]["max_seconds"] > 0
+
+    assert counter_total("db_statements_total", kind="INSERT") == 1
+    assert counter_total("db_statements_total", kind="OTHER") == 1
+    assert counter_total("db_rows_total", kind="INSERT") == 3
+    assert counter_total("db_rows_total", kind="UPDATE") == 2
+    assert counter_total("db_rows_total", kind="SELECT") == 0
+    assert counter_total("db_statement_errors_total", kind="SELECT") == 1
+    assert counter_total("db_statements_total", kind="SELECT") == 1
+
+
+def test_prometheus_text_and_textfile(tmp_path):
+    with span("persist.video_batch"):
+        pass
+    increment("youtube_api_requests_total", endpoint="videos.list", outcome="ok")
+    increment("youtube_api_requests_total", 2, endpoint="videos.list", outcome="ok")
+    increment("youtube_api_requests_total", endpoint="videos.list", outcome="http_503")
+    set_gauge("youtube_quota_remaining_units", 9_997)
+    increment("youtube_quota_units_total", 1_234_567, endpoint="search.list")
+    increment("db_statement_seconds_total", 0.1, kind="SELECT")
+    increment("db_statement_seconds_total", 0.2, kind="SELECT")
+
+    body = prometheus_text()
+    lines = body.splitlines()
+    assert "# TYPE youtube_analytics_youtube_api_requests_total counter" in lines
+    assert 'youtube_analytics_youtube_api_requests_total{endpoint="videos.list",outcome="ok"} 3' in lines
+    assert 'youtube_analytics_youtube_api_requests_total{endpoint="videos.list",outcome="http_503"} 1' in lines
+    assert "youtube_analytics_youtube_quota_remaining_units 9997" in lines
+    # Exact past 10^6, shortest round-trip repr for floats
+    assert 'youtube_analytics_youtube_quota_units_total{endpoint="search.list"} 1234567' in lines
+    assert f'youtube_analytics_db_statement_seconds_total{{kind="SELECT"}} {0.1 + 0.2!r}' in lines
+    assert 'youtube_analytics_stage_calls_total{stage="persist.video_batch"} 1' in lines
+    assert body.endswith("\n")
+
+    path = tmp_path / "metrics" / "app.prom"
+    assert write_textfile(str(path)) == str(path)
+    assert path.read_text(encoding="utf-8") == prometheus_text()
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_textfile_writer_keeps_the_file_current(tmp_path, monkeypatch):
+    path = tmp_path / "app.prom"
+    writer = start_textfile_writer(str(path), interval=0.01)
+    try:
+        assert start_textfile_writer(str(path), interval=0.01) is writer
+        assert path.exists()
+        increment("youtube_api_requests_total", endpoint="search.list", outcome="ok")
+        expected = 'youtube_analytics_youtube_api_requests_total{endpoint="search.list",outcome="ok"} 1'
+        for _ in range(200):
+            if expected in path.read_text(encoding="utf-8").splitlines():
+                break
+            time.sleep(0.01)
+        else:
+            raise AssertionError("textfile was not rewritten")
+    finally:
+        stop_textfile_writer()
+    assert not writer.is_alive()
+
+    monkeypatch.setattr(instrumentation, "METRICS_TEXTFILE", None)
+    assert start_textfile_writer() is None
+
+
+def test_pipeline_stages_and_api_counters(monkeypatch):
+    fake = FakeYouTube(channel_id="UC_FAKE_METRICS_00000001", videos=[make_video(i) for i in range(120, 0, -1)])
+    monkeypatch.setattr(video_extractor, "get_youtube_service", lambda: fake)
+    save_channel_to_db({"channel_id": fake.channel_id, "channel_name": "Metrics",
+                        "subscriber_count": 1, "video_count": 120, "view_count": 1})
+
+    save_video_stream_to_db(video_extractor.iter_video_batches(fake.channel_id, max_workers=1), fake.channel_id)
+
+    stages = snapshot()["stages"]
+    assert stages["extract.playlist_page"]["calls"] == 3
+    assert stages["extract.video_details"]["calls"] == 3
+    assert stages["normalize.durations"]["calls"] == 3
+    assert stages["persist.video_batch"]["calls"] == 3
+    assert stages["persist.video_batch"]["sql_statements"] > 0
+    assert stages["persist.search_index"]["calls"] == 3
+    assert counter_total("youtube_api_requests_total", outcome="ok") == 7
+    assert counter_total("youtube_api_requests_total", endpoint="videos.list") == 3
+    assert counter_total("youtube_quota_units_total") == 7
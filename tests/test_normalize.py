@@ -0,0 +1,42 @@
+import os
+import sys
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing.normalize import normalize_channels, normalize_videos, parse_durations
+
+
+def test_parse_durations():
+    values = ["PT1H2M3S", "PT15M", "P1DT2H", "P0D", "PT1.5S", "P2W", None, "", "garbage", "PT5Mx"]
+    assert parse_durations(values).tolist() == [3723, 900, 93600, 0, 1, 1209600, 0, 0, 0, 0]
+    assert parse_durations([]).tolist() == []
+
+
+def test_normalize_videos_types_and_missing_fields():
+    items = [
+        {"id": "v1",
+         "snippet": {"title": "One", "publishedAt": "2024-03-01T10:00:00Z",
+                     "thumbnails": {"high": {"url": "https://i.ytimg.com/vi/v1/hqdefault.jpg"}}},
+         "contentDetails": {"duration": "PT4M"},
+         "statistics": {"viewCount": "1200", "likeCount": "30", "commentCount": "4"}},
+        # Hidden likes, no contentDetails, fractional publish time
+        {"id": "v2", "snippet": {"title": "Two", "publishedAt": "2024-03-02T10:00:00.5Z"},
+         "statistics": {"viewCount": "7"}},
+    ]
+    df = normalize_videos(items)
+
+    assert df["duration_seconds"].tolist() == [240, 0]
+    assert df["view_count"].tolist() == [1200, 7] and df["like_count"].tolist() == [30, 0]
+    assert str(df["view_count"].dtype) == "int64"
+    assert str(df["published_at"].dt.tz) == "UTC" and df["published_at"][1].microsecond == 500000
+    assert df["thumbnail_high"].tolist() == ["https://i.ytimg.com/vi/v1/hqdefault.jpg", None]
+    assert normalize_videos([]).empty
+
+
+def test_normalize_channels_coerces_bad_counters():
+    df = normalize_channels([{"id": "UC1", "snippet": {"title": "C"},
+                              "statistics": {"subscriberCount": "n/a", "videoCount": "3"}}])
+    assert df.loc[0, ["subscriber_count", "video_count", "view_count"]].tolist() == [0, 3, 0]
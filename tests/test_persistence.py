@@ -0,0 +1,147 @@
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import event
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database.db_config import SessionLocal, engine
+from database.models import Channel, Video, VideoStatistics, VideoLatestStats
+from database.persistence import (
+    save_channel_to_db, save_channels_to_db, save_video_stream_to_db, save_videos_to_db
+)
+
+CHANNEL_ID = "UC_PERSIST_TEST_00000001"
+
+
+def test_save_channels_bulk_upsert():
+    channels = pd.DataFrame({
+        "channel_id": [CHANNEL_ID, "UC_PERSIST_TEST_00000002"],
+        "channel_name": ["First", "Second"],
+        "published_at": ["2020-01-01T00:00:00Z", None],
+        "subscriber_count": ["1000", "5"],
+        "video_count": ["1200", "0"],
+        "view_count": ["99999", None],
+    })
+    first = save_channels_to_db(channels)
+    assert first == {"inserted": 2, "updated": 0}
+
+    row = channels.iloc[0].copy()
+    row["channel_name"] = "First (renamed)"
+    assert save_channel_to_db(row) == {"inserted": 0, "updated": 1}
+
+    db = SessionLocal()
+    try:
+        channel = db.get(Channel, CHANNEL_ID)
+        assert channel.channel_name == "First (renamed)"
+        assert channel.subscriber_count == 1000
+        assert db.get(Channel, "UC_PERSIST_TEST_00000002").view_count == 0
+    finally:
+        db.close()
+
+
+def test_save_videos_bulk_upsert_across_chunks(make_videos):
+    # More rows than one lookup chunk
+    n = 1200
+    ids = [f"PV{i:05d}" for i in range(n)]
+    first = save_videos_to_db(make_videos(ids, view_count=[100 + i for i in range(n)]), CHANNEL_ID)
+    assert first == {"inserted": n, "updated": 0, "statistics": n, "skipped": 0}
+
+    # Each table is written by one executemany statement, not one per chunk
+    video_writes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO videos "):
+            video_writes.append(executemany)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        second = save_videos_to_db(make_videos(ids, title=[f"Renamed {i}" for i in range(n)],
+                                               view_count=[500 + i for i in range(n)]), CHANNEL_ID)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert second == {"inserted": 0, "updated": n, "statistics": n, "skipped": 0}
+    assert video_writes == [True]
+
+    db = SessionLocal()
+    try:
+        assert db.query(Video).filter(Video.channel_id == CHANNEL_ID).count() == n
+        assert db.get(Video, "PV00007").title == "Renamed 7"
+        snapshots = (
+            db.query(VideoStatistics)
+            .filter(VideoStatistics.video_id == "PV00007")
+            .order_by(VideoStatistics.id)
+            .all()
+        )
+        assert [s.view_count for s in snapshots] == [107, 507]
+    finally:
+        db.close()
+
+
+def test_stream_sink_keeps_committed_batches_on_failure(make_videos):
+    channel_id = "UC_PERSIST_STREAM_000001"
+    frame = make_videos([f"ST{i:05d}" for i in range(150)])
+
+    def crawl():
+        yield frame.iloc[0:50]
+        yield frame.iloc[50:100]
+        raise RuntimeError("crawl died")
+
+    try:
+        save_video_stream_to_db(crawl(), channel_id)
+        assert False, "stream error should propagate"
+    except RuntimeError:
+        pass
+
+    db = SessionLocal()
+    try:
+        assert db.query(Video).filter(Video.channel_id == channel_id).count() == 100
+    finally:
+        db.close()
+
+    summary = save_video_stream_to_db(iter([frame.iloc[50:100], frame.iloc[100:150]]), channel_id)
+    # The re-sent batch has unchanged counts, so only new videos get snapshots
+    assert summary == {"inserted": 50, "updated": 50, "statistics": 50, "skipped": 50, "batches": 2}
+
+
+def test_unchanged_statistics_are_deduplicated(make_videos):
+    channel_id = "UC_PERSIST_DEDUP_0000001"
+    frame = make_videos([f"DD{i:05d}" for i in range(10)])
+    save_videos_to_db(frame, channel_id)
+
+    frame.loc[0, "view_count"] += 1
+    summary = save_videos_to_db(frame, channel_id)
+    assert (summary["statistics"], summary["skipped"]) == (1, 9)
+
+    # Backdate every snapshot: the heartbeat re-records the stale ones
+    db = SessionLocal()
+    try:
+        for model in (VideoStatistics, VideoLatestStats):
+            db.query(model).filter(model.video_id.like("DD%")).update(
+                {model.record_date: datetime(2020, 1, 1)}, synchronize_session=False
+            )
+        db.commit()
+    finally:
+        db.close()
+    assert save_videos_to_db(frame, channel_id, heartbeat_days=0)["statistics"] == 0
+    assert save_videos_to_db(frame, channel_id, heartbeat_days=7)["statistics"] == 10
+    assert save_videos_to_db(frame, channel_id, skip_unchanged=False)["statistics"] == 10
+
+    db = SessionLocal()
+    try:
+        latest = db.get(VideoLatestStats, "DD00000")
+        assert latest.view_count == frame.loc[0, "view_count"]
+        assert latest.record_date > datetime(2020, 1, 1)
+        assert db.query(VideoLatestStats).filter(VideoLatestStats.channel_id == channel_id).count() == 10
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,137 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database import queries
+from database.db_config import SessionLocal
+from database.persistence import save_channel_to_db, save_videos_to_db
+from database.queries import channel_video_summary, count_videos, fetch_video_page, list_channels, load_channel_comparison
+
+CHANNEL_ID = "UC_QUERIES_TEST_00000001"
+N_VIDEOS = 130
+
+
+@pytest.fixture
+def archive(make_videos):
+    return make_videos(
+        [f"QV{i:05d}" for i in range(N_VIDEOS)],
+        title=[f"{'Tutorial' if i % 5 == 0 else 'Vlog'} {i}" for i in range(N_VIDEOS)],
+        published_at=pd.to_datetime(["2024-01-01T00:00:00Z"] * N_VIDEOS) + pd.to_timedelta(range(N_VIDEOS), unit="h"),
+        # Repeating values exercise the video_id tie-breaker
+        view_count=[i % 10 for i in range(N_VIDEOS)],
+        like_count=2,
+        comment_count=1,
+    )
+
+
+def _walk(**kwargs):
+    pages, cursor = [], None
+    while True:
+        page, cursor = fetch_video_page(CHANNEL_ID, after=cursor, **kwargs)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_archive_once(archive):
+    save_videos_to_db(archive, CHANNEL_ID)
+
+    pages = _walk()
+    assert [len(p) for p in pages] == [50, 50, 30]
+    ids = pd.concat(pages)["video_id"].tolist()
+    assert ids == [f"QV{i:05d}" for i in reversed(range(N_VIDEOS))]
+
+    by_views = pd.concat(_walk(sort="view_count", descending=False))
+    assert len(set(by_views["video_id"])) == N_VIDEOS
+    assert by_views["view_count"].is_monotonic_increasing
+
+
+def test_keyset_pages_with_null_keys_use_the_index(archive):
+    channel_id = "UC_QUERIES_NULLS_0000001"
+    archive = archive.head(9).assign(video_id=[f"QN{i:05d}" for i in range(9)])
+    archive.loc[[1, 4, 7], "published_at"] = pd.NaT
+    archive.loc[[2, 3], "published_at"] = archive.loc[5, "published_at"]
+    save_videos_to_db(archive, channel_id)
+
+    for descending in (True, False):
+        ids, cursor = [], None
+        while True:
+            page, cursor = fetch_video_page(channel_id, descending=descending, after=cursor, limit=2)
+            ids += page["video_id"].tolist()
+            if cursor is None:
+                break
+        dated = archive.dropna(subset=["published_at"]).sort_values(["published_at", "video_id"])["video_id"].tolist()
+        undated = ["QN00001", "QN00004", "QN00007"]
+        # NULL dates sort below every date
+        assert ids == (dated[::-1] + undated[::-1] if descending else undated + dated)
+
+    # The page query walks ix_videos_channel_published_id instead of sorting the catalog
+    db = SessionLocal()
+    try:
+        for after in (None, (None, "QN00004"), (pd.Timestamp("2024-01-01").to_pydatetime(), "QN00002")):
+            stmt = queries._keyset_page_select(db, channel_id, "published_at", True, None, after, 51)
+            sql = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+            plan = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+            assert not any("TEMP B-TREE" in row[-1] for row in plan), plan
+    finally:
+        db.close()
+
+
+def test_search_count_and_summary_run_in_sql(archive):
+    save_videos_to_db(archive, CHANNEL_ID)
+
+    assert count_videos(CHANNEL_ID) == N_VIDEOS
+    assert count_videos(CHANNEL_ID, "tutorial") == N_VIDEOS // 5
+    matches = pd.concat(_walk(search="tutorial"))
+    assert len(matches) == N_VIDEOS // 5
+    assert matches["title"].str.startswith("Tutorial").all()
+
+    summary = channel_video_summary(CHANNEL_ID)
+    assert summary["video_count"] == N_VIDEOS
+    assert summary["avg_likes"] == 2.0
+
+
+def test_channel_comparison_from_grouped_aggregates(make_videos, monkeypatch):
+    channels = {"UC_COMPARE_ODD_000000001": ("CMPO", [10, 500, 30, 4000, 200], 7),
+                "UC_COMPARE_EVEN_00000001": ("CMPE", [100, 300, 200, 1000], 30)}
+    for cid, (prefix, views, days_apart) in channels.items():
+        save_channel_to_db({"channel_id": cid, "channel_name": prefix})
+        save_videos_to_db(make_videos(
+            [f"{prefix}{i:03d}" for i in range(len(views))],
+            published_at=pd.Timestamp("2026-06-01", tz="UTC") - pd.to_timedelta(
+                [i * days_apart for i in range(len(views))], unit="D"),
+            view_count=views, like_count=[v // 10 for v in views], comment_count=[v // 100 for v in views],
+        ), cid)
+    save_channel_to_db({"channel_id": "UC_COMPARE_EMPTY_0000001", "channel_name": "CMPX"})
+
+    ids = ["UC_COMPARE_EVEN_00000001", "UC_COMPARE_ODD_000000001", "UC_COMPARE_EMPTY_0000001"]
+    now = pd.Timestamp("2026-06-02").to_pydatetime()
+    frames = []
+    for window_functions in (True, False):
+        monkeypatch.setattr(queries, "supports_window_functions", lambda conn: window_functions)
+        df = load_channel_comparison(ids, cadence_days=28, now=now)
+        frames.append(df)
+
+        assert df["channel_id"].tolist() == ids
+        assert df["archived_videos"].tolist() == [4, 5, 0]
+        assert df["median_views"].tolist()[:2] == [250.0, 200.0]
+        assert df["avg_views"].tolist()[:2] == [400.0, 948.0]
+        assert df["engagement_rate"].iloc[0] == pytest.approx((160 + 16) / 1600)
+        # Posted every 30 days: one upload in the last 28 days; every 7 days: four
+        assert df["uploads_per_week"].tolist() == [0.25, 1.0, 0.0]
+        assert df["days_between_uploads"].tolist()[:2] == [30.0, 7.0]
+        assert df.iloc[2][["median_views", "engagement_rate", "days_between_uploads"]].isna().all()
+
+    # The pandas median fallback matches the window-function median
+    pd.testing.assert_frame_equal(*frames)
+
+    assert set(ids) <= set(list_channels()["channel_id"])
+    assert load_channel_comparison([]).empty
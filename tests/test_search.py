@@ -0,0 +1,111 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database import search
+from database.persistence import save_videos_to_db
+from database.queries import count_videos, fetch_video_page
+
+
+@pytest.fixture
+def videos(make_videos):
+    """Video frame from (video_id, title, description) tuples."""
+    def build(rows):
+        ids, titles, descriptions = zip(*rows)
+        return make_videos(ids, title=titles, description=descriptions)
+    return build
+
+
+@pytest.fixture(params=["fts5", "memory"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_BACKEND", request.param)
+    monkeypatch.setattr(search, "_memory_index", search.InvertedIndex())
+    return request.param
+
+
+def test_prefix_search_ranks_title_matches_first(backend, videos):
+    channel_id = f"UC_SEARCH_RANK_{backend:<9}"
+    save_videos_to_db(videos([
+        (f"SR{backend}1", "Weekly vlog", "Trying a new python tutorial format"),
+        (f"SR{backend}2", "Python tutorials for beginners", "Learn the basics"),
+        (f"SR{backend}3", "Cooking pasta", "Nothing about code"),
+        (f"SR{backend}4", "Café tour", "Espresso everywhere"),
+    ]), channel_id)
+
+    page, cursor = fetch_video_page(channel_id, sort="relevance", search="pyth tutorial")
+    assert page["video_id"].tolist() == [f"SR{backend}2", f"SR{backend}1"]
+    assert cursor is None
+    assert count_videos(channel_id, "tutor") == 2
+    assert count_videos(channel_id, "cafe") == 1
+    # Search syntax in user input is treated as plain words
+    assert count_videos(channel_id, 'pasta" *(') == 1
+
+
+def test_index_follows_new_and_changed_videos(backend, videos):
+    channel_id = f"UC_SEARCH_SYNC_{backend:<9}"
+    save_videos_to_db(videos([(f"SS{backend}1", "Old title", "first upload")]), channel_id)
+    # Warm the index so later writes must update it incrementally
+    assert count_videos(channel_id, "old") == 1
+
+    save_videos_to_db(videos([
+        (f"SS{backend}1", "Renamed title", "first upload"),
+        (f"SS{backend}2", "Brand new", "second upload"),
+    ]), channel_id)
+
+    assert count_videos(channel_id, "old") == 0
+    assert count_videos(channel_id, "renamed") == 1
+    assert count_videos(channel_id, "upload") == 2
+    assert count_videos(channel_id, "brand") == 1
+
+
+def test_fts_rows_are_replaced_by_rowid(videos, monkeypatch):
+    from sqlalchemy import text
+    from database.db_config import engine
+
+    monkeypatch.setattr(search, "SEARCH_BACKEND", "fts5")
+    channel_id = "UC_SEARCH_ROWID_00000001"
+    for title in ("First title", "Second title", "Third title"):
+        save_videos_to_db(videos([("SKEY00001", title, "same description")]), channel_id)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT s.rowid, k.id, s.title FROM video_search s "
+            "JOIN video_search_keys k ON k.video_id = s.video_id WHERE s.video_id = 'SKEY00001'"
+        )).all()
+        by_rowid, by_video_id = (
+            conn.execute(text(f"EXPLAIN QUERY PLAN DELETE FROM video_search WHERE {where}")).all()[-1][-1]
+            for where in ("rowid IN (1, 2)", "video_id IN ('a', 'b')")
+        )
+    assert len(rows) == 1 and rows[0][0] == rows[0][1] and rows[0][2] == "Third title"
+    # FTS5 reports its rowid lookups as "INDEX 0:=", a full scan as "INDEX 0:"
+    assert by_rowid.endswith("INDEX 0:=") and by_video_id.endswith("INDEX 0:")
+
+
+def test_fts_table_without_keys_is_rebuilt(tmp_path, monkeypatch):
+    from sqlalchemy import text
+    from database.db_config import build_engine
+    from database.models import Base, Channel, Video
+
+    monkeypatch.setattr(search, "SEARCH_BACKEND", "fts5")
+    engine = build_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Channel.__table__.insert().values(channel_id="UC_OLD", channel_name="old"))
+        conn.execute(Video.__table__.insert().values(video_id="OLD1", channel_id="UC_OLD", title="Legacy video"))
+        # The index as it was created before rows were keyed
+        conn.execute(text("CREATE VIRTUAL TABLE video_search USING fts5("
+                          "video_id UNINDEXED, channel_id UNINDEXED, title, description)"))
+        conn.execute(text("INSERT INTO video_search (rowid, video_id, channel_id, title, description) "
+                          "VALUES (42, 'OLD1', 'UC_OLD', 'Legacy video', '')"))
+
+        assert search.ensure_search_index(conn)
+        assert not search.ensure_search_index(conn)
+        rows = conn.execute(text("SELECT s.rowid, k.id FROM video_search s "
+                                 "JOIN video_search_keys k ON k.video_id = s.video_id")).all()
+    assert len(rows) == 1 and rows[0][0] == rows[0][1]
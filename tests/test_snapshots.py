@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database import snapshots
+from database.init_db import migrate
+from database.persistence import save_channel_to_db, save_statistics_to_db, save_videos_to_db
+from database.queries import load_video_frame
+
+CHANNEL_ID = "UC_SNAPSHOT_TEST_000001"
+
+
+@pytest.fixture
+def videos(make_videos):
+    """The channel's 40 videos, spread over five months, with view counts from `views` up."""
+    ids = [f"SN{i:05d}" for i in range(40)]
+    published_at = pd.to_datetime(["2024-01-05T12:00:00Z"] * 40) + pd.to_timedelta([i * 3 for i in range(40)], unit="D")
+
+    def build(views):
+        return make_videos(ids, title=[f"Snapshot video {i}" for i in range(40)],
+                           description=[f"about episode {i}" for i in range(40)],
+                           published_at=published_at, duration_seconds=300,
+                           view_count=[views + i for i in range(40)], like_count=5, comment_count=1)
+    return build
+
+
+def test_export_read_and_import_round_trip(videos, tmp_path):
+    save_channel_to_db(pd.Series({"channel_id": CHANNEL_ID, "channel_name": "Snapshots", "video_count": 40}))
+    save_videos_to_db(videos(100), CHANNEL_ID)
+    save_videos_to_db(videos(200), CHANNEL_ID, heartbeat_days=0)
+    root = tmp_path / "snapshots"
+
+    assert snapshots.export_channel(CHANNEL_ID, root) == {"videos": 40, "statistics": 80, "rollups": 0}
+    months = sorted(p.name for p in (root / "videos" / f"channel_id={CHANNEL_ID}").iterdir())
+    assert months == ["month=2024-01", "month=2024-02", "month=2024-03", "month=2024-04", "month=2024-05"]
+    assert snapshots.snapshot_is_current(CHANNEL_ID, root)
+
+    # Same frame as the database read, with Arrow-backed strings
+    frame = snapshots.read_video_frame(CHANNEL_ID, root)
+    expected = load_video_frame(CHANNEL_ID)
+    assert str(frame["title"].dtype) == "string"
+    assert frame["video_id"].tolist() == expected["video_id"].tolist()
+    assert frame["view_count"].tolist() == expected["view_count"].tolist()
+    assert (frame["published_at"] == expected["published_at"]).all()
+
+    # Partition pruning by month
+    february = snapshots.read_videos(CHANNEL_ID, root, columns=["video_id"], since="2024-02-01", until="2024-02-29")
+    assert 0 < february.num_rows < 40
+
+    # A statistics-only refresh leaves videos.last_updated alone but still dates the snapshot
+    save_statistics_to_db(pd.DataFrame({"video_id": ["SN00001"], "view_count": [999],
+                                        "like_count": [5], "comment_count": [1]}))
+    assert not snapshots.snapshot_is_current(CHANNEL_ID, root)
+    snapshots.export_channel(CHANNEL_ID, root)
+    assert snapshots.snapshot_is_current(CHANNEL_ID, root)
+
+    save_videos_to_db(videos(300), CHANNEL_ID)
+    assert not snapshots.snapshot_is_current(CHANNEL_ID, root)
+
+    # Import into an empty database
+    target = create_engine(f"sqlite:///{tmp_path / 'restored.db'}")
+    migrate(target)
+    assert snapshots.import_channel(CHANNEL_ID, root, bind=target) == {"videos": 40, "statistics": 81, "rollups": 0}
+    assert snapshots.import_channel(CHANNEL_ID, root, bind=target) == {"videos": 40, "statistics": 0, "rollups": 0}
+    with target.connect() as conn:
+        assert conn.execute(text("SELECT channel_name FROM channels")).scalar() == "Snapshots"
+        assert conn.execute(text("SELECT count(*) FROM video_statistics")).scalar() == 81
+        assert conn.execute(text("SELECT view_count FROM video_latest_stats WHERE video_id = 'SN00003'")).scalar() == 203
+        assert conn.execute(text("SELECT video_count, total_views FROM channel_summaries")).one() == (40, sum(200 + i for i in range(40)) - 201 + 999)
+        assert conn.execute(text("SELECT count(*) FROM video_search WHERE video_search MATCH 'episode'")).scalar() == 40
+
+    assert [info["channel_id"] for info in snapshots.list_snapshots(root)] == [CHANNEL_ID]
+    assert snapshots.import_channel("UC_MISSING", root, bind=target) is None
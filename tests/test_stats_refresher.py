@@ -0,0 +1,130 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import text
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing import stats_refresher, video_extractor
+from data_processing.api_scheduler import QuotaScheduler
+from data_processing.stats_refresher import StatsRefresher, count_due_videos, due_videos
+from database.db_config import engine
+from database.persistence import save_channel_to_db, save_videos_to_db
+from fake_youtube import FakeYouTube, make_video
+
+RECENT_CHANNEL = "UC_REFRESH_RECENT_000001"
+BACKLOG_CHANNEL = "UC_REFRESH_BACKLOG_00001"
+
+
+def _catalog(now):
+    """Three uploads from yesterday plus 120 old videos on one channel, 60 old ones on another."""
+    recent = [make_video(i, RECENT_CHANNEL, published_at=now - timedelta(days=1, minutes=i)) for i in range(3)]
+    old = [make_video(i, RECENT_CHANNEL) for i in range(100, 220)]
+    backlog = [make_video(i, BACKLOG_CHANNEL) for i in range(300, 360)]
+    return recent, old, backlog
+
+
+def _archive(monkeypatch, channel_id, videos, fake):
+    monkeypatch.setattr(video_extractor, "get_youtube_service", lambda: fake)
+    save_channel_to_db({"channel_id": channel_id, "channel_name": channel_id})
+    fake.channel_id, fake.uploads = channel_id, videos
+    save_videos_to_db(video_extractor.get_all_video_metadata(channel_id), channel_id)
+
+
+def _age_checks(days):
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE video_latest_stats SET checked_at = :at WHERE channel_id IN (:a, :b)"),
+                     {"at": datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days),
+                      "a": RECENT_CHANNEL, "b": BACKLOG_CHANNEL})
+
+
+def test_refresh_prioritizes_recent_uploads_within_budget(monkeypatch):
+    now = datetime.now(timezone.utc)
+    recent, old, backlog = _catalog(now)
+    fake = FakeYouTube()
+    _archive(monkeypatch, RECENT_CHANNEL, recent + old, fake)
+    _archive(monkeypatch, BACKLOG_CHANNEL, backlog, fake)
+    fake.uploads = recent + old + backlog
+    monkeypatch.setattr(stats_refresher, "get_youtube_service", lambda: fake)
+    channels = [RECENT_CHANNEL, BACKLOG_CHANNEL]
+    naive_now = now.replace(tzinfo=None)
+
+    # Just archived: nothing due; two hours later only the recent uploads are
+    assert due_videos(channel_ids=channels) == []
+    assert sorted(due_videos(naive_now + timedelta(hours=2), channel_ids=channels)) == sorted(v["id"] for v in recent)
+
+    # A week and a day later everything is due, recent uploads first
+    _age_checks(8)
+    due = due_videos(channel_ids=channels)
+    assert len(due) == 183 and set(due[:3]) == {v["id"] for v in recent}
+
+    # A budget of two calls refreshes 100 videos, recent ones included
+    for video in recent:
+        video["view_count"] += 500
+    refresher = StatsRefresher(scheduler=QuotaScheduler(daily_budget=2, requests_per_second=0),
+                               poll_seconds=86400, channel_ids=channels)
+    fake.calls.clear()
+    summary = refresher.run_once()
+    assert summary["calls"] == 2 and summary["requested"] == 100
+    assert summary["statistics"] == 3 and summary["skipped"] == 97
+    assert all(kw["part"] == "statistics" and len(kw["id"].split(",")) == 50 for kw in fake.calls_to("videos"))
+    assert refresher.run_once()["calls"] == 0
+    assert len(due_videos(channel_ids=channels)) == 83
+
+    # The rest in one cycle; a video gone from YouTube is marked checked, not retried
+    fake.uploads = [v for v in fake.uploads if v["id"] != old[0]["id"]]
+    refresher = StatsRefresher(scheduler=QuotaScheduler(daily_budget=1000, requests_per_second=0),
+                               poll_seconds=86400, channel_ids=channels)
+    summary = refresher.run_once()
+    assert summary["requested"] == 83 and summary["calls"] == 2 and summary["missing"] == 1
+    assert due_videos(channel_ids=channels) == []
+    with engine.connect() as conn:
+        views = conn.execute(text("SELECT view_count FROM video_latest_stats WHERE video_id = :v"),
+                             {"v": recent[0]["id"]}).scalar()
+        total = conn.execute(text("SELECT total_views FROM channel_summaries WHERE channel_id = :c"),
+                             {"c": RECENT_CHANNEL}).scalar()
+    assert views == recent[0]["view_count"]
+    assert total == sum(v["view_count"] for v in recent + old)
+    assert old[0]["id"] not in due_videos(naive_now + timedelta(days=2), channel_ids=channels)
+
+
+def test_sql_priority_matches_refresh_tiers(make_videos):
+    channel_id = "UC_REFRESH_PRIORITY_0001"
+    now = datetime(2031, 1, 10, 12)
+    # video: (published days ago or None, last checked hours ago or None)
+    videos = {
+        "PRI_RECENT": (1, 3),          # recent tier: 3 intervals overdue
+        "PRI_MONTH": (10, 24),         # 12h tier: 2 overdue
+        "PRI_OLD": (400, 24 * 30),     # back catalog: 30 / 7 overdue
+        "PRI_NODATE": (None, 24 * 8),  # unknown date counts as back catalog
+        "PRI_NEVER": (200, None),      # never checked: first
+        "PRI_FRESH": (1, 0.5),         # checked recently: not due
+        "PRI_TIE_A": (300, 24 * 14),   # same ratio as PRI_TIE_B, newer upload first
+        "PRI_TIE_B": (350, 24 * 14),
+    }
+    save_channel_to_db({"channel_id": channel_id, "channel_name": channel_id})
+    save_videos_to_db(make_videos(videos, title=list(videos), published_at=[
+        pd.Timestamp(now - timedelta(days=d), tz="UTC") if d is not None else pd.NaT for d, _ in videos.values()
+    ]), channel_id)
+    with engine.begin() as conn:
+        for video_id, (_, hours) in videos.items():
+            conn.execute(text("UPDATE video_latest_stats SET checked_at = :at WHERE video_id = :v"),
+                         {"at": now - timedelta(hours=hours) if hours is not None else None, "v": video_id})
+
+    def reference_priority(video_id):
+        days, hours = videos[video_id]
+        published_at = now - timedelta(days=days) if days is not None else None
+        interval = stats_refresher.refresh_interval(published_at, now)
+        overdue = float("inf") if hours is None else timedelta(hours=hours) / interval
+        return (-overdue, days if days is not None else float("inf"), video_id)
+
+    expected = sorted((v for v in videos if v != "PRI_FRESH"), key=reference_priority)
+    assert expected[:3] == ["PRI_NEVER", "PRI_OLD", "PRI_RECENT"]
+    assert due_videos(now, channel_ids=[channel_id]) == expected
+    assert due_videos(now, limit=3, channel_ids=[channel_id]) == expected[:3]
+    assert count_due_videos(now, [channel_id]) == len(expected)
@@ -0,0 +1,134 @@
+import os
+import sys
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing import video_extractor
+from database.persistence import save_channel_to_db, save_videos_to_db
+from fake_youtube import FakeYouTube, make_video
+
+CHANNEL_ID = "UC_FAKE_INCREMENTAL_0001"
+
+
+def _use_fake(monkeypatch, fake):
+    monkeypatch.setattr(video_extractor, "get_youtube_service", lambda: fake)
+
+
+def test_full_extraction(monkeypatch):
+    fake = FakeYouTube(channel_id="UC_FAKE_FULL_00000000001",
+                       videos=[make_video(i) for i in range(120, 0, -1)])
+    _use_fake(monkeypatch, fake)
+
+    df = video_extractor.get_all_video_metadata(fake.channel_id)
+
+    assert len(df) == 120
+    assert df["video_id"].tolist() == [v["id"] for v in fake.uploads]
+    assert str(df["view_count"].dtype).startswith("int")
+    # make_video(120) has a PT0M0S duration, make_video(119) PT59M59S
+    assert df["duration_seconds"].tolist()[:2] == [0, 59 * 60 + 59]
+    assert len(fake.calls_to("playlistItems")) == 3
+    assert len(fake.calls_to("videos")) == 3
+
+
+def test_incremental_sync_stops_at_known_uploads(monkeypatch):
+    fake = FakeYouTube(channel_id=CHANNEL_ID, videos=[make_video(i) for i in range(300, 0, -1)])
+    _use_fake(monkeypatch, fake)
+
+    channel_df = fake._channels_list(part="snippet,statistics", id=CHANNEL_ID)["items"][0]
+    save_channel_to_db({
+        "channel_id": CHANNEL_ID,
+        "channel_name": channel_df["snippet"]["title"],
+        "published_at": channel_df["snippet"]["publishedAt"],
+        "subscriber_count": 1, "video_count": 300, "view_count": 1,
+    })
+    save_videos_to_db(video_extractor.get_all_video_metadata(CHANNEL_ID), CHANNEL_ID)
+
+    # Three new uploads and a view bump on an old video
+    fake.add_uploads([make_video(i) for i in range(303, 300, -1)])
+    fake.uploads[-1]["view_count"] = 999_999
+    fake.calls.clear()
+
+    df = video_extractor.get_all_video_metadata(CHANNEL_ID, incremental=True)
+
+    assert len(df) == 303
+    assert df["video_id"].tolist()[:3] == ["VID0000303", "VID0000302", "VID0000301"]
+    # Paging stopped after one page of known uploads instead of walking all 7 pages
+    assert len(fake.calls_to("playlistItems")) == 2
+    full_calls = [kw for kw in fake.calls_to("videos") if "snippet" in kw["part"]]
+    assert len(full_calls) == 1 and len(full_calls[0]["id"].split(",")) == 3
+    stats_calls = [kw for kw in fake.calls_to("videos") if kw["part"] == "statistics"]
+    assert len(stats_calls) == 6
+    assert df.set_index("video_id").loc["VID0000001", "view_count"] == 999_999
+    assert df["thumbnail_high"].notna().all()
+
+
+def test_incremental_sync_backfills_an_interrupted_crawl(monkeypatch):
+    channel_id = "UC_FAKE_INTERRUPTED_0001"
+    fake = FakeYouTube(channel_id=channel_id, videos=[make_video(i, channel_id) for i in range(300, 0, -1)])
+    _use_fake(monkeypatch, fake)
+    save_channel_to_db({"channel_id": channel_id, "channel_name": channel_id})
+
+    # The first crawl died after archiving the newest two pages
+    save_videos_to_db(video_extractor.get_all_video_metadata(channel_id).head(100), channel_id)
+    fake.calls.clear()
+
+    df = video_extractor.get_all_video_metadata(channel_id, incremental=True)
+
+    # 100 archived of 300 reported: no early stop, the older 200 are fetched
+    assert len(df) == 300 and df["video_id"].is_unique
+    assert len(fake.calls_to("playlistItems")) == 6
+    full_ids = [kw["id"] for kw in fake.calls_to("videos") if "snippet" in kw["part"]]
+    assert sum(len(ids.split(",")) for ids in full_ids) == 200
+
+    # Once complete, the next sync stops after the first page again
+    save_videos_to_db(df, channel_id)
+    fake.calls.clear()
+    video_extractor.get_all_video_metadata(channel_id, incremental=True)
+    assert len(fake.calls_to("playlistItems")) == 1
+
+
+def test_concurrent_batches_keep_playlist_order(monkeypatch):
+    import threading
+
+    fake = FakeYouTube(channel_id="UC_FAKE_CONCURRENT_000001",
+                       videos=[make_video(i) for i in range(1000, 0, -1)])
+    lookups, threads = [], set()
+    list_videos = fake.videos
+
+    def videos():
+        threads.add(threading.current_thread().name)
+        return list_videos()
+
+    fake.videos = videos
+    monkeypatch.setattr(video_extractor, "get_youtube_service", lambda: lookups.append(1) or fake)
+
+    df = video_extractor.get_all_video_metadata(fake.channel_id, max_workers=4)
+    video_extractor.get_all_video_metadata(fake.channel_id, max_workers=4)
+
+    assert df["video_id"].tolist() == [v["id"] for v in fake.uploads]
+    assert len(fake.calls_to("videos")) == 40
+    # One shared client per extraction; both extractions ran on the same long-lived workers
+    assert lookups == [1, 1]
+    assert 1 <= len(threads) <= 4 and all(name.startswith("youtube-fetch-4") for name in threads)
+
+
+def test_stream_yields_bounded_batches(monkeypatch):
+    fake = FakeYouTube(channel_id="UC_FAKE_STREAM_000000001",
+                       videos=[make_video(i) for i in range(260, 0, -1)])
+    _use_fake(monkeypatch, fake)
+
+    stream = video_extractor.iter_video_batches(fake.channel_id, max_workers=2, max_in_flight=2)
+    first = next(stream)
+    # Only the first pages have been requested when the first batch arrives
+    assert len(first) == 50 and len(fake.calls_to("playlistItems")) <= 4
+    sizes = [len(first)] + [len(batch) for batch in stream]
+    assert sizes == [50, 50, 50, 50, 50, 10]
+    assert str(first["view_count"].dtype).startswith("int")
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from data_processing.video_extractor import _to_frame
+from data_processing.video_frame import (
+    compact_video_frame, memory_report, thumbnail_urls, with_descriptions, with_thumbnails
+)
+from database.persistence import save_videos_to_db
+
+CHANNEL_ID = "UC_VIDEO_FRAME_TEST_0001"
+
+
+@pytest.fixture
+def extractor_frame(make_videos):
+    """Same shape as get_all_video_metadata() output, thumbnail columns included."""
+    def build(n):
+        ids = [f"VF{i:09d}" for i in range(n)]
+        frame = make_videos(
+            ids,
+            title=[f"Episode {i}: a fairly typical video title" for i in range(n)],
+            description=[f"Episode {i} description. " + "Links, credits and chapters. " * 10 for i in range(n)],
+            published_at="2024-05-01T10:00:00Z",
+            duration_seconds=[600 + i for i in range(n)],
+            view_count=[1_000 * i for i in range(n)],
+            like_count=[10 * i for i in range(n)],
+            comment_count=[i % 500 for i in range(n)],
+        )
+        return _to_frame(frame.assign(**thumbnail_urls(ids)))
+    return build
+
+
+def test_compact_frame_is_several_times_smaller(extractor_frame):
+    full = extractor_frame(20_000)
+    compact = compact_video_frame(full)
+
+    assert list(compact.columns) == ["video_id", "title", "published_at", "duration_seconds",
+                                     "view_count", "like_count", "comment_count"]
+    assert str(compact["title"].dtype) == "string"
+    assert compact["comment_count"].dtype == "uint16"
+    assert compact["view_count"].max() == full["view_count"].max()
+
+    full_bytes = memory_report(full).loc["TOTAL", "bytes"]
+    compact_bytes = memory_report(compact).loc["TOTAL", "bytes"]
+    assert full_bytes / compact_bytes > 4
+
+
+def test_thumbnails_and_descriptions_are_restored_on_demand(extractor_frame):
+    full = extractor_frame(30)
+    save_videos_to_db(full, CHANNEL_ID)
+    compact = compact_video_frame(full)
+
+    restored = with_descriptions(with_thumbnails(compact))
+    assert restored["thumbnail_high"].tolist() == full["thumbnail_high"].tolist()
+    assert restored["description"].tolist() == full["description"].tolist()
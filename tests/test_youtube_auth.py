@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from streamlit_app.youtube_auth import PooledHttp, get_youtube_service, reset_youtube_service
+
+
+def test_client_is_shared_across_threads(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_API_KEY", "test-key")
+    reset_youtube_service()
+
+    first = get_youtube_service()
+    assert get_youtube_service() is first
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(get_youtube_service()))
+    worker.start()
+    worker.join()
+    assert other[0] is first
+
+    # Built from the bundled discovery document, no network needed
+    request = first.videos().list(part="statistics", id="abc")
+    assert request.uri.startswith("https://youtube.googleapis.com/youtube/v3/videos?")
+
+
+def test_pooled_http_lends_one_connection_per_request():
+    in_use, peak, lock = set(), [0], threading.Lock()
+    barrier = threading.Barrier(3)
+
+    class FakeHttp:
+        timeout = 7
+
+        def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+            with lock:
+                assert self not in in_use
+                in_use.add(self)
+                peak[0] = max(peak[0], len(in_use))
+            if uri == "overlap":
+                barrier.wait(timeout=5)
+            with lock:
+                in_use.discard(self)
+            return {"status": "200"}, b"{}"
+
+        def close(self):
+            pass
+
+    pool = PooledHttp(factory=FakeHttp, max_idle=2)
+    assert pool.timeout == 7
+    workers = [threading.Thread(target=pool.request, args=("overlap",)) for _ in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert peak[0] == 3 and pool.created == 3
+
+    # Later requests, from any thread, reuse the idle connections
+    for _ in range(5):
+        pool.request("sequential")
+    assert pool.created == 3
+
+
+def test_client_rebuilt_when_key_changes(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_API_KEY", "key-one")
+    reset_youtube_service()
+    first = get_youtube_service()
+
+    monkeypatch.setenv("YOUTUBE_API_KEY", "key-two")
+    second = get_youtube_service()
+    assert second is not first
+    assert "key=key-two" in second.channels().list(part="snippet", id="x").uri
+    reset_youtube_service()
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])